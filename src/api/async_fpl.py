@@ -2,14 +2,21 @@ import aiohttp
 import asyncio
 import json
 import os
+import random
+import re
 import sys
 import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
 
 _project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
 if _project_root not in sys.path:
     sys.path.insert(0, _project_root)
 
-from src.utils.season import load_bootstrap, get_season_label, get_current_gw
+from src.utils.season import BOOTSTRAP_PATH, load_bootstrap, get_season_label, get_current_gw
+from src.api.fpl import FPLClient, DEFAULT_TIMEOUT, picks_search_order
+from src.api.replay import client_session
+from src.api.summary_store import project_summary, write_store
 
 
 def cache_filename(season, gw):
@@ -24,9 +31,221 @@ def cache_filename(season, gw):
     return f"element_summary_{season}_gw_{gw}.json"
 
 
+def fingerprint_filename(season, gw):
+    """Sidecar recording the bootstrap fields each cached summary was fetched against."""
+    return f"element_summary_{season}_gw_{gw}.fingerprint.json"
+
+
+# bootstrap-static fields that move whenever a player's element-summary `history` gains
+# anything other than an all-zero row. `team` is here because a mid-season move changes
+# the player's fixture list, which the incremental merge below relies on.
+FINGERPRINT_FIELDS = ('total_points', 'minutes', 'event_points', 'starts', 'team')
+
+# Stats an unused substitute records in a played fixture: every one of them is zero.
+ZERO_HISTORY_STATS = (
+    'total_points', 'minutes', 'goals_scored', 'assists', 'clean_sheets',
+    'goals_conceded', 'own_goals', 'penalties_saved', 'penalties_missed',
+    'yellow_cards', 'red_cards', 'saves', 'bonus', 'bps', 'influence', 'creativity',
+    'threat', 'ict_index', 'starts', 'expected_goals', 'expected_assists',
+    'expected_goal_involvements', 'expected_goals_conceded',
+)
+
+
+def fingerprint(static):
+    """{player_id (str): [FINGERPRINT_FIELDS...]} from a bootstrap_static payload."""
+    return {
+        str(p['id']): [p.get(f) for f in FINGERPRINT_FIELDS]
+        for p in (static or {}).get('elements', [])
+    }
+
+
+def latest_cache(cache_dir, season, before_gw):
+    """
+    (gw, summaries, fingerprint) for the newest cache of `season` older than `before_gw`
+    that has a fingerprint sidecar, or None.
+
+    Caches written before the sidecar existed are ignored: without the fingerprint there
+    is no way to tell which players have changed since.
+    """
+    if not os.path.isdir(cache_dir):
+        return None
+    pattern = re.compile(rf"^element_summary_{re.escape(season)}_gw_(\d+)\.json$")
+    gws = sorted((int(m.group(1)) for f in os.listdir(cache_dir)
+                  for m in [pattern.match(f)] if m), reverse=True)
+    for gw in gws:
+        if gw >= before_gw:
+            continue
+        fp_path = os.path.join(cache_dir, fingerprint_filename(season, gw))
+        if not os.path.exists(fp_path):
+            continue
+        with open(os.path.join(cache_dir, cache_filename(season, gw)), 'r', encoding='utf-8') as f:
+            summaries = json.load(f)
+        with open(fp_path, 'r', encoding='utf-8') as f:
+            prints = json.load(f)
+        return gw, summaries, prints
+    return None
+
+
+def _kickoff(ts):
+    try:
+        return datetime.fromisoformat(str(ts).replace('Z', '+00:00'))
+    except ValueError:
+        return None
+
+
+def plan_incremental(static, previous, previous_fingerprint, now=None, fixtures=None):
+    """
+    Split the player list into (refetch_ids, carried) against a previous cache.
+
+    A player is CARRIED — not refetched — only when their fingerprint is unchanged,
+    which means every fixture they have had since was played without them: zero minutes
+    and zero points. Their new history rows are then fully determined by the fixture
+    list already in the previous cache, and are synthesised here as all-zero rows.
+
+    Anyone else is refetched: new players, changed fingerprints, and anyone whose team
+    has kicked off in a gameweek FPL has not yet marked finished, because a live match
+    may still be awarding them points the fingerprint has not caught up with.
+
+    The cached fixture list may be out of date: a fixture postponed since it was written
+    still shows its old event and kickoff, and would become a phantom appearance. So a
+    fixture is only synthesised when the current `fixtures` (data/raw/fixtures.json)
+    has it, by id, with the same event and kickoff. Any mismatch — or no `fixtures`
+    at all — refetches the player.
+    """
+    now = now or datetime.now(timezone.utc)
+    finished = {ev['id'] for ev in static.get('events', []) if ev.get('finished')}
+    scheduled = {fx.get('id'): (fx.get('event'), _kickoff(fx.get('kickoff_time')))
+                 for fx in (fixtures or [])}
+    current = fingerprint(static)
+    prices = {str(p['id']): p.get('now_cost') for p in static.get('elements', [])}
+
+    refetch, carried = [], {}
+    for pid, prints in current.items():
+        data = previous.get(pid)
+        if data is None or previous_fingerprint.get(pid) != prints:
+            refetch.append(int(pid))
+            continue
+
+        history = list(data.get('history', []))
+        upcoming = []
+        stale = False
+        for fx in data.get('fixtures', []):
+            kickoff = _kickoff(fx.get('kickoff_time'))
+            if fx.get('event') is None or kickoff is None or kickoff > now:
+                upcoming.append(fx)
+            elif (fx['event'] in finished
+                  and scheduled.get(fx.get('id')) == (fx['event'], kickoff)):
+                history.append(_zero_history_row(int(pid), fx, prices.get(pid)))
+            else:
+                stale = True
+                break
+
+        if stale:
+            refetch.append(int(pid))
+        else:
+            # Projected so a cache from before the schema existed is brought up to it.
+            carried[pid] = project_summary({**data, 'history': history, 'fixtures': upcoming})
+
+    return refetch, carried
+
+
+def _zero_history_row(player_id, fx, now_cost):
+    """The element-summary `history` entry for a fixture the player sat out."""
+    row = {stat: 0.0 for stat in ZERO_HISTORY_STATS}
+    row.update({
+        'element': player_id,
+        'fixture': fx.get('id'),
+        'opponent_team': fx['team_a'] if fx.get('is_home') else fx['team_h'],
+        'was_home': bool(fx.get('is_home')),
+        'kickoff_time': fx.get('kickoff_time'),
+        'round': fx['event'],
+        'value': now_cost,
+    })
+    return row
+
+
+def retry_after_seconds(headers):
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date), or None."""
+    value = (headers or {}).get('Retry-After')
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max((parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+class AdaptiveLimiter:
+    """
+    Concurrency limit that tunes itself to the API (additive increase, multiplicative
+    decrease) — used in place of a fixed semaphore.
+
+    Each fast success nudges the limit up by 1/limit, so it grows by about one slot per
+    round trip. A 429, a 5xx, a timeout or a response slower than `latency_target`
+    cuts it: halved for errors, by 10% for slow responses, at most once per
+    `cooldown` seconds so a burst of failures from one overload counts once. A
+    Retry-After header pauses every new request until it has elapsed.
+    """
+
+    def __init__(self, initial=20, minimum=2, maximum=48, latency_target=2.0, cooldown=1.0):
+        self.limit = float(initial)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.latency_target = latency_target
+        self.cooldown = cooldown
+        self.in_flight = 0
+        self.resume_at = 0.0
+        self._last_decrease = float('-inf')
+        self._cond = asyncio.Condition()
+
+    async def __aenter__(self):
+        async with self._cond:
+            while True:
+                pause = self.resume_at - time.monotonic()
+                if pause <= 0 and self.in_flight < int(self.limit):
+                    break
+                try:
+                    await asyncio.wait_for(self._cond.wait(), timeout=pause if pause > 0 else None)
+                except asyncio.TimeoutError:
+                    pass
+            self.in_flight += 1
+        return self
+
+    async def __aexit__(self, *exc):
+        async with self._cond:
+            self.in_flight -= 1
+            self._cond.notify_all()
+
+    def _decrease(self, factor):
+        now = time.monotonic()
+        if now - self._last_decrease >= self.cooldown:
+            self.limit = max(float(self.minimum), self.limit * factor)
+            self._last_decrease = now
+
+    def on_success(self, latency):
+        if latency > self.latency_target:
+            self._decrease(0.9)
+        else:
+            self.limit = min(float(self.maximum), self.limit + 1.0 / self.limit)
+
+    def on_throttle(self, retry_after=None):
+        self._decrease(0.5)
+        if retry_after:
+            self.resume_at = max(self.resume_at, time.monotonic() + retry_after)
+
+
 class AsyncFPLClient:
     BASE_URL = "https://fantasy.premierleague.com/api"
 
+    # Failed players are requeued behind everyone else and retried, up to this many
+    # passes in total, with jittered exponential backoff between passes.
+    MAX_PASSES = 4
+    BACKOFF_BASE = 1.0
+
     def __init__(self, cache_dir="data/cache"):
         self.cache_dir = cache_dir
         os.makedirs(self.cache_dir, exist_ok=True)
@@ -35,22 +254,46 @@ class AsyncFPLClient:
         }
 
     async def fetch_summary(self, session, player_id, sem):
+        """
+        One attempt at one player: (player_id, data, retryable), data None on failure.
+
+        429/5xx, timeouts and malformed bodies are retryable; any other 4xx is final —
+        a player removed from the game returns 404 however often they are asked for.
+        `sem` is the AdaptiveLimiter: throttling responses and timeouts are reported to
+        it so the whole fetch slows down, rather than each request failing alone.
+        """
         async with sem:
             url = f"{self.BASE_URL}/element-summary/{player_id}/"
+            start = time.monotonic()
             try:
                 async with session.get(url, headers=self.headers) as response:
-                    response.raise_for_status()
+                    if response.status == 429 or response.status >= 500:
+                        sem.on_throttle(retry_after_seconds(response.headers))
+                        return player_id, None, True
+                    if response.status >= 400:
+                        print(f"Error fetching {player_id}: HTTP {response.status}")
+                        return player_id, None, False
                     data = await response.json()
-                    return player_id, data
-            except Exception as e:
+                    sem.on_success(time.monotonic() - start)
+                    return player_id, project_summary(data), False
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                sem.on_throttle()
+                print(f"Error fetching {player_id}: {e!r}")
+                return player_id, None, True
+            except ValueError as e:  # malformed JSON body
                 print(f"Error fetching {player_id}: {e}")
-                return player_id, None
+                return player_id, None, True
 
-    async def get_all_summaries(self, player_ids, current_gw, season, max_failure_rate=0.05):
+    async def get_all_summaries(self, player_ids, current_gw, season, max_failure_rate=0.05,
+                                carried=None, prints=None):
         """
         Fetch element-summary for a list of player IDs concurrently, caching the
         combined result per (season, gameweek).
 
+        `carried` holds summaries that are already up to date (see plan_incremental);
+        they are merged into the cache without a request. `prints` is the bootstrap
+        fingerprint to store alongside, so the next gameweek can refresh incrementally.
+
         Raises RuntimeError if more than `max_failure_rate` of players fail. Silently
         dropping failures produces NaN rolling features that the model scores anyway,
         which is indistinguishable from success at the call site.
@@ -65,16 +308,30 @@ class AsyncFPLClient:
         print(f"Fetching {len(player_ids)} player summaries concurrently (season {season}, GW{current_gw})...")
         start_time = time.time()
 
-        sem = asyncio.Semaphore(20)  # Limit concurrent requests to avoid rate limits
-
-        timeout = aiohttp.ClientTimeout(total=300, sock_connect=15, sock_read=30)
-        async with aiohttp.ClientSession(timeout=timeout) as session:
-            tasks = [self.fetch_summary(session, pid, sem) for pid in player_ids]
-            results = await asyncio.gather(*tasks)
-
-        summaries = {str(pid): data for pid, data in results if data is not None}
-
-        failed = len(player_ids) - len(summaries)
+        limiter = AdaptiveLimiter()
+        fetched = {}
+        pending = list(player_ids)
+
+        # Per-request timeouts only: the old 300s session-wide total could expire on a
+        # slow but healthy bulk fetch and fail every request still queued.
+        timeout = aiohttp.ClientTimeout(total=None, sock_connect=15, sock_read=30)
+        async with client_session(timeout=timeout) as session:
+            for attempt in range(self.MAX_PASSES):
+                if attempt:
+                    delay = self.BACKOFF_BASE * 2 ** (attempt - 1) * random.uniform(0.5, 1.5)
+                    print(f"  Retrying {len(pending)} failed player(s) in {delay:.1f}s "
+                          f"(pass {attempt + 1}/{self.MAX_PASSES})...")
+                    await asyncio.sleep(delay)
+
+                results = await asyncio.gather(
+                    *[self.fetch_summary(session, pid, limiter) for pid in pending])
+                fetched.update({str(pid): data for pid, data, _ in results if data is not None})
+                # A final 4xx is not requeued: it would fail identically on every pass.
+                pending = [pid for pid, data, retry in results if data is None and retry]
+                if not pending:
+                    break
+
+        failed = len(player_ids) - len(fetched)
         if failed:
             rate = failed / max(len(player_ids), 1)
             msg = f"{failed}/{len(player_ids)} player summaries failed ({rate:.1%})"
@@ -85,20 +342,90 @@ class AsyncFPLClient:
                 )
             print(f"  WARNING: {msg} — those players will have missing features.")
 
+        summaries = {**(carried or {}), **fetched}
         with open(cache_file, 'w', encoding='utf-8') as f:
             json.dump(summaries, f, ensure_ascii=False)
-
-        print(f"Fetched {len(summaries)} summaries in {time.time() - start_time:.2f} seconds.")
+        write_store(summaries, self.cache_dir, season, current_gw)
+        if prints is not None:
+            # Only the players actually in the cache: a failed fetch must be retried
+            # next time rather than carried forward as if it were current.
+            with open(os.path.join(self.cache_dir, fingerprint_filename(season, current_gw)),
+                      'w', encoding='utf-8') as f:
+                json.dump({pid: prints[pid] for pid in summaries if pid in prints}, f)
+
+        print(f"Fetched {len(fetched)} summaries in {time.time() - start_time:.2f} seconds "
+              f"(final concurrency {limiter.limit:.0f})"
+              f"{f' ({len(carried)} carried forward unchanged)' if carried else ''}.")
         print(f"  Cached to {cache_file}")
         return summaries
 
+    # ------------------------------------------------------------------
+    # Manager context
+    # ------------------------------------------------------------------
+    async def _get_json(self, session, endpoint):
+        """One GET against the API; None on any failure, like FPLClient._get."""
+        url = f"{self.BASE_URL}/{endpoint}"
+        try:
+            async with session.get(url, headers=self.headers) as response:
+                if response.status >= 400:
+                    print(f"Error fetching {url}: HTTP {response.status}")
+                    return None
+                return await response.json()
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+            print(f"Error fetching {url}: {e!r}")
+            return None
+
+    async def get_manager_context(self, team_id, gw):
+        """
+        Everything the dashboard needs about one manager, fetched in a single round
+        trip: history, transfers, entry, and every candidate picks gameweek at once.
+
+        The sync path chains these — history first (for the Free Hit weeks), then up to
+        six picks requests walking backwards, then transfers. Here the Free Hit filter
+        is applied AFTER all candidates arrive, so nothing waits on anything else.
+
+        Returns a dict with history, transfers, entry, freehit_gws (a set), picks (None
+        before GW1 or when no permanent squad is found) and free_transfers.
+        """
+        candidates = picks_search_order(gw)
+        endpoints = [f"entry/{team_id}/history/", f"entry/{team_id}/transfers/",
+                     f"entry/{team_id}/"]
+        endpoints += [f"entry/{team_id}/event/{g}/picks/" for g in candidates]
+
+        timeout = aiohttp.ClientTimeout(total=DEFAULT_TIMEOUT)
+        async with client_session(timeout=timeout) as session:
+            results = await asyncio.gather(*[self._get_json(session, e) for e in endpoints])
+
+        history, transfers, entry = results[0] or {}, results[1], results[2]
+        picks_by_gw = dict(zip(candidates, results[3:]))
+
+        fpl = FPLClient(data_dir=self.cache_dir)
+        freehit_gws = fpl.get_freehit_gws(team_id, history)
+        picks = next((picks_by_gw[g] for g in candidates
+                      if g not in freehit_gws and picks_by_gw[g]), None)
+        free_transfers = (fpl.calculate_free_transfers(team_id, gw, history, transfers)
+                          if transfers is not None else 1)
+
+        return {
+            'history': history,
+            'transfers': transfers,
+            'entry': entry,
+            'freehit_gws': freehit_gws,
+            'picks': picks,
+            'free_transfers': free_transfers,
+        }
 
-def fetch_summaries_sync(player_ids, current_gw, season):
+
+def fetch_manager_context_sync(team_id, gw):
+    return asyncio.run(AsyncFPLClient().get_manager_context(team_id, gw))
+
+
+def fetch_summaries_sync(player_ids, current_gw, season, prints=None):
     client = AsyncFPLClient()
-    return asyncio.run(client.get_all_summaries(player_ids, current_gw, season))
+    return asyncio.run(client.get_all_summaries(player_ids, current_gw, season, prints=prints))
 
 
-def refresh_cache(static=None, cache_dir="data/cache"):
+def refresh_cache(static=None, cache_dir="data/cache", incremental=True, fixtures=None):
     """
     Ensure the element-summary cache for the CURRENT season+gameweek exists.
 
@@ -109,6 +436,11 @@ def refresh_cache(static=None, cache_dir="data/cache"):
     carries each player's PREVIOUS-SEASON totals — by far the best signal available
     before a ball is kicked, and the difference between a meaningful draft ranking and
     an arbitrary one.
+
+    With `incremental` (the default) a gameweek rollover starts from the previous
+    gameweek's cache and only refetches players whose bootstrap fingerprint moved —
+    see plan_incremental, which checks carried fixtures against `fixtures` (default:
+    data/raw/fixtures.json). Without a usable previous cache it fetches everyone.
     """
     static = static or load_bootstrap()
     if not static:
@@ -125,14 +457,27 @@ def refresh_cache(static=None, cache_dir="data/cache"):
         return cache_file
 
     player_ids = [p['id'] for p in static['elements']]
-    AsyncFPLClient(cache_dir=cache_dir)  # ensure the directory exists
-    asyncio.run(AsyncFPLClient(cache_dir=cache_dir).get_all_summaries(player_ids, gw, season))
+    prints = fingerprint(static)
+    carried = None
+
+    previous = latest_cache(cache_dir, season, gw) if incremental else None
+    if previous:
+        prev_gw, prev_summaries, prev_prints = previous
+        if fixtures is None:
+            fixtures_path = os.path.join(os.path.dirname(BOOTSTRAP_PATH), "fixtures.json")
+            if os.path.exists(fixtures_path):
+                fixtures = FPLClient._load_raw(fixtures_path)
+        player_ids, carried = plan_incremental(static, prev_summaries, prev_prints,
+                                               fixtures=fixtures)
+        print(f"Incremental refresh from GW{prev_gw}: refetching {len(player_ids)}, "
+              f"carrying {len(carried)} unchanged.")
+
+    client = AsyncFPLClient(cache_dir=cache_dir)
+    asyncio.run(client.get_all_summaries(player_ids, gw, season, carried=carried, prints=prints))
     return cache_file
 
 
 if __name__ == "__main__":
-    from src.api.fpl import FPLClient
-
     fpl = FPLClient()
     static = fpl.get_bootstrap_static() or load_bootstrap()
 
@@ -143,4 +488,4 @@ if __name__ == "__main__":
         print("Pre-season: fetching previous-season totals (history_past) as a prior.")
 
     player_ids = [p['id'] for p in static['elements']]
-    fetch_summaries_sync(player_ids, gw, season)
+    fetch_summaries_sync(player_ids, gw, season, prints=fingerprint(static))
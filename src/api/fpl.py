@@ -1,6 +1,7 @@
 import requests
 import json
 import os
+import threading
 
 # Every outbound call is bounded. Without a timeout a hung upstream socket blocks the
 # Streamlit worker forever with no way to recover.
@@ -12,41 +13,142 @@ FREE_TRANSFER_CHIPS = {"wildcard", "freehit"}
 
 MAX_FREE_TRANSFERS = 5
 
+# get_team_picks searches this many gameweeks back for a permanent squad.
+PICKS_LOOKBACK = 6
+
+# Keep-alive connections held open to the FPL host. Streamlit serves each session from
+# its own thread, so this bounds sockets across concurrent users rather than per user.
+POOL_SIZE = 16
+
+_session = None
+_session_lock = threading.Lock()
+
+# {path: (mtime, parsed payload)} for conditionally-fetched files, so a 304 costs
+# neither a download nor a JSON parse. Treat returned payloads as read-only.
+_raw_memo = {}
+
+
+def shared_session():
+    """
+    The process-wide pooled `requests.Session`.
+
+    A bare `requests.get` opens a new TCP + TLS connection for every call; a manager's
+    context alone is up to nine calls to the same host. One pooled session reuses the
+    connection across calls, clients and Streamlit reruns.
+    """
+    from src.api.replay import http_adapter
+
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            # Record/replay transports wrap this same adapter (see src.api.replay).
+            adapter = http_adapter(pool_connections=4, pool_maxsize=POOL_SIZE)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _session = session
+    return _session
+
+
+def picks_search_order(gw, lookback=PICKS_LOOKBACK):
+    """Gameweeks get_team_picks tries, newest first: gw-1 back to gw-lookback, never < 1."""
+    return [g for g in range(gw - 1, gw - 1 - lookback, -1) if g >= 1]
+
+
+def standings_endpoint(league_id, page=1, new_entries_page=1):
+    """Classic-league standings. Both collections are paginated (50 rows a page), independently."""
+    return (f"leagues-classic/{league_id}/standings/"
+            f"?page_new_entries={new_entries_page}&page_standings={page}&phase=1")
+
 
 class FPLClient:
     BASE_URL = "https://fantasy.premierleague.com/api"
 
-    def __init__(self, data_dir="data/raw"):
+    def __init__(self, data_dir="data/raw", session=None):
         self.data_dir = data_dir
         os.makedirs(self.data_dir, exist_ok=True)
+        self.session = session or shared_session()
         self.headers = {
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
         }
 
     def _get(self, endpoint, timeout=DEFAULT_TIMEOUT):
-        """Helper to make GET requests."""
+        """Helper to make GET requests over the pooled session."""
         url = f"{self.BASE_URL}/{endpoint}"
         try:
-            response = requests.get(url, headers=self.headers, timeout=timeout)
+            response = self.session.get(url, headers=self.headers, timeout=timeout)
             response.raise_for_status()
             return response.json()
         except requests.exceptions.RequestException as e:
             print(f"Error fetching {url}: {e}")
             return None
 
+    def _get_conditional(self, endpoint, filename, timeout=DEFAULT_TIMEOUT):
+        """
+        GET a large, rarely-changing payload, revalidating the copy in data_dir.
+
+        The response's ETag / Last-Modified are stored in `{filename}.validators.json`
+        and sent back as If-None-Match / If-Modified-Since. On 304 Not Modified the
+        local file is returned as-is — from memory if it has not changed on disk — with
+        no download, no parse and no rewrite. A 200 is written as the raw response
+        bytes rather than re-encoded.
+        """
+        path = os.path.join(self.data_dir, filename)
+        validators_path = f"{path}.validators.json"
+
+        headers = dict(self.headers)
+        if os.path.exists(path) and os.path.exists(validators_path):
+            with open(validators_path, 'r', encoding='utf-8') as f:
+                validators = json.load(f)
+            if validators.get('etag'):
+                headers['If-None-Match'] = validators['etag']
+            if validators.get('last_modified'):
+                headers['If-Modified-Since'] = validators['last_modified']
+
+        url = f"{self.BASE_URL}/{endpoint}"
+        try:
+            response = self.session.get(url, headers=headers, timeout=timeout)
+            if response.status_code == 304:
+                return self._load_raw(path)
+            response.raise_for_status()
+            data = response.json()
+        except requests.exceptions.RequestException as e:
+            print(f"Error fetching {url}: {e}")
+            return None
+
+        with open(path, 'wb') as f:
+            f.write(response.content)
+        validators = {'etag': response.headers.get('ETag'),
+                      'last_modified': response.headers.get('Last-Modified')}
+        if any(validators.values()):
+            with open(validators_path, 'w', encoding='utf-8') as f:
+                json.dump(validators, f)
+        elif os.path.exists(validators_path):
+            os.remove(validators_path)
+
+        _raw_memo[path] = (os.path.getmtime(path), data)
+        print(f"Saved {filename}")
+        return data
+
+    @staticmethod
+    def _load_raw(path):
+        """A conditionally-fetched file, parsed at most once per version on disk."""
+        mtime = os.path.getmtime(path)
+        cached = _raw_memo.get(path)
+        if cached and cached[0] == mtime:
+            return cached[1]
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        _raw_memo[path] = (mtime, data)
+        return data
+
     def get_bootstrap_static(self):
         """Fetches general data: players, teams, events (gameweeks)."""
-        data = self._get("bootstrap-static/")
-        if data:
-            self._save_json(data, "bootstrap_static.json")
-        return data
+        return self._get_conditional("bootstrap-static/", "bootstrap_static.json")
 
     def get_fixtures(self):
         """Fetches all fixtures."""
-        data = self._get("fixtures/")
-        if data:
-            self._save_json(data, "fixtures.json")
-        return data
+        return self._get_conditional("fixtures/", "fixtures.json")
 
     def get_gameweek_live(self, gw):
         """Fetches live stats for a specific gameweek."""
@@ -77,16 +179,15 @@ class FPLClient:
         """
         return self._get(f"entry/{team_id}/")
 
-    def get_league_standings(self, league_id):
+    def get_league_standings(self, league_id, page=1):
         """
-        Fetches standings for a classic league.
+        Fetches one page of standings for a classic league (see src.api.league for
+        every page at once).
 
         Returns None on failure — note that leagues are per-season, so an id from a
         previous season returns HTTP 404 rather than an empty league.
         """
-        return self._get(
-            f"leagues-classic/{league_id}/standings/?page_new_entries=1&page_standings=1&phase=1"
-        )
+        return self._get(standings_endpoint(league_id, page, page))
 
     def get_league_members(self, league_id):
         """
@@ -141,7 +242,7 @@ class FPLClient:
     # ------------------------------------------------------------------
     # Free transfers
     # ------------------------------------------------------------------
-    def calculate_free_transfers(self, team_id, current_gw, history=None):
+    def calculate_free_transfers(self, team_id, current_gw, history=None, transfers=None):
         """
         Calculates available free transfers for the upcoming current_gw.
 
@@ -152,8 +253,11 @@ class FPLClient:
         - Transfers made under Wildcard or Free Hit are FREE: they neither consume
           nor reset your banked FTs. Counting them (as this used to) drives the
           balance to 0 after any wildcard and produces wrong hit-cost advice.
+
+        `history` and `transfers` may be passed in when already fetched.
         """
-        transfers = self.get_transfers(team_id)
+        if transfers is None:
+            transfers = self.get_transfers(team_id)
         if transfers is None:
             return 1  # Default fallback
 
@@ -202,9 +306,7 @@ class FPLClient:
             print(f"No completed gameweek before GW{gw} — no squad history exists yet.")
             return None
 
-        for g in range(start_gw, max(0, start_gw - 6), -1):
-            if g < 1:
-                break
+        for g in picks_search_order(gw):
             if g in freehit_gws:
                 print(f"Skipping GW{g} (Free Hit was played) — fetching permanent squad from earlier GW.")
                 continue
@@ -220,7 +322,7 @@ class FPLClient:
         """Saves data to local JSON file for inspection/debugging."""
         path = os.path.join(self.data_dir, filename)
         with open(path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=4)
+            json.dump(data, f, ensure_ascii=False)
         print(f"Saved {filename}")
 
 
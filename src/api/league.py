@@ -0,0 +1,257 @@
+"""
+League-wide crawl: every member of a classic league, with their picks and chips.
+
+`FPLClient.get_league_members` reads one standings page (50 managers) and the Rival
+Spy tab fetches one rival at a time, so anything league-wide — ownership, effective
+ownership, the template team — was out of reach for a big mini-league. This walks
+every standings page, then fetches every member's picks for the gameweek and their
+chip history through the same AdaptiveLimiter the element-summary fetch uses, and
+persists the result as three Parquet tables in a per-(league, gameweek) directory:
+
+    members  entry, entry_name, player_name, rank, total, event_total, active_chip, ...
+    picks    entry, element, position, multiplier, is_captain, is_vice_captain
+    chips    entry, name, event
+
+A second crawl of the same league and gameweek reads the tables back from disk.
+"""
+
+import aiohttp
+import asyncio
+import os
+import random
+import sys
+import time
+
+import pandas as pd
+
+_project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+if _project_root not in sys.path:
+    sys.path.insert(0, _project_root)
+
+from src.api.async_fpl import AsyncFPLClient, AdaptiveLimiter, retry_after_seconds
+from src.api.fpl import standings_endpoint
+from src.api.replay import client_session
+
+LEAGUE_TABLES = ('members', 'picks', 'chips')
+
+# Standings pages requested concurrently once a league turns out to have more than
+# one. The page count is unknown until a page says `has_next: false`; pages past the
+# end come back empty and are ignored.
+PAGE_WINDOW = 8
+
+PICK_DTYPES = {'entry': 'int64', 'element': 'int32', 'position': 'int8',
+               'multiplier': 'int8', 'is_captain': 'bool', 'is_vice_captain': 'bool'}
+
+
+def league_dirname(league_id, gw):
+    return f"league_{league_id}_gw_{gw}"
+
+
+def has_league(cache_dir, league_id, gw):
+    out_dir = os.path.join(cache_dir, league_dirname(league_id, gw))
+    return all(os.path.exists(os.path.join(out_dir, f"{t}.parquet")) for t in LEAGUE_TABLES)
+
+
+def write_league(tables, cache_dir, league_id, gw):
+    out_dir = os.path.join(cache_dir, league_dirname(league_id, gw))
+    os.makedirs(out_dir, exist_ok=True)
+    for table in LEAGUE_TABLES:
+        tables[table].reset_index(drop=True).to_parquet(
+            os.path.join(out_dir, f"{table}.parquet"), index=False)
+    return out_dir
+
+
+def read_league(cache_dir, league_id, gw):
+    out_dir = os.path.join(cache_dir, league_dirname(league_id, gw))
+    return {t: pd.read_parquet(os.path.join(out_dir, f"{t}.parquet")) for t in LEAGUE_TABLES}
+
+
+def league_ownership(members, picks):
+    """
+    Per-element ownership across the league, most-owned first.
+
+    `ownership` is the share of members with the player anywhere in their 15;
+    `effective_ownership` is the mean multiplier (bench 0, captain 2, triple captain
+    3), i.e. how many of the player's points the average member banks.
+    """
+    n = max(len(members), 1)
+    if picks.empty:
+        return pd.DataFrame(columns=['element', 'owners', 'ownership',
+                                     'effective_ownership', 'captaincy'])
+    out = picks.groupby('element').agg(
+        owners=('entry', 'nunique'),
+        multiplier=('multiplier', 'sum'),
+        captains=('is_captain', 'sum'),
+    ).reset_index()
+    out['ownership'] = out['owners'] / n
+    out['effective_ownership'] = out['multiplier'] / n
+    out['captaincy'] = out['captains'] / n
+    return (out.drop(columns=['multiplier', 'captains'])
+               .sort_values(['ownership', 'effective_ownership'], ascending=False)
+               .reset_index(drop=True))
+
+
+class LeagueCrawler(AsyncFPLClient):
+    """Crawls one classic league. Inherits the base URL, headers and retry settings."""
+
+    async def _fetch(self, session, endpoint, limiter):
+        """
+        One attempt at one endpoint: (endpoint, data, retryable).
+
+        429/5xx and timeouts are reported to the limiter and retried; any other 4xx
+        is final — a member who joined after the gameweek, for instance, has no picks
+        for it and never will.
+        """
+        async with limiter:
+            url = f"{self.BASE_URL}/{endpoint}"
+            start = time.monotonic()
+            try:
+                async with session.get(url, headers=self.headers) as response:
+                    if response.status == 429 or response.status >= 500:
+                        limiter.on_throttle(retry_after_seconds(response.headers))
+                        return endpoint, None, True
+                    if response.status >= 400:
+                        return endpoint, None, False
+                    data = await response.json()
+                    limiter.on_success(time.monotonic() - start)
+                    return endpoint, data, False
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                limiter.on_throttle()
+                return endpoint, None, True
+            except ValueError:  # malformed JSON body
+                return endpoint, None, True
+
+    async def _fetch_all(self, session, endpoints, limiter):
+        """
+        {endpoint: data} for every endpoint that succeeded, with retryable failures
+        requeued in passes exactly as get_all_summaries does. Returns (results, failed,
+        final): `failed` still failing retryably after the last pass, `final` answered
+        with a non-retryable 4xx.
+        """
+        results, final, pending = {}, set(), list(endpoints)
+        for attempt in range(self.MAX_PASSES):
+            if attempt:
+                await asyncio.sleep(
+                    self.BACKOFF_BASE * 2 ** (attempt - 1) * random.uniform(0.5, 1.5))
+            done = await asyncio.gather(*[self._fetch(session, e, limiter) for e in pending])
+            results.update({e: data for e, data, _ in done if data is not None})
+            final.update(e for e, data, retry in done if data is None and not retry)
+            pending = [e for e, data, retry in done if data is None and retry]
+            if not pending:
+                break
+        return results, pending, sorted(final)
+
+    async def _crawl_collection(self, session, league_id, limiter, key):
+        """
+        Every row of one paginated collection: 'standings' (ranked members) or
+        'new_entries' (members who joined before their first gameweek was scored).
+        """
+        def endpoint(page):
+            if key == 'standings':
+                return standings_endpoint(league_id, page=page)
+            return standings_endpoint(league_id, new_entries_page=page)
+
+        rows, page, finished = [], 1, False
+        window = 1   # most leagues fit on one page; only widen once we know they don't
+        while not finished:
+            pages = list(range(page, page + window))
+            results, failed, final = await self._fetch_all(
+                session, [endpoint(p) for p in pages], limiter)
+            failed = failed + final
+            if failed:
+                # A missing page is a silent hole in every league-wide number.
+                raise RuntimeError(f"League {league_id}: could not fetch {key} page(s) "
+                                   f"{[p for p in pages if endpoint(p) in failed]}")
+            for p in pages:
+                block = (results[endpoint(p)] or {}).get(key) or {}
+                rows.extend(block.get('results') or [])
+                if not block.get('has_next'):
+                    finished = True
+                    break
+            page += window
+            window = PAGE_WINDOW
+        return rows
+
+    async def crawl(self, league_id, gw, max_failure_rate=0.05, refresh=False):
+        """
+        The league's members, their GW `gw` picks and their chip history, as the three
+        tables described in the module docstring (cached per league and gameweek).
+
+        Pre-season (gw < 1) there are no picks; members and chips are still returned.
+        Raises RuntimeError if more than `max_failure_rate` of members' requests fail
+        retryably, for the same reason get_all_summaries does. A final 4xx is not a
+        failure: a member who joined after the gameweek gets an empty squad.
+        """
+        if not refresh and has_league(self.cache_dir, league_id, gw):
+            return read_league(self.cache_dir, league_id, gw)
+
+        start_time = time.time()
+        limiter = AdaptiveLimiter()
+        timeout = aiohttp.ClientTimeout(total=None, sock_connect=15, sock_read=30)
+        async with client_session(timeout=timeout) as session:
+            standings, new_entries = await asyncio.gather(
+                self._crawl_collection(session, league_id, limiter, 'standings'),
+                self._crawl_collection(session, league_id, limiter, 'new_entries'))
+
+            members = self._members_frame(standings, new_entries)
+            entries = members['entry'].tolist()
+            picks_eps = ({e: f"entry/{e}/event/{gw}/picks/" for e in entries}
+                         if gw >= 1 else {})
+            history_eps = {e: f"entry/{e}/history/" for e in entries}
+            results, failed, final = await self._fetch_all(
+                session, list(picks_eps.values()) + list(history_eps.values()), limiter)
+
+        failed_entries = {int(ep.split('/')[1]) for ep in failed}
+        if failed_entries:
+            rate = len(failed_entries) / max(len(entries), 1)
+            msg = f"{len(failed_entries)}/{len(entries)} league members failed ({rate:.1%})"
+            if rate > max_failure_rate:
+                raise RuntimeError(f"{msg} — refusing to write a partial league table.")
+            print(f"  WARNING: {msg} — their picks and chips are missing.")
+        if final:
+            print(f"  {len({ep.split('/')[1] for ep in final})} member(s) have no picks or "
+                  f"history for GW{gw} (joined later) — recorded with empty squads.")
+
+        pick_rows, chip_rows, active = [], [], {}
+        for e in entries:
+            payload = results.get(picks_eps.get(e)) or {}
+            active[e] = payload.get('active_chip')
+            for p in payload.get('picks') or []:
+                pick_rows.append({'entry': e, **{k: p.get(k) for k in PICK_DTYPES if k != 'entry'}})
+            for c in (results.get(history_eps[e]) or {}).get('chips') or []:
+                chip_rows.append({'entry': e, 'name': c.get('name'), 'event': c.get('event')})
+
+        members['active_chip'] = members['entry'].map(active)
+        tables = {
+            'members': members,
+            'picks': pd.DataFrame(pick_rows, columns=list(PICK_DTYPES)).astype(PICK_DTYPES),
+            'chips': pd.DataFrame(chip_rows, columns=['entry', 'name', 'event']).astype(
+                {'entry': 'int64', 'event': 'int16'}),
+        }
+        write_league(tables, self.cache_dir, league_id, gw)
+        print(f"Crawled league {league_id}: {len(entries)} members in "
+              f"{time.time() - start_time:.2f} seconds (final concurrency {limiter.limit:.0f}).")
+        return tables
+
+    @staticmethod
+    def _members_frame(standings, new_entries):
+        """One row per member; ranked members first, in league order."""
+        rows = [{'entry': r['entry'], 'entry_name': r.get('entry_name'),
+                 'player_name': r.get('player_name'), 'rank': r.get('rank'),
+                 'total': r.get('total'), 'event_total': r.get('event_total')}
+                for r in standings]
+        seen = {r['entry'] for r in rows}
+        for r in new_entries:
+            if r['entry'] in seen:
+                continue
+            name = f"{r.get('player_first_name', '')} {r.get('player_last_name', '')}".strip()
+            rows.append({'entry': r['entry'], 'entry_name': r.get('entry_name'),
+                         'player_name': name, 'rank': None, 'total': 0, 'event_total': 0})
+            seen.add(r['entry'])
+        columns = ['entry', 'entry_name', 'player_name', 'rank', 'total', 'event_total']
+        return pd.DataFrame(rows, columns=columns).astype(
+            {'entry': 'int64', 'rank': 'float64', 'total': 'int64', 'event_total': 'int64'})
+
+
+def crawl_league_sync(league_id, gw, cache_dir="data/cache", refresh=False):
+    return asyncio.run(LeagueCrawler(cache_dir=cache_dir).crawl(league_id, gw, refresh=refresh))
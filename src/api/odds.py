@@ -10,9 +10,10 @@ All odds are converted to implied probabilities with margin removal.
 
 import os
 import sys
+import glob
+import hashlib
 import json
 import time
-import requests
 import pandas as pd
 import numpy as np
 
@@ -21,6 +22,7 @@ if _project_root not in sys.path:
     sys.path.insert(0, _project_root)
 
 from src.utils.season import TEAM_NAME_CANON, canon_team
+from src.api.fpl import shared_session
 
 
 # League-average fallback values (PL averages).
@@ -74,34 +76,85 @@ POSITION_GOAL_SHARE = {
 TEAM_NAME_NORMALIZE = TEAM_NAME_CANON
 
 
+def implied_goals_arrays(win_h, win_a, over_odds, under_odds):
+    """
+    Column-wise implied_goals_from_odds: the same split for arrays of matches.
+
+    `over_odds` / `under_odds` may hold NaN or values <= 1 where the O/U market is
+    missing; those matches use TOTAL_GOALS_FALLBACK.
+    """
+    win_h, win_a = np.asarray(win_h, dtype=float), np.asarray(win_a, dtype=float)
+    over_odds = np.nan_to_num(np.asarray(over_odds, dtype=float))
+    under_odds = np.nan_to_num(np.asarray(under_odds, dtype=float))
+
+    has_ou = (over_odds > 1) & (under_odds > 1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        raw_over = np.where(has_ou, 1 / over_odds, 0.0)
+        raw_under = np.where(has_ou, 1 / under_odds, 0.0)
+        over_prob = np.where(has_ou, raw_over / (raw_over + raw_under), 0.0)
+        total_goals = np.where(has_ou, TOTAL_GOALS_BASE + over_prob * TOTAL_GOALS_SLOPE,
+                               TOTAL_GOALS_FALLBACK)
+
+        denom = win_h + win_a
+        raw_share = np.where(denom > 0, win_h / denom, 0.5)
+    share_h = 0.5 + GOAL_SHARE_DAMPING * (raw_share - 0.5)
+
+    home_goals = total_goals * share_h
+    away_goals = total_goals * (1.0 - share_h)
+
+    # Poisson tail: P(opponent scores exactly 0)
+    return home_goals, away_goals, np.exp(-away_goals), np.exp(-home_goals)
+
+
 def implied_goals_from_odds(win_h, win_a, over_odds=0, under_odds=0):
     """
     Split a match into per-side implied goals and clean-sheet probabilities.
 
-    Shared by the historical and live paths so they cannot drift apart.
+    Shared by the historical and live paths so they cannot drift apart — the
+    historical path calls implied_goals_arrays directly, for a whole season at once.
 
     Returns (home_goals, away_goals, home_cs, away_cs) where home_goals + away_goals
     equals the total implied goals — no inflation factor.
     """
-    if over_odds > 1 and under_odds > 1:
-        raw_over, raw_under = 1 / over_odds, 1 / under_odds
-        over_prob = raw_over / (raw_over + raw_under)
-        total_goals = TOTAL_GOALS_BASE + over_prob * TOTAL_GOALS_SLOPE
-    else:
-        total_goals = TOTAL_GOALS_FALLBACK
+    return tuple(float(v) for v in implied_goals_arrays(win_h, win_a, over_odds, under_odds))
 
-    denom = win_h + win_a
-    raw_share = (win_h / denom) if denom > 0 else 0.5
-    share_h = 0.5 + GOAL_SHARE_DAMPING * (raw_share - 0.5)
 
-    home_goals = total_goals * share_h
-    away_goals = total_goals * (1.0 - share_h)
+def anytime_scorer_probs(team_implied_goals, positions):
+    """
+    Column-wise compute_anytime_scorer_prob: positions map to POSITION_GOAL_SHARE
+    (0.10 when unrecognised) and each player's share of the team's implied goals is
+    pushed through the Poisson tail.
+    """
+    share = pd.Series(positions, dtype=object).astype(str).map(POSITION_GOAL_SHARE)
+    share = share.fillna(0.10).to_numpy(dtype=float)
+    return 1 - np.exp(-np.asarray(team_implied_goals, dtype=float) * share)
+
+
+# Everything the parsed historical odds depend on besides the CSV itself. Part of the
+# parquet cache key, so recalibrating any of these invalidates the cached seasons.
+_HISTORICAL_CALIBRATION = (TOTAL_GOALS_BASE, TOTAL_GOALS_SLOPE, TOTAL_GOALS_FALLBACK,
+                           GOAL_SHARE_DAMPING)
 
-    # Poisson tail: P(opponent scores exactly 0)
-    home_cs = float(np.exp(-away_goals))
-    away_cs = float(np.exp(-home_goals))
 
-    return home_goals, away_goals, home_cs, away_cs
+def _sources_digest(paths):
+    h = hashlib.sha256()
+    for path in paths:
+        with open(path, 'rb') as f:
+            h.update(f.read())
+    return h.hexdigest()
+
+
+# The parser itself (this file) and canon_team's club-name mapping, also in the key: a
+# parsing or naming fix must not keep serving frames parsed by the old code.
+_PARSER_DIGEST = _sources_digest([
+    os.path.abspath(__file__),
+    os.path.join(_project_root, 'src', 'utils', 'season.py'),
+])
+
+HISTORICAL_ODDS_COLUMNS = [
+    'date', 'team_name', 'opponent_name', 'is_home', 'win_prob', 'draw_prob', 'loss_prob',
+    'team_implied_goals', 'opponent_implied_goals', 'clean_sheet_prob',
+]
 
 
 class OddsClient:
@@ -134,7 +187,7 @@ class OddsClient:
                 
             print(f"Downloading odds for {season}...")
             try:
-                resp = requests.get(url, timeout=30)
+                resp = shared_session().get(url, timeout=30)
                 resp.raise_for_status()
                 with open(out_path, 'w', encoding='utf-8') as f:
                     f.write(resp.text)
@@ -143,85 +196,88 @@ class OddsClient:
                 print(f"  Failed to download {season}: {e}")
                 
     def load_historical_odds(self, season):
-        """Load historical match odds and convert to per-team implied probs."""
+        """
+        Load historical match odds and convert to per-team implied probs: two rows per
+        match (home side, then away side).
+
+        The parsed result is cached as parquet keyed on the CSV's content hash and on
+        the parsing code, so a season is parsed once per version of either.
+        """
         path = os.path.join(self.raw_dir, "odds", f"pl_odds_{season}.csv")
         if not os.path.exists(path):
             return None
-            
-        df = pd.read_csv(path, encoding='latin-1')
-        
+
+        with open(path, 'rb') as f:
+            key = hashlib.sha256(f.read() + repr(_HISTORICAL_CALIBRATION).encode()
+                                 + _PARSER_DIGEST.encode()).hexdigest()
+        cache_path = os.path.join(self.cache_dir, f"odds_hist_{season}_{key[:16]}.parquet")
+        if os.path.exists(cache_path):
+            return pd.read_parquet(cache_path)
+
+        df = self._parse_historical_odds(pd.read_csv(path, encoding='latin-1'))
+
+        for stale in glob.glob(os.path.join(self.cache_dir, f"odds_hist_{season}_*.parquet")):
+            os.remove(stale)
+        df.to_parquet(cache_path, index=False)
+        return df
+
+    @staticmethod
+    def _parse_historical_odds(df):
+        """One football-data.co.uk season → per-team rows, computed column-wise."""
         # Use market average odds (AvgH, AvgD, AvgA) or Bet365 as fallback
         h_col = 'AvgH' if 'AvgH' in df.columns else 'B365H'
         d_col = 'AvgD' if 'AvgD' in df.columns else 'B365D'
         a_col = 'AvgA' if 'AvgA' in df.columns else 'B365A'
-        
+
         # Over/Under 2.5 goals
         over_col = 'Avg>2.5' if 'Avg>2.5' in df.columns else 'B365>2.5'
         under_col = 'Avg<2.5' if 'Avg<2.5' in df.columns else 'B365<2.5'
-        
-        rows = []
-        for _, match in df.iterrows():
-            try:
-                home_team = canon_team(match.get('HomeTeam', ''))
-                away_team = canon_team(match.get('AwayTeam', ''))
-                date = str(match.get('Date', ''))
-                
-                h_odds = float(match.get(h_col, 0))
-                d_odds = float(match.get(d_col, 0))
-                a_odds = float(match.get(a_col, 0))
-                
-                if h_odds <= 1 or d_odds <= 1 or a_odds <= 1:
-                    continue
-                    
-                # Convert to implied probs and remove margin
-                raw_h = 1 / h_odds
-                raw_d = 1 / d_odds
-                raw_a = 1 / a_odds
-                margin = raw_h + raw_d + raw_a
-                
-                win_h = raw_h / margin
-                draw = raw_d / margin
-                win_a = raw_a / margin
-                
-                # Implied goals from over/under 2.5
-                over_odds = float(match.get(over_col, 0)) if pd.notna(match.get(over_col)) else 0
-                under_odds = float(match.get(under_col, 0)) if pd.notna(match.get(under_col)) else 0
-
-                home_goals, away_goals, home_cs, away_cs = implied_goals_from_odds(
-                    win_h, win_a, over_odds, under_odds)
-
-                # Home team row
-                rows.append({
-                    'date': date,
-                    'team_name': home_team,
-                    'opponent_name': away_team,
-                    'is_home': True,
-                    'win_prob': win_h,
-                    'draw_prob': draw,
-                    'loss_prob': win_a,
-                    'team_implied_goals': home_goals,
-                    'opponent_implied_goals': away_goals,
-                    'clean_sheet_prob': home_cs,
-                })
-                
-                # Away team row
-                rows.append({
-                    'date': date,
-                    'team_name': away_team,
-                    'opponent_name': home_team,
-                    'is_home': False,
-                    'win_prob': win_a,
-                    'draw_prob': draw,
-                    'loss_prob': win_h,
-                    'team_implied_goals': away_goals,
-                    'opponent_implied_goals': home_goals,
-                    'clean_sheet_prob': away_cs,
-                })
-            except (ValueError, TypeError):
-                continue
-                
-        return pd.DataFrame(rows)
-    
+
+        def numeric(col):
+            if col not in df.columns:
+                return np.zeros(len(df))
+            return pd.to_numeric(df[col], errors='coerce').to_numpy(dtype=float)
+
+        h_odds, d_odds, a_odds = numeric(h_col), numeric(d_col), numeric(a_col)
+        # Missing or unparseable 1X2 odds drop the match (NaN fails every comparison).
+        keep = (h_odds > 1) & (d_odds > 1) & (a_odds > 1)
+        h_odds, d_odds, a_odds = h_odds[keep], d_odds[keep], a_odds[keep]
+
+        # Convert to implied probs and remove margin
+        raw_h, raw_d, raw_a = 1 / h_odds, 1 / d_odds, 1 / a_odds
+        margin = raw_h + raw_d + raw_a
+        win_h, draw, win_a = raw_h / margin, raw_d / margin, raw_a / margin
+
+        home_goals, away_goals, home_cs, away_cs = implied_goals_arrays(
+            win_h, win_a, numeric(over_col)[keep], numeric(under_col)[keep])
+
+        def teams(col):
+            names = df[col].fillna('') if col in df.columns else pd.Series('', index=df.index)
+            names = names[keep]
+            return names.map({n: canon_team(n) for n in names.unique()}).to_numpy()
+
+        home, away = teams('HomeTeam'), teams('AwayTeam')
+        dates = (df['Date'] if 'Date' in df.columns else pd.Series('', index=df.index))
+        dates = dates[keep].astype(str).to_numpy()
+
+        def sides(home_value, away_value):
+            # (n, 2) → 2n, interleaved: each match's home row, then its away row.
+            return np.column_stack([home_value, away_value]).ravel()
+
+        n = int(keep.sum())
+        return pd.DataFrame({
+            'date': sides(dates, dates),
+            'team_name': sides(home, away),
+            'opponent_name': sides(away, home),
+            'is_home': sides(np.ones(n, dtype=bool), np.zeros(n, dtype=bool)),
+            'win_prob': sides(win_h, win_a),
+            'draw_prob': sides(draw, draw),
+            'loss_prob': sides(win_a, win_h),
+            'team_implied_goals': sides(home_goals, away_goals),
+            'opponent_implied_goals': sides(away_goals, home_goals),
+            'clean_sheet_prob': sides(home_cs, away_cs),
+        }, columns=HISTORICAL_ODDS_COLUMNS)
+
     # ---------------------------------------------------------------
     # 2. Live odds from the-odds-api.com
     # ---------------------------------------------------------------
@@ -249,7 +305,7 @@ class OddsClient:
         }
         
         try:
-            resp = requests.get(url, params=params, timeout=15)
+            resp = shared_session().get(url, params=params, timeout=15)
             resp.raise_for_status()
             data = resp.json()
             
@@ -337,9 +393,7 @@ class OddsClient:
         P(player scores) ≈ 1 - e^(-lambda * position_share)
         where lambda = team_implied_goals
         """
-        share = POSITION_GOAL_SHARE.get(position, 0.10)
-        player_lambda = team_implied_goals * share
-        return 1 - np.exp(-player_lambda)
+        return float(anytime_scorer_probs([team_implied_goals], [position])[0])
     
     # ---------------------------------------------------------------
     # 4. Get current GW odds features per team
@@ -0,0 +1,285 @@
+"""
+Record / replay for every upstream HTTP call.
+
+Every client talks to the live internet, so no two runs of the pipeline see the same
+network and none can run offline. This puts an archive under the two transports the
+clients use — the pooled `requests` session and the aiohttp sessions — selected by
+environment variable so no call site changes between modes:
+
+    FPL_HTTP_MODE          live (default) | record | replay
+    FPL_HTTP_ARCHIVE       archive directory (default data/http_archive)
+    FPL_REPLAY_LATENCY     seconds added to every replayed response (default 0)
+    FPL_REPLAY_ERROR_RATE  fraction of replayed responses turned into errors (default 0)
+    FPL_REPLAY_ERROR_STATUS status used for injected errors (default 503)
+    FPL_REPLAY_SEED        seed for error injection, for repeatable runs (default 0)
+
+The archive is content-addressed: each body is stored once under its SHA-256 in
+`blobs/`, and each request (method + URL with sorted query, secrets stripped) maps to
+a small JSON entry in `requests/` holding the status, the headers worth replaying and
+the body hash. Recording never stores 304s or transient errors (429/5xx), so a
+re-record only ever improves an archive.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import random
+import time
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import aiohttp
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+DEFAULT_ARCHIVE = "data/http_archive"
+
+# Query parameters that carry credentials: never part of a key or written to disk.
+SECRET_PARAMS = {'apikey', 'api_key', 'key', 'token'}
+
+REPLAYED_HEADERS = ('Content-Type', 'ETag', 'Last-Modified', 'Retry-After')
+
+
+class ReplayMiss(requests.exceptions.ConnectionError, aiohttp.ClientConnectionError):
+    """
+    A replayed request that is not in the archive.
+
+    Raised as a connection error for BOTH transports, so every client degrades exactly
+    as it does when the network is down instead of crashing on an unknown exception.
+    """
+
+
+def http_mode():
+    mode = os.environ.get('FPL_HTTP_MODE', 'live').lower()
+    if mode not in ('live', 'record', 'replay'):
+        raise ValueError(f"FPL_HTTP_MODE must be live, record or replay, not {mode!r}")
+    return mode
+
+
+def canonical_url(url, params=None):
+    """The URL with `params` merged in, query sorted and secret parameters removed."""
+    parts = urlsplit(url)
+    query = parse_qsl(parts.query, keep_blank_values=True) + list((params or {}).items())
+    query = sorted((k, str(v)) for k, v in query if k.lower() not in SECRET_PARAMS)
+    return urlunsplit((parts.scheme, parts.netloc, parts.path, urlencode(query), ''))
+
+
+class Archive:
+    """The on-disk archive: requests/{request hash}.json → blobs/{body hash}."""
+
+    def __init__(self, root=DEFAULT_ARCHIVE):
+        self.root = root
+
+    @staticmethod
+    def request_key(method, url):
+        return hashlib.sha256(f"{method.upper()} {canonical_url(url)}".encode()).hexdigest()
+
+    def _entry_path(self, method, url):
+        return os.path.join(self.root, 'requests', f"{self.request_key(method, url)}.json")
+
+    def _blob_path(self, digest):
+        return os.path.join(self.root, 'blobs', digest[:2], digest)
+
+    def put(self, method, url, status, headers, body):
+        """Archive one response. Returns False for responses that are not worth replaying."""
+        if status == 304 or status == 429 or status >= 500:
+            return False
+        digest = hashlib.sha256(body).hexdigest()
+        blob = self._blob_path(digest)
+        if not os.path.exists(blob):
+            os.makedirs(os.path.dirname(blob), exist_ok=True)
+            tmp = f"{blob}.{os.getpid()}.tmp"
+            with open(tmp, 'wb') as f:
+                f.write(body)
+            os.replace(tmp, blob)
+        entry = {
+            'method': method.upper(),
+            'url': canonical_url(url),
+            'status': status,
+            'headers': {h: headers[h] for h in REPLAYED_HEADERS if h in headers},
+            'body': digest,
+        }
+        path = self._entry_path(method, url)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(entry, f)
+        return True
+
+    def get(self, method, url):
+        """(status, headers, body) for an archived request, or None."""
+        path = self._entry_path(method, url)
+        if not os.path.exists(path):
+            return None
+        with open(path, 'r', encoding='utf-8') as f:
+            entry = json.load(f)
+        with open(self._blob_path(entry['body']), 'rb') as f:
+            body = f.read()
+        return entry['status'], entry['headers'], body
+
+
+class Replayer:
+    """Serves an archive with injected latency and errors."""
+
+    def __init__(self, archive, latency=0.0, error_rate=0.0, error_status=503, seed=0):
+        self.archive = archive
+        self.latency = latency
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self._rng = random.Random(seed)
+
+    @classmethod
+    def from_env(cls, archive=None):
+        env = os.environ.get
+        return cls(archive or Archive(env('FPL_HTTP_ARCHIVE', DEFAULT_ARCHIVE)),
+                   latency=float(env('FPL_REPLAY_LATENCY', 0)),
+                   error_rate=float(env('FPL_REPLAY_ERROR_RATE', 0)),
+                   error_status=int(env('FPL_REPLAY_ERROR_STATUS', 503)),
+                   seed=int(env('FPL_REPLAY_SEED', 0)))
+
+    def respond(self, method, url, headers=None):
+        """
+        (status, headers, body) for a request. Honours If-None-Match / If-Modified-Since
+        against the archived validators, so conditional GETs see 304s as they would live.
+        """
+        if self.error_rate and self._rng.random() < self.error_rate:
+            return self.error_status, {}, b''
+        hit = self.archive.get(method, url)
+        if hit is None:
+            raise ReplayMiss(f"not in the replay archive: {method.upper()} {canonical_url(url)}")
+        status, stored, body = hit
+        headers = CaseInsensitiveDict(headers or {})
+        etag, modified = stored.get('ETag'), stored.get('Last-Modified')
+        if (etag and headers.get('If-None-Match') == etag) or \
+                (modified and headers.get('If-Modified-Since') == modified):
+            return 304, stored, b''
+        return status, stored, body
+
+
+# ----------------------------------------------------------------------------- requests
+class ArchiveAdapter(HTTPAdapter):
+    """A requests transport that records to, or replays from, an Archive."""
+
+    def __init__(self, mode, archive=None, replayer=None, **kwargs):
+        super().__init__(**kwargs)
+        self.mode = mode
+        self.archive = archive or Archive()
+        self.replayer = replayer or Replayer(self.archive)
+
+    def send(self, request, **kwargs):
+        if self.mode == 'replay':
+            status, headers, body = self.replayer.respond(
+                request.method, request.url, request.headers)
+            if self.replayer.latency:
+                time.sleep(self.replayer.latency)
+            response = requests.Response()
+            response.status_code = status
+            response.headers = CaseInsensitiveDict(headers)
+            response._content = body
+            response.encoding = 'utf-8'
+            response.url = request.url
+            response.request = request
+            return response
+
+        response = super().send(request, **kwargs)
+        if self.mode == 'record':
+            self.archive.put(request.method, request.url, response.status_code,
+                             response.headers, response.content)
+        return response
+
+
+def http_adapter(**kwargs):
+    """The transport for the current FPL_HTTP_MODE: a plain HTTPAdapter when live."""
+    mode = http_mode()
+    if mode == 'live':
+        return HTTPAdapter(**kwargs)
+    replayer = Replayer.from_env()
+    return ArchiveAdapter(mode, archive=replayer.archive, replayer=replayer, **kwargs)
+
+
+# ----------------------------------------------------------------------------- aiohttp
+class ArchivedResponse:
+    """The subset of aiohttp.ClientResponse the async clients use."""
+
+    def __init__(self, status, headers, body):
+        self.status = status
+        self.headers = CaseInsensitiveDict(headers)
+        self._body = body
+
+    async def read(self):
+        return self._body
+
+    async def text(self):
+        return self._body.decode('utf-8')
+
+    async def json(self):
+        return json.loads(self._body)
+
+
+class _Request:
+    """`async with session.get(...)` for the sessions below."""
+
+    def __init__(self, fetch):
+        self._fetch = fetch
+
+    async def __aenter__(self):
+        return await self._fetch()
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class ReplaySession:
+    """Stands in for aiohttp.ClientSession, serving every request from a Replayer."""
+
+    def __init__(self, replayer):
+        self.replayer = replayer
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def get(self, url, headers=None, params=None, **kwargs):
+        async def fetch():
+            if self.replayer.latency:
+                await asyncio.sleep(self.replayer.latency)
+            return ArchivedResponse(
+                *self.replayer.respond('GET', canonical_url(url, params), headers))
+        return _Request(fetch)
+
+
+class RecordingSession:
+    """Wraps a live aiohttp.ClientSession, archiving each response as it is read."""
+
+    def __init__(self, session, archive):
+        self.session = session
+        self.archive = archive
+
+    async def __aenter__(self):
+        await self.session.__aenter__()
+        return self
+
+    async def __aexit__(self, *exc):
+        return await self.session.__aexit__(*exc)
+
+    def get(self, url, params=None, **kwargs):
+        async def fetch():
+            async with self.session.get(url, params=params, **kwargs) as response:
+                body = await response.read()
+                status, headers = response.status, dict(response.headers)
+            self.archive.put('GET', canonical_url(url, params), status, headers, body)
+            return ArchivedResponse(status, headers, body)
+        return _Request(fetch)
+
+
+def client_session(**kwargs):
+    """An aiohttp session for the current FPL_HTTP_MODE (kwargs go to ClientSession)."""
+    mode = http_mode()
+    if mode == 'replay':
+        return ReplaySession(Replayer.from_env())
+    session = aiohttp.ClientSession(**kwargs)
+    if mode == 'record':
+        return RecordingSession(session, Archive(os.environ.get('FPL_HTTP_ARCHIVE', DEFAULT_ARCHIVE)))
+    return session
@@ -0,0 +1,190 @@
+"""
+Columnar store for element-summary data.
+
+The raw cache is one JSON dict per (season, gameweek) holding every player's full
+element-summary payload — `history`, `fixtures` and `history_past` — and every reader
+used to `json.load` the whole multi-MB file just to read a dozen history columns.
+
+This keeps the same data as four Parquet tables in a per-(season, gameweek) directory:
+
+    players       player_id                                  (every cached player)
+    history       player_id, round, kickoff_time, ...stats   (one row per match played)
+    fixtures      player_id, event, kickoff_time, ...        (one row per upcoming match)
+    history_past  player_id, season_name, total_points, ...  (one row per past season)
+
+so callers read only the columns and players they need. The JSON file remains the raw
+record the fetch layer writes and merges against; the store is derived from it, and is
+rebuilt from the JSON on first read if it is missing.
+"""
+
+import json
+import os
+
+import pandas as pd
+
+TABLES = ('players', 'history', 'fixtures', 'history_past')
+
+# Stats that arrive as strings in the API ("0.35") and must be numeric in the store.
+NUMERIC_HISTORY_COLS = [
+    'minutes', 'total_points', 'expected_goals', 'expected_assists',
+    'expected_goal_involvements', 'expected_goals_conceded',
+    'bps', 'influence', 'creativity', 'threat', 'starts', 'ict_index',
+    'goals_scored', 'assists', 'clean_sheets', 'goals_conceded', 'own_goals',
+    'penalties_saved', 'penalties_missed', 'yellow_cards', 'red_cards', 'saves', 'bonus',
+]
+
+# The typed schema each element-summary response is projected to as it is received
+# (see project_summary). Anything not listed — per-round transfer counts, `selected`,
+# match scores, `modified` — is dropped before it reaches the cache.
+SUMMARY_SCHEMA = {
+    'history': {
+        'element': int, 'fixture': int, 'round': int, 'kickoff_time': str,
+        'opponent_team': int, 'was_home': bool, 'value': int,
+        **{col: float for col in NUMERIC_HISTORY_COLS},
+    },
+    # plan_incremental builds sat-out history rows from these.
+    'fixtures': {
+        'id': int, 'event': int, 'kickoff_time': str, 'team_h': int, 'team_a': int,
+        'is_home': bool, 'difficulty': int,
+    },
+    'history_past': {
+        'season_name': str, 'element_code': int, 'start_cost': int, 'end_cost': int,
+        'total_points': float, 'minutes': float,
+    },
+}
+
+
+def store_dirname(season, gw):
+    """Season-stamped like the JSON cache, for the same cross-season reason."""
+    return f"element_store_{season}_gw_{gw}"
+
+
+def store_path(cache_dir, season, gw, table):
+    return os.path.join(cache_dir, store_dirname(season, gw), f"{table}.parquet")
+
+
+def has_store(cache_dir, season, gw):
+    return all(os.path.exists(store_path(cache_dir, season, gw, t)) for t in TABLES)
+
+
+def _typed(value, kind):
+    if kind is float:
+        # Numeric stats arrive as strings ("0.35"), and occasionally as null.
+        try:
+            return float(value) if value not in (None, '') else 0.0
+        except (TypeError, ValueError):
+            return 0.0
+    if value is None:
+        return None
+    if kind is int:
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            return None
+    return kind(value)
+
+
+def project_summary(data):
+    """
+    One element-summary payload reduced to SUMMARY_SCHEMA, with every value converted
+    to its type once. Fields absent from a response are absent from the projection
+    (floats excepted, which default to 0.0). Idempotent, so older caches can be
+    passed through it too.
+    """
+    out = {}
+    for key, schema in SUMMARY_SCHEMA.items():
+        rows = []
+        for entry in (data or {}).get(key) or []:
+            row = {f: _typed(entry[f], kind) for f, kind in schema.items() if f in entry}
+            if key == 'history':
+                row.update({f: 0.0 for f, kind in schema.items()
+                            if kind is float and f not in row})
+            rows.append(row)
+        out[key] = rows
+    return out
+
+
+def _flatten(summaries, key):
+    rows = []
+    for pid_str, data in summaries.items():
+        pid = int(pid_str)
+        for entry in (data or {}).get(key) or []:
+            rows.append({**entry, 'player_id': pid})
+    return pd.DataFrame(rows, columns=None if rows else ['player_id'])
+
+
+def write_store(summaries, cache_dir, season, gw):
+    """Write the four tables for one (season, gameweek) from a summaries dict."""
+    out_dir = os.path.join(cache_dir, store_dirname(season, gw))
+    os.makedirs(out_dir, exist_ok=True)
+
+    players = pd.DataFrame({'player_id': sorted(int(k) for k in summaries)}, dtype='int64')
+
+    history = _flatten(summaries, 'history')
+    for col in NUMERIC_HISTORY_COLS:
+        if col in history.columns:
+            # Convert once here so no reader has to `float(x or 0)` per value again.
+            history[col] = pd.to_numeric(history[col], errors='coerce').fillna(0.0)
+    if 'round' in history.columns:
+        history = history.sort_values(['player_id', 'round'], kind='stable')
+
+    tables = {
+        'players': players,
+        'history': history,
+        'fixtures': _flatten(summaries, 'fixtures'),
+        'history_past': _flatten(summaries, 'history_past'),
+    }
+    for table, frame in tables.items():
+        frame.reset_index(drop=True).to_parquet(
+            os.path.join(out_dir, f"{table}.parquet"), index=False)
+    return out_dir
+
+
+def read_table(cache_dir, season, gw, table, columns=None, player_ids=None):
+    """
+    One table as a DataFrame, projected to `columns` (player_id is always included)
+    and filtered to `player_ids` at read time.
+
+    Columns that do not exist in the table are skipped rather than raising: a
+    pre-season `history` table, for example, has no stat columns at all.
+    """
+    path = store_path(cache_dir, season, gw, table)
+    if columns is not None:
+        import pyarrow.parquet as pq
+        available = set(pq.read_schema(path).names)
+        columns = ['player_id'] + [c for c in columns if c != 'player_id' and c in available]
+    filters = [('player_id', 'in', [int(p) for p in player_ids])] if player_ids is not None else None
+    return pd.read_parquet(path, columns=columns, filters=filters)
+
+
+def ensure_store(cache_dir, season, gw, json_path=None):
+    """Build the store from the JSON cache if it is not already on disk."""
+    if has_store(cache_dir, season, gw):
+        return True
+    json_path = json_path or os.path.join(cache_dir, f"element_summary_{season}_gw_{gw}.json")
+    if not os.path.exists(json_path):
+        return False
+    with open(json_path, 'r', encoding='utf-8') as f:
+        write_store(json.load(f), cache_dir, season, gw)
+    return True
+
+
+def summaries_from_store(cache_dir, season, gw, history_columns=None, player_ids=None):
+    """
+    Rebuild the {player_id: {'history': [...], 'history_past': [...]}} shape the
+    predictor consumes, from projected reads. `fixtures` is not included — nothing on
+    the prediction path reads it.
+    """
+    players = read_table(cache_dir, season, gw, 'players', player_ids=player_ids)
+    history = read_table(cache_dir, season, gw, 'history', columns=history_columns,
+                         player_ids=player_ids)
+    past = read_table(cache_dir, season, gw, 'history_past',
+                      columns=['season_name', 'total_points'], player_ids=player_ids)
+
+    out = {str(pid): {'history': [], 'history_past': []} for pid in players['player_id']}
+    for key, frame in (('history', history), ('history_past', past)):
+        if len(frame.columns) <= 1:
+            continue
+        for rec in frame.to_dict('records'):
+            out[str(rec.pop('player_id'))][key].append(rec)
+    return out
@@ -1,9 +1,16 @@
-import requests
+import os
 import re
+import sys
 import json
 import pandas as pd
 from datetime import datetime
 
+_project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+if _project_root not in sys.path:
+    sys.path.insert(0, _project_root)
+
+from src.api.fpl import shared_session
+
 class UnderstatClient:
     BASE_URL = "https://understat.com/league/EPL"
     
@@ -21,7 +28,7 @@ class UnderstatClient:
         """Scrapes player data from the main league page."""
         url = f"{self.BASE_URL}/{self.year}"
         try:
-            response = requests.get(url, timeout=20)
+            response = shared_session().get(url, timeout=20)
             response.raise_for_status()
             content = response.text
 
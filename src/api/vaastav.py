@@ -1,7 +1,14 @@
 import os
+import sys
 import requests
 import pandas as pd
 
+_project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+if _project_root not in sys.path:
+    sys.path.insert(0, _project_root)
+
+from src.api.fpl import shared_session
+
 class VaastavClient:
     BASE_URL = "https://raw.githubusercontent.com/vaastav/Fantasy-Premier-League/master/data"
     
@@ -14,7 +21,7 @@ class VaastavClient:
         url = f"{self.BASE_URL}/{season}/gws/merged_gw.csv"
         print(f"Downloading {season} data from {url}...")
         try:
-            response = requests.get(url, timeout=60)
+            response = shared_session().get(url, timeout=60)
             response.raise_for_status()
             
             output_path = os.path.join(self.data_dir, f"merged_gw_{season}.csv")
@@ -0,0 +1,46 @@
+"""
+The categorical model features and their fixed vocabulary.
+
+A pandas categorical's integer codes are positions in its category list, and
+`astype('category')` builds that list from whatever values the frame happens to hold —
+so the same club can get a different code in a different frame. The vocabulary is
+therefore fixed ONCE, over every training season, by HistoryBuilder; LightGBM records
+it in the booster and save_booster persists it to the .meta.json sidecar. Everything
+downstream encodes against those lists instead of re-deriving them: a lookup, not a
+sort, and a row's encoding never depends on the rest of its batch.
+
+Values outside the vocabulary (a newly promoted club) become NaN, which is how LightGBM
+itself treats an unseen category.
+"""
+
+import numpy as np
+import pandas as pd
+
+# Club NAMES — never the integer team ids, which FPL reassigns every season — are the
+# canonical keys for both team and opponent.
+CATEGORICAL_FEATURES = ['position', 'team_name', 'opponent_name', 'was_home']
+
+
+def fit_vocabulary(df, columns=CATEGORICAL_FEATURES):
+    """{column: sorted category list} over `df` — the ordering astype('category') uses."""
+    return {c: sorted(df[c].astype(str).unique().tolist()) for c in columns if c in df.columns}
+
+
+def _codes(values, categories):
+    """Integer codes of `values` in `categories`; -1 where unseen."""
+    return pd.Index(categories).get_indexer(pd.Series(values).astype(str))
+
+
+def encode_categoricals(df, vocabulary):
+    """Cast `df`'s vocabulary columns in place to categoricals over the fixed lists."""
+    for col, categories in vocabulary.items():
+        if col in df.columns:
+            df[col] = pd.Categorical.from_codes(_codes(df[col], categories),
+                                                categories=categories)
+    return df
+
+
+def category_codes(values, categories):
+    """Codes of `values` in `categories` as a float array, NaN where unseen."""
+    codes = _codes(values, categories)
+    return np.where(codes >= 0, codes, np.nan)
@@ -0,0 +1,128 @@
+"""
+Fixture engine: every club's schedule as one long table, and horizons computed from it.
+
+The FPL fixtures payload has one row per match with home and away columns side by
+side. Anything per-club (the next opponent, the run of difficulty ahead, blanks and
+doubles) wants one row per (club, match) instead, so `fixtures_long` melts the frame
+once:
+
+    fixture  event  kickoff_time  finished  team  opponent  is_home  difficulty
+
+and everything else here is a sort, a cumcount and a single groupby over that table —
+no per-club scan of the fixture list.
+"""
+
+import numpy as np
+import pandas as pd
+
+# Fixture-count horizons reported by team_horizons; None means through season end.
+HORIZONS = (1, 3, 5, None)
+
+# Difficulty assumed when a club has no fixture inside a horizon.
+DEFAULT_DIFFICULTY = 3.0
+
+LONG_COLUMNS = ['fixture', 'event', 'kickoff_time', 'finished',
+                'team', 'opponent', 'is_home', 'difficulty']
+
+
+def horizon_suffix(n):
+    return 'season' if n is None else f'next_{n}'
+
+
+def fixtures_long(fixtures_df):
+    """
+    One row per (club, fixture), home side first. `event` is NaN for fixtures FPL has
+    not yet scheduled into a gameweek; `fixture` falls back to the row position when
+    the payload carries no ids.
+    """
+    n = len(fixtures_df)
+    missing = pd.Series(np.nan, index=fixtures_df.index)
+    fixture = fixtures_df['id'].to_numpy() if 'id' in fixtures_df.columns else np.arange(n)
+    event = pd.to_numeric(fixtures_df.get('event', missing), errors='coerce').to_numpy()
+    kickoff = fixtures_df.get('kickoff_time', missing).to_numpy()
+    finished = fixtures_df.get('finished', missing).fillna(False).astype(bool).to_numpy()
+    home, away = fixtures_df['team_h'].to_numpy(), fixtures_df['team_a'].to_numpy()
+
+    long = pd.DataFrame({
+        'fixture': np.concatenate([fixture, fixture]),
+        'event': np.concatenate([event, event]),
+        'kickoff_time': np.concatenate([kickoff, kickoff]),
+        'finished': np.concatenate([finished, finished]),
+        'team': np.concatenate([home, away]),
+        'opponent': np.concatenate([away, home]),
+        'is_home': np.repeat([True, False], n),
+        'difficulty': np.concatenate([
+            pd.to_numeric(fixtures_df['team_h_difficulty'], errors='coerce').to_numpy(),
+            pd.to_numeric(fixtures_df['team_a_difficulty'], errors='coerce').to_numpy()]),
+    })
+    return long[LONG_COLUMNS]
+
+
+def upcoming_fixtures(long):
+    """
+    Unfinished fixtures in each club's playing order, with `order` = 0 for the next
+    match. Unscheduled fixtures (no kickoff yet) sort last.
+    """
+    future = long[~long['finished']].copy()
+    future['_ko'] = pd.to_datetime(future['kickoff_time'], errors='coerce', utc=True)
+    future = future.sort_values(['team', '_ko'], kind='stable', na_position='last')
+    future['order'] = future.groupby('team').cumcount()
+    return future.drop(columns='_ko').reset_index(drop=True)
+
+
+def team_horizons(long, team_ids, horizons=HORIZONS):
+    """
+    Per club (indexed by `team_ids`): mean difficulty and fixture count over its next
+    n unfinished fixtures for every n in `horizons`, plus the immediate next fixture's
+    opponent, venue and kickoff.
+
+        difficulty_next_{n}   fixtures_next_{n}   (and _season for n=None)
+        next_opponent_id  next_is_home  next_kickoff_time
+
+    A club with nothing left gets DEFAULT_DIFFICULTY and a zero count.
+    """
+    future = upcoming_fixtures(long)
+    agg = {}
+    for n in horizons:
+        s = horizon_suffix(n)
+        future[f'_d_{s}'] = future['difficulty'] if n is None else \
+            future['difficulty'].where(future['order'] < n)
+        agg[f'difficulty_{s}'] = (f'_d_{s}', 'mean')
+        agg[f'fixtures_{s}'] = (f'_d_{s}', 'count')
+    out = future.groupby('team').agg(**agg)
+
+    first = future[future['order'] == 0].set_index('team')
+    out['next_opponent_id'] = first['opponent']
+    out['next_is_home'] = first['is_home']
+    out['next_kickoff_time'] = first['kickoff_time']
+
+    out = out.reindex(pd.Index(team_ids, name='team'))
+    for n in horizons:
+        s = horizon_suffix(n)
+        out[f'difficulty_{s}'] = out[f'difficulty_{s}'].fillna(DEFAULT_DIFFICULTY)
+        out[f'fixtures_{s}'] = out[f'fixtures_{s}'].fillna(0).astype(int)
+    return out
+
+
+def gameweek_table(long, team_ids, gameweeks):
+    """
+    One row per (club, gameweek) for every club in `team_ids` and every gameweek in
+    `gameweeks`, blanks included:
+
+        team  event  n_fixtures  difficulty  is_blank  is_double
+
+    `difficulty` is the mean over the gameweek's fixtures (DEFAULT_DIFFICULTY for a
+    blank). Unscheduled fixtures belong to no gameweek and are not counted.
+    """
+    scheduled = long[long['event'].notna()]
+    per_gw = (scheduled.groupby(['team', 'event'])['difficulty']
+                       .agg(n_fixtures='size', difficulty='mean'))
+    grid = pd.MultiIndex.from_product([list(team_ids), [float(g) for g in gameweeks]],
+                                      names=['team', 'event'])
+    out = per_gw.reindex(grid).reset_index()
+    out['event'] = out['event'].astype(int)
+    out['n_fixtures'] = out['n_fixtures'].fillna(0).astype(int)
+    out['difficulty'] = out['difficulty'].fillna(DEFAULT_DIFFICULTY)
+    out['is_blank'] = out['n_fixtures'] == 0
+    out['is_double'] = out['n_fixtures'] > 1
+    return out
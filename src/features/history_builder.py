@@ -1,6 +1,7 @@
+import hashlib
+import json
 import os
 import sys
-import json
 import pandas as pd
 import numpy as np
 
@@ -14,6 +15,34 @@ from src.utils.season import (
     team_id_to_name, canon_team, canon_position,
 )
 from src.api.async_fpl import cache_filename
+from src.api.summary_store import ensure_store, read_table
+from src.features.rolling import ROLLING_COLS, GAMEWEEK_AGG, rolling_features
+from src.features.categorical import CATEGORICAL_FEATURES, encode_categoricals, fit_vocabulary
+
+
+# Past seasons the training table is built from. Their partitions are frozen once built.
+HISTORICAL_SEASONS = ("2022-23", "2023-24")
+
+CATEGORICAL_COLS = CATEGORICAL_FEATURES
+
+# The code a partition is computed by. Editing any of these invalidates every cached
+# partition, so a feature change can never be trained on next to stale features.
+FEATURE_SOURCES = [
+    os.path.abspath(__file__),
+    os.path.join(_project_root, 'src', 'features', 'rolling.py'),
+    os.path.join(_project_root, 'src', 'api', 'odds.py'),
+    # Club and position canonicalisation, and the current season's summary rows.
+    os.path.join(_project_root, 'src', 'utils', 'season.py'),
+    os.path.join(_project_root, 'src', 'api', 'summary_store.py'),
+]
+
+
+def _file_digest(path, chunk=1 << 20):
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(chunk), b''):
+            h.update(block)
+    return h.hexdigest()
 
 
 class HistoryBuilder:
@@ -23,11 +52,7 @@ class HistoryBuilder:
         self.processed_dir = processed_dir
         os.makedirs(self.processed_dir, exist_ok=True)
 
-        self.rolling_cols = [
-            'minutes', 'total_points', 'expected_goals', 'expected_assists',
-            'expected_goal_involvements', 'expected_goals_conceded',
-            'bps', 'influence', 'creativity', 'threat', 'starts'
-        ]
+        self.rolling_cols = list(ROLLING_COLS)
 
     @staticmethod
     def _opponent_name_map(df):
@@ -112,14 +137,15 @@ class HistoryBuilder:
                 df[col] = 0.0
 
         # Group by player and GW to collapse Double Gameweeks into a single row
-        agg_dict = {col: 'sum' for col in self.rolling_cols}
+        df['kickoff_time'] = pd.to_datetime(df['kickoff_time'], errors='coerce', utc=True)
+        df['last_kickoff_time'] = df['kickoff_time']
+        agg_dict = dict(GAMEWEEK_AGG)
         agg_dict.update({
             'price': 'mean',
             'was_home': 'first',
             'opponent_name': 'first',
             'team_name': 'first',
             'position': 'first',
-            'kickoff_time': 'first',
         })
 
         df_grouped = df.groupby(['player_id', 'GW']).agg(agg_dict).reset_index()
@@ -161,47 +187,36 @@ class HistoryBuilder:
             print(f"Current season cache {cache_path} not found. Run: python src/api/async_fpl.py")
             return None
 
-        with open(cache_path, 'r', encoding='utf-8') as f:
-            summaries = json.load(f)
-
-        rows = []
-        for pid_str, data in summaries.items():
-            pid = int(pid_str)
-            meta = player_meta.get(pid, {'team_name': 'UNKNOWN', 'position': 'MID'})
-
-            for hw in data.get('history', []):
-                row = {
-                    'player_id': pid,
-                    'GW': hw['round'],
-                    'season': season,
-                    'price': hw['value'] / 10.0,
-                    'was_home': hw['was_home'],
-                    'opponent_name': canon_team(team_names.get(hw['opponent_team'],
-                                                               str(hw['opponent_team']))),
-                    'team_name': meta['team_name'],
-                    'position': meta['position'],
-                    'kickoff_time': hw['kickoff_time'],
-                }
-                for col in self.rolling_cols:
-                    val = hw.get(col, 0)
-                    try:
-                        row[col] = float(val)
-                    except (ValueError, TypeError):
-                        row[col] = 0.0
-                rows.append(row)
-
-        df = pd.DataFrame(rows)
-        if df.empty:
-            return df
-
-        agg_dict = {col: 'sum' for col in self.rolling_cols}
+        # Read only the history columns used here, straight into a frame.
+        ensure_store(self.cache_dir, season, current_gw, cache_path)
+        df = read_table(self.cache_dir, season, current_gw, 'history',
+                        columns=['round', 'value', 'was_home', 'opponent_team',
+                                 'kickoff_time'] + self.rolling_cols)
+        if df.empty or 'round' not in df.columns:
+            return pd.DataFrame()
+
+        meta = pd.DataFrame.from_dict(player_meta, orient='index')
+        df = df.rename(columns={'round': 'GW'})
+        df['season'] = season
+        df['price'] = df['value'] / 10.0
+        opponent_names = {tid: canon_team(name) for tid, name in team_names.items()}
+        df['opponent_name'] = df['opponent_team'].map(opponent_names).fillna(
+            df['opponent_team'].astype(str))
+        df['team_name'] = df['player_id'].map(meta['team_name']).fillna('UNKNOWN')
+        df['position'] = df['player_id'].map(meta['position']).fillna('MID')
+        for col in self.rolling_cols:
+            if col not in df.columns:
+                df[col] = 0.0
+
+        df['kickoff_time'] = pd.to_datetime(df['kickoff_time'], errors='coerce', utc=True)
+        df['last_kickoff_time'] = df['kickoff_time']
+        agg_dict = dict(GAMEWEEK_AGG)
         agg_dict.update({
             'price': 'mean',
             'was_home': 'first',
             'opponent_name': 'first',
             'team_name': 'first',
             'position': 'first',
-            'kickoff_time': 'first',
         })
         df_grouped = df.groupby(['player_id', 'GW']).agg(agg_dict).reset_index()
         df_grouped['season'] = season
@@ -227,7 +242,6 @@ class HistoryBuilder:
 
         try:
             odds_client = OddsClient(cache_dir=self.cache_dir, raw_dir=self.raw_dir)
-            odds_client.download_historical_odds()
 
             odds_frames = []
             for season in df_all['season'].unique():
@@ -272,102 +286,154 @@ class HistoryBuilder:
                 df_all[col] = LEAGUE_DEFAULTS[col]
             return df_all
 
-    # ------------------------------------------------------------------
-    def build_features(self):
-        print("Building time-series dataset...")
+    def _download_odds(self):
+        """Fetch any historical odds CSVs not yet on disk; failures are left for next run."""
+        from src.api.odds import OddsClient
 
-        dfs = []
-        for season in ("2022-23", "2023-24"):
-            df_season = self._load_vaastav_season(season)
-            if df_season is not None:
-                dfs.append(df_season)
+        try:
+            OddsClient(cache_dir=self.cache_dir, raw_dir=self.raw_dir).download_historical_odds()
+        except Exception as e:
+            print(f"  Historical odds download failed: {e}. Will retry next build.")
 
-        df_curr = self._load_current_season()
-        if df_curr is not None and not df_curr.empty:
-            dfs.append(df_curr)
+    # ------------------------------------------------------------------
+    # Season partitions
+    # ------------------------------------------------------------------
+    def _partition_path(self, season):
+        return os.path.join(self.processed_dir, "historical_features", f"season={season}.parquet")
+
+    def _season_inputs(self, season, static=None):
+        """The raw files a season's partition is computed from."""
+        if season in HISTORICAL_SEASONS:
+            return [os.path.join(self.raw_dir, "vaastav", f"merged_gw_{season}.csv"),
+                    os.path.join(self.raw_dir, "odds", f"pl_odds_{season}.csv")]
+        gw = get_current_gw(static) if static else 0
+        return [os.path.join(self.raw_dir, "bootstrap_static.json"),
+                os.path.join(self.cache_dir, cache_filename(season, gw))]
 
-        if not dfs:
-            print("No data available.")
+    @staticmethod
+    def _inputs_hash(paths):
+        """Content hash of a partition's inputs and of the code that turns them into features."""
+        h = hashlib.sha256()
+        for path in FEATURE_SOURCES + list(paths):
+            digest = _file_digest(path) if os.path.exists(path) else 'missing'
+            h.update(f"{os.path.basename(path)}:{digest}\n".encode())
+        return h.hexdigest()
+
+    def _load_partition(self, season, digest):
+        """A cached partition whose inputs hash to `digest`, or None."""
+        path = self._partition_path(season)
+        meta_path = f"{path}.json"
+        if not (os.path.exists(path) and os.path.exists(meta_path)):
             return None
-
-        df_all = pd.concat(dfs, ignore_index=True)
-        df_all = df_all.sort_values(['season', 'player_id', 'GW']).reset_index(drop=True)
-
-        df_all['kickoff_time'] = pd.to_datetime(df_all['kickoff_time'], errors='coerce', utc=True)
+        with open(meta_path, 'r', encoding='utf-8') as f:
+            if json.load(f).get('inputs') != digest:
+                return None
+        return pd.read_parquet(path)
+
+    def _save_partition(self, season, df, digest):
+        path = self._partition_path(season)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        df.to_parquet(path, index=False)
+        # Written last: a partition without its sidecar is never trusted.
+        with open(f"{path}.json", 'w', encoding='utf-8') as f:
+            json.dump({'inputs': digest, 'rows': len(df)}, f)
+
+    def _season_features(self, df_season):
+        """Rolling features, targets and odds for ONE season's (player, GW) rows."""
+        df = df_season.sort_values(['season', 'player_id', 'GW']).reset_index(drop=True)
+        df['kickoff_time'] = pd.to_datetime(df['kickoff_time'], errors='coerce', utc=True)
 
         # Feature Engineering: Rolling Averages (STRICT ANTI-LEAKAGE)
-        # Predict GW N using only data from GW N-1, N-2, ... — so every rolling window
-        # is shifted by one before aggregating.
-        print("Calculating rolling features...")
-        grouped = df_all.groupby(['season', 'player_id'])
-
-        # Rest going INTO this gameweek (kickoff minus previous kickoff). Known before
-        # the match, so no leakage. The inference path must reproduce this definition
-        # using the UPCOMING fixture's kickoff, not the last completed one.
-        df_all['days_rest'] = (
-            df_all['kickoff_time'] - grouped['kickoff_time'].shift(1)
-        ).dt.total_seconds() / (24 * 3600)
-        df_all['days_rest'] = df_all['days_rest'].fillna(7.0)
-
-        df_all['benched'] = (df_all['starts'] == 0).astype(int)
-
-        new_features = {}
-        for col in self.rolling_cols + ['benched']:
-            new_features[f'{col}_last_1'] = grouped[col].shift(1)
-
-            if col == 'benched':
-                new_features[f'{col}_sum_last_3'] = grouped[col].apply(
-                    lambda x: x.shift(1).rolling(window=3, min_periods=1).sum()
-                ).reset_index(level=[0, 1], drop=True)
-                new_features[f'{col}_sum_last_5'] = grouped[col].apply(
-                    lambda x: x.shift(1).rolling(window=5, min_periods=1).sum()
-                ).reset_index(level=[0, 1], drop=True)
-            else:
-                new_features[f'{col}_mean_last_3'] = grouped[col].apply(
-                    lambda x: x.shift(1).rolling(window=3, min_periods=1).mean()
-                ).reset_index(level=[0, 1], drop=True)
-                new_features[f'{col}_mean_last_5'] = grouped[col].apply(
-                    lambda x: x.shift(1).rolling(window=5, min_periods=1).mean()
-                ).reset_index(level=[0, 1], drop=True)
-
-        for k, v in new_features.items():
-            df_all[k] = v
+        # Predict GW N using only data from GW N-1, N-2, ... — see src/features/rolling.py,
+        # which the inference path shares. `days_rest` is rest going INTO this gameweek
+        # (its first kickoff minus the previous gameweek's last), known before the match.
+        # Windows never cross a season boundary, which is what makes seasons independent.
+        rolling = rolling_features(df, ['season', 'player_id'], self.rolling_cols)
+        df[rolling.columns] = rolling
 
         # Target variables
-        df_all['target'] = df_all['total_points']
-        df_all['target_minutes'] = df_all['minutes']
+        df['target'] = df['total_points']
+        df['target_minutes'] = df['minutes']
 
-        print("Merging bookmaker odds features...")
-        df_all = self._merge_odds(df_all)
+        df = self._merge_odds(df)
 
         # Derive anytime_goal_scorer_prob from team_implied_goals + position
-        from src.api.odds import OddsClient
-        pos_str = df_all['position'].astype(str)
-        df_all['anytime_goal_scorer_prob'] = [
-            OddsClient.compute_anytime_scorer_prob(tig, pos)
-            for tig, pos in zip(df_all['team_implied_goals'], pos_str)
-        ]
+        from src.api.odds import anytime_scorer_probs
+        df['anytime_goal_scorer_prob'] = anytime_scorer_probs(
+            df['team_implied_goals'], df['position'])
 
-        num_cols = df_all.select_dtypes(include=[np.number]).columns
-        df_all[num_cols] = df_all[num_cols].fillna(0)
+        num_cols = df.select_dtypes(include=[np.number]).columns
+        df[num_cols] = df[num_cols].fillna(0)
 
-        # Categorical model features. `team_name` (not the unstable integer team id)
-        # is the canonical club key.
-        #
         # Fill BEFORE the string cast: astype(str) turns NaN into the literal 'nan',
         # which becomes a real category and silently pollutes the vocabulary.
-        cat_cols = ['position', 'team_name', 'opponent_name', 'was_home']
-        for c in cat_cols:
-            n_missing = int(df_all[c].isna().sum())
+        for c in CATEGORICAL_COLS:
+            n_missing = int(df[c].isna().sum())
             if n_missing:
                 print(f"  WARNING: {n_missing} missing value(s) in categorical '{c}' "
                       f"-> 'UNKNOWN'")
-            df_all[c] = df_all[c].fillna("UNKNOWN").astype(str).astype('category')
+            df[c] = df[c].fillna("UNKNOWN").astype(str)
+
+        return df.drop(columns=['kickoff_time', 'last_kickoff_time'])
+
+    # ------------------------------------------------------------------
+    def build_features(self):
+        """
+        Build data/processed/historical_features.parquet from per-season partitions.
+
+        Each season is computed independently (rolling windows never cross seasons) and
+        cached under data/processed/historical_features/ with a hash of its inputs. A
+        partition is rebuilt only when that hash changes — in practice the current
+        season when a new gameweek lands, or everything after a feature-code change.
+        """
+        print("Building time-series dataset...")
+
+        static = load_bootstrap(os.path.join(self.raw_dir, "bootstrap_static.json"))
+        seasons = list(HISTORICAL_SEASONS)
+        current = get_season_label(static) if static else None
+        if current and current not in seasons:
+            seasons.append(current)
+
+        # Before hashing: the odds CSVs are partition inputs. Downloading them only while
+        # building would cache a failed download's partition under a digest that never
+        # changes, and the download would never be retried.
+        self._download_odds()
+
+        parts = []
+        for season in seasons:
+            digest = self._inputs_hash(self._season_inputs(season, static))
+            part = self._load_partition(season, digest)
+            if part is not None:
+                print(f"  {season}: unchanged, {len(part)} rows from cache")
+                parts.append(part)
+                continue
+
+            if season in HISTORICAL_SEASONS:
+                df_season = self._load_vaastav_season(season)
+            else:
+                df_season = self._load_current_season()
+            if df_season is None or df_season.empty:
+                continue
+
+            print(f"  {season}: building rolling and odds features...")
+            part = self._season_features(df_season)
+            self._save_partition(season, part, digest)
+            parts.append(part)
+
+        if not parts:
+            print("No data available.")
+            return None
+
+        df_all = pd.concat(parts, ignore_index=True)
+
+        # Categorical model features. `team_name` (not the unstable integer team id)
+        # is the canonical club key. The vocabulary is fixed here, once, over all
+        # seasons; the model bundle carries it to serving (src/features/categorical.py).
+        encode_categoricals(df_all, fit_vocabulary(df_all, CATEGORICAL_COLS))
+        for c in CATEGORICAL_COLS:
             assert 'nan' not in set(df_all[c].cat.categories), (
                 f"'{c}' contains a literal 'nan' category — a NaN slipped through")
 
-        df_all = df_all.drop(columns=['benched', 'kickoff_time'])
-
         out_path = os.path.join(self.processed_dir, "historical_features.parquet")
         df_all.to_parquet(out_path, index=False)
         print(f"Saved {len(df_all)} rows to {out_path}")
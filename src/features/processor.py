@@ -12,6 +12,8 @@ from src.utils.season import (
     canon_team, ELEMENT_TYPE_TO_POSITION,
 )
 from src.utils.names import normalize_name_series
+from src.api.odds import LEAGUE_DEFAULTS, anytime_scorer_probs
+from src.features.fixtures import fixtures_long, team_horizons
 
 # Columns the cached parquet must contain to be considered current. Anything added to
 # the feature set below must be added here too, or a stale cache will be served and the
@@ -23,6 +25,16 @@ REQUIRED_CACHE_COLS = [
     'anytime_goal_scorer_prob', 'next_kickoff_time',
 ]
 
+ODDS_COLS = ['win_prob', 'draw_prob', 'loss_prob',
+             'team_implied_goals', 'opponent_implied_goals', 'clean_sheet_prob']
+
+# What a club's row holds when there is no upcoming fixture or no live odds for it.
+TEAM_DEFAULTS = {
+    'fixture_difficulty': 3, 'next_fixture_difficulty': 3.0, 'next_opponent': "-",
+    'opponent_name': "UNKNOWN", 'was_home': True,
+    **{col: LEAGUE_DEFAULTS[col] for col in ODDS_COLS},
+}
+
 
 class FeatureProcessor:
     def __init__(self, data_dir="data"):
@@ -138,82 +150,40 @@ class FeatureProcessor:
         merged['minutes_prob'] = merged['chance_of_playing_next_round'].fillna(100) / 100.0
 
         # 5. Canonical categoricals — MUST match history_builder's vocabulary.
-        team_names = team_id_to_name_from_df(fpl_teams)
-        merged['team_name'] = merged['team'].map(lambda t: canon_team(team_names.get(t, str(t))))
         merged['position'] = merged['element_type'].map(ELEMENT_TYPE_TO_POSITION).astype(str)
 
-        # team_code drives shirt images; it comes straight from the API and is correct
-        # for every club, including newly promoted ones.
-        merged['team_code'] = merged['team'].map(fpl_teams.set_index('id')['code'].to_dict())
-
-        # 6. Fixture Difficulty & Next Opponent
+        # 6. Everything that is a property of the club rather than the player — name,
+        # shirt code, next fixture, bookmaker odds — is assembled once per team and
+        # joined onto the players in a single merge.
         fixtures = self.load_fixtures()
-        if fixtures is not None:
-            match_data = self.calculate_fixture_difficulty(fixtures, fpl_teams)
-            merged['fixture_difficulty'] = merged['team'].map(
-                lambda x: match_data.get(x, {}).get('fixture_difficulty', 3))
-            merged['next_fixture_difficulty'] = merged['team'].map(
-                lambda x: match_data.get(x, {}).get('next_fixture_difficulty', 3.0))
-            merged['next_opponent'] = merged['team'].map(
-                lambda x: match_data.get(x, {}).get('next_opponent', "-"))
-            # Opponent as a NAME, not the per-season integer id — ids mean different
-            # clubs in different seasons and would not match the training vocabulary.
-            merged['opponent_name'] = merged['team'].map(
-                lambda x: canon_team(team_names.get(
-                    match_data.get(x, {}).get('opponent_team_id', 0), "UNKNOWN")))
-            merged['was_home'] = merged['team'].map(
-                lambda x: match_data.get(x, {}).get('is_home', True)).astype(str)
-            # Needed so the predictor can compute days_rest against the UPCOMING match
-            # rather than the gap between the last two completed ones.
-            merged['next_kickoff_time'] = merged['team'].map(
-                lambda x: match_data.get(x, {}).get('next_kickoff_time', None))
-        else:
-            merged['fixture_difficulty'] = 3
-            merged['next_fixture_difficulty'] = 3.0
-            merged['next_opponent'] = "-"
-            merged['opponent_name'] = "UNKNOWN"
-            merged['was_home'] = "True"
-            merged['next_kickoff_time'] = None
-
-        # ---------------------------------------------------------------
-        # Bookmaker Odds (optional, fallback-safe)
-        # ---------------------------------------------------------------
-        odds_cols = ['win_prob', 'draw_prob', 'loss_prob',
-                     'team_implied_goals', 'opponent_implied_goals', 'clean_sheet_prob']
+        match_data = (self.calculate_fixture_difficulty(fixtures, fpl_teams)
+                      if fixtures is not None else {})
+        live_odds = None
         try:
-            from src.api.odds import OddsClient, LEAGUE_DEFAULTS
-
-            odds_client = OddsClient()
-            live_odds = odds_client.get_current_odds()
-
-            for col in odds_cols:
-                merged[col] = LEAGUE_DEFAULTS[col]
-
-            if live_odds:
-                # Live odds are keyed by the bookmaker's team naming; canonicalise both
-                # sides before looking up.
-                live_canon = {canon_team(k): v for k, v in live_odds.items()}
-                hits = 0
-                for idx, row in merged.iterrows():
-                    odds_data = live_canon.get(row['team_name'])
-                    if odds_data:
-                        hits += 1
-                        for col in odds_cols:
-                            merged.at[idx, col] = odds_data.get(col, LEAGUE_DEFAULTS[col])
-                print(f"  Odds: live data applied to {hits}/{len(merged)} rows")
-            else:
-                print("  Odds: no live data, using league defaults "
-                      "(set ODDS_API_KEY for live odds)")
-
-            merged['anytime_goal_scorer_prob'] = merged.apply(
-                lambda r: OddsClient.compute_anytime_scorer_prob(
-                    r['team_implied_goals'], r['position']), axis=1)
+            from src.api.odds import OddsClient
+            live_odds = OddsClient().get_current_odds()
         except Exception as e:
             print(f"Odds integration skipped: {e}")
-            from src.api.odds import LEAGUE_DEFAULTS
-            for col in odds_cols:
-                merged[col] = LEAGUE_DEFAULTS[col]
-            merged['anytime_goal_scorer_prob'] = LEAGUE_DEFAULTS['anytime_goal_scorer_prob']
+        if live_odds is not None and not live_odds:
+            print("  Odds: no live data, using league defaults "
+                  "(set ODDS_API_KEY for live odds)")
+
+        teams = self.team_frame(fpl_teams, match_data, live_odds)
+        merged = merged.drop(columns=[c for c in teams.columns if c != 'team'
+                                      and c in merged.columns])
+        merged = merged.merge(teams, on='team', how='left', validate='many_to_one')
+        # A team id the bootstrap does not list: keep the id as its name, defaults
+        # for the rest.
+        merged['team_name'] = merged['team_name'].fillna(
+            merged['team'].astype(str).map(canon_team))
+        merged = merged.fillna(TEAM_DEFAULTS)
+        merged['was_home'] = merged['was_home'].astype(str)
+        hits = merged.pop('_live_odds').fillna(False).astype(bool).sum()
+        if live_odds:
+            print(f"  Odds: live data applied to {hits}/{len(merged)} rows")
+
+        merged['anytime_goal_scorer_prob'] = anytime_scorer_probs(
+            merged['team_implied_goals'], merged['position'])
 
         features = [
             'id', 'web_name', 'team', 'team_name', 'team_code', 'element_type', 'position',
@@ -252,63 +222,77 @@ class FeatureProcessor:
             return pd.read_json(path)
         return None
 
+    @staticmethod
+    def team_frame(teams_df, match_data, live_odds=None):
+        """
+        One row per club (keyed by `team`) with every per-team feature the player
+        frame needs: canonical name, shirt code, next-fixture columns from
+        `match_data` (calculate_fixture_difficulty's output) and bookmaker odds from
+        `live_odds` ({bookmaker team name: odds}). Anything missing takes its
+        TEAM_DEFAULTS value; `_live_odds` flags the rows the odds came from.
+        """
+        teams = pd.DataFrame({
+            'team': teams_df['id'].to_numpy(),
+            'team_name': [canon_team(n) for n in teams_df['name']],
+            # team_code drives shirt images; it comes straight from the API and is
+            # correct for every club, including newly promoted ones.
+            'team_code': teams_df['code'].to_numpy(),
+        })
+
+        # next_kickoff_time lets the predictor compute days_rest against the UPCOMING
+        # match rather than the gap between the last two completed ones.
+        fixture_cols = ['fixture_difficulty', 'next_fixture_difficulty', 'next_opponent',
+                        'opponent_team_id', 'is_home', 'next_kickoff_time']
+        fix = pd.DataFrame.from_dict(match_data, orient='index').reindex(columns=fixture_cols)
+        fix = fix.rename(columns={'is_home': 'was_home'})
+        teams = teams.merge(fix, left_on='team', right_index=True, how='left')
+        # Opponent as a NAME, not the per-season integer id — ids mean different clubs
+        # in different seasons and would not match the training vocabulary.
+        names = teams.set_index('team')['team_name']
+        teams['opponent_name'] = teams.pop('opponent_team_id').map(names)
+
+        # Live odds are keyed by the bookmaker's team naming; canonicalise before joining.
+        odds = pd.DataFrame.from_dict(
+            {canon_team(k): v for k, v in (live_odds or {}).items()}, orient='index',
+        ).reindex(columns=ODDS_COLS)
+        teams = teams.merge(odds, left_on='team_name', right_index=True, how='left')
+        teams['_live_odds'] = teams['team_name'].isin(odds.index)
+
+        return teams.fillna(TEAM_DEFAULTS).infer_objects()
+
     def calculate_fixture_difficulty(self, fixtures_df, teams_df, next_n=5):
+        """
+        {team id: next-fixture summary} for every club in `teams_df`, read off the
+        fixture engine's long table (src/features/fixtures.py).
+        """
         team_map = teams_df.set_index('id')['short_name'].to_dict()
         team_ids = teams_df['id'].tolist()
-
-        future = fixtures_df[fixtures_df['finished'] == False].sort_values('kickoff_time')
+        h = team_horizons(fixtures_long(fixtures_df), team_ids, horizons=(1, next_n))
+        mean_col, count_col = f'difficulty_next_{next_n}', f'fixtures_next_{next_n}'
 
         team_data = {}
-        for team_id in team_ids:
-            matches = future[
-                (future['team_h'] == team_id) | (future['team_a'] == team_id)
-            ].head(next_n)
-
-            diff_sum = 0
-            count = 0
-            next_opp_str = "-"
-            next_opp_id = 0
-            next_is_home = True
-            next_kickoff = None
-
-            for i, (_, match) in enumerate(matches.iterrows()):
-                is_home = (match['team_h'] == team_id)
-                opp_id = match['team_a'] if is_home else match['team_h']
-                opp_name = team_map.get(opp_id, "?")
-                difficulty = match['team_h_difficulty'] if is_home else match['team_a_difficulty']
-
-                if i == 0:
-                    venue = "(H)" if is_home else "(A)"
-                    next_opp_str = f"{opp_name} {venue}"
-                    next_opp_id = opp_id
-                    next_is_home = is_home
-                    next_kickoff = match.get('kickoff_time')
-                    next_difficulty = float(difficulty)
-
-                diff_sum += difficulty
-                count += 1
-
+        for team_id, row in zip(team_ids, h.itertuples(index=False)):
+            has_next = getattr(row, count_col) > 0
+            if has_next:
+                venue = "(H)" if row.next_is_home else "(A)"
+                next_opp = f"{team_map.get(row.next_opponent_id, '?')} {venue}"
+            kickoff = row.next_kickoff_time if has_next else None
             team_data[team_id] = {
                 # Mean over the next N fixtures — the run ahead, used for display.
-                'fixture_difficulty': diff_sum / count if count > 0 else 3,
+                'fixture_difficulty': getattr(row, mean_col) if has_next else 3,
                 # Difficulty of the IMMEDIATE next fixture. The 5-fixture mean is the
                 # wrong quantity for a single-gameweek projection: a great next match
                 # gets averaged away by four bad ones behind it.
-                'next_fixture_difficulty': next_difficulty if count > 0 else 3.0,
-                'next_opponent': next_opp_str,
-                'opponent_team_id': next_opp_id,
-                'is_home': next_is_home,
-                'next_kickoff_time': str(next_kickoff) if next_kickoff is not None else None,
+                'next_fixture_difficulty': float(row.difficulty_next_1) if has_next else 3.0,
+                'next_opponent': next_opp if has_next else "-",
+                'opponent_team_id': row.next_opponent_id if has_next else 0,
+                'is_home': bool(row.next_is_home) if has_next else True,
+                'next_kickoff_time': str(kickoff) if not pd.isna(kickoff) else None,
             }
 
         return team_data
 
 
-def team_id_to_name_from_df(teams_df):
-    """{id: name} from a teams DataFrame (bootstrap `teams`)."""
-    return teams_df.set_index('id')['name'].to_dict()
-
-
 if __name__ == "__main__":
     processor = FeatureProcessor()
     processor.process(force_refresh=True)
@@ -0,0 +1,171 @@
+"""
+Rolling form features — the one implementation shared by training and inference.
+
+history_builder (training) and PointsPredictor (inference) used to compute these by
+different routes: a per-column `groupby().apply(shift().rolling())` over the long
+frame, and a Python loop over element-summary JSON. Any drift between the two meant
+the model was scored on features it was not trained on. Both now call
+`rolling_features`, so parity holds by construction:
+
+  * training runs it over every (season, player, gameweek) row;
+  * inference runs it over each player's history plus one placeholder row for the
+    gameweek being predicted, and reads that row — exactly what training would
+    have seen for it.
+
+The computation is vectorised: one cumulative sum over the sorted frame, and each
+shifted window is a difference of two cumsum rows clipped at the group start.
+"""
+
+import numpy as np
+import pandas as pd
+
+ROLLING_COLS = [
+    'minutes', 'total_points', 'expected_goals', 'expected_assists',
+    'expected_goal_involvements', 'expected_goals_conceded',
+    'bps', 'influence', 'creativity', 'threat', 'starts',
+]
+
+WINDOWS = (3, 5)
+
+# Rest assumed when there is no previous match to measure from.
+DEFAULT_REST_DAYS = 7.0
+
+# How a double gameweek's matches collapse into one row: stats summed, and both the
+# first and the last kickoff kept — rest INTO the gameweek is measured from its first
+# match, rest AFTER it from its last.
+GAMEWEEK_AGG = {**{col: 'sum' for col in ROLLING_COLS},
+                'kickoff_time': 'min', 'last_kickoff_time': 'max'}
+
+
+def rolling_feature_names(cols=ROLLING_COLS):
+    names = []
+    for col in cols:
+        names += [f'{col}_last_1'] + [f'{col}_mean_last_{w}' for w in WINDOWS]
+    names += ['benched_last_1'] + [f'benched_sum_last_{w}' for w in WINDOWS]
+    return names + ['days_rest']
+
+
+def _datetimes(series):
+    """A kickoff column as naive-UTC datetime64 (NaT where missing or unparseable)."""
+    if not pd.api.types.is_datetime64_any_dtype(series):
+        series = pd.to_datetime(series, errors='coerce', utc=True)
+    if getattr(series.dt, 'tz', None) is not None:
+        series = series.dt.tz_convert('UTC').dt.tz_localize(None)
+    return series.to_numpy(dtype='datetime64[ns]')
+
+
+def rolling_features(df, group_cols, cols=ROLLING_COLS):
+    """
+    Shifted rolling features for every row of `df`, aligned to its index.
+
+    `df` must hold one row per (group, gameweek), sorted by `group_cols` and then
+    gameweek. Row i sees only the rows before it in its own group (strict
+    anti-leakage: GW N is described by GW N-1, N-2, ...):
+
+        {col}_last_1            previous gameweek's value
+        {col}_mean_last_{w}     mean over up to w previous gameweeks
+        benched_sum_last_{w}    previous gameweeks with starts == 0
+        days_rest               this row's first kickoff minus the previous row's last
+
+    Missing values are skipped inside a window, as pandas' rolling does. Rows with no
+    history are filled: 0.0 for stats, DEFAULT_REST_DAYS for rest.
+    """
+    n = len(df)
+    idx = np.arange(n)
+    codes = df.groupby(group_cols, sort=False).ngroup().to_numpy()
+    new_group = np.ones(n, dtype=bool)
+    new_group[1:] = codes[1:] != codes[:-1]
+    group_start = np.maximum.accumulate(np.where(new_group, idx, 0)) if n else idx
+    has_prev = idx > group_start
+
+    values = df[cols].to_numpy(dtype=float)
+    starts = df['starts'].to_numpy(dtype=float)
+    values = np.column_stack([values, (starts == 0).astype(float)])
+    names = list(cols) + ['benched']
+
+    valid = ~np.isnan(values)
+    zeros = np.zeros((1, values.shape[1]))
+    csum = np.vstack([zeros, np.cumsum(np.where(valid, values, 0.0), axis=0)])
+    ccount = np.vstack([zeros, np.cumsum(valid, axis=0)])
+
+    out = {}
+    prev = values[np.maximum(idx - 1, 0)]
+    last_1 = np.where(has_prev[:, None] & valid[np.maximum(idx - 1, 0)], prev, 0.0)
+    for w in WINDOWS:
+        lo = np.maximum(idx - w, group_start)
+        total = csum[idx] - csum[lo]
+        count = ccount[idx] - ccount[lo]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = np.where(count > 0, total / np.maximum(count, 1), 0.0)
+        for j, col in enumerate(names):
+            if col == 'benched':
+                out[f'benched_sum_last_{w}'] = np.where(count[:, j] > 0, total[:, j], 0.0)
+            else:
+                out[f'{col}_mean_last_{w}'] = mean[:, j]
+    for j, col in enumerate(names):
+        out[f'{col}_last_1'] = last_1[:, j]
+
+    first_ko = _datetimes(df['kickoff_time'])
+    last_ko = _datetimes(df['last_kickoff_time'] if 'last_kickoff_time' in df.columns
+                         else df['kickoff_time'])
+    rest = (first_ko - last_ko[np.maximum(idx - 1, 0)]) / np.timedelta64(1, 'D')
+    rest = np.where(has_prev, np.maximum(rest, 0.0), np.nan)
+    out['days_rest'] = np.where(np.isnan(rest), DEFAULT_REST_DAYS, rest)
+
+    return pd.DataFrame(out, index=df.index)[rolling_feature_names(cols)]
+
+
+def collapse_gameweeks(history, group_cols=('player_id',), gw_col='round'):
+    """
+    One row per (group, gameweek) from per-match rows, using GAMEWEEK_AGG — the same
+    collapse the training loaders apply. Stats missing from `history` count as zero.
+    """
+    history = history.copy()
+    for col in ROLLING_COLS:
+        if col not in history.columns:
+            history[col] = 0.0
+        history[col] = pd.to_numeric(history[col], errors='coerce').fillna(0.0)
+    if 'kickoff_time' not in history.columns:
+        history['kickoff_time'] = None
+    history['kickoff_time'] = pd.to_datetime(history['kickoff_time'], errors='coerce', utc=True)
+    history['last_kickoff_time'] = history['kickoff_time']
+    return (history.groupby(list(group_cols) + [gw_col], sort=True)
+                   .agg(GAMEWEEK_AGG).reset_index())
+
+
+def next_gameweek_features(history, upcoming):
+    """
+    Inference: features for the gameweek about to be played, per player.
+
+    `history` holds per-match rows (player_id, round, kickoff_time, stats...);
+    `upcoming` maps every player to score onto their next kickoff (or None for a blank
+    gameweek). Each player gets a placeholder row after their last gameweek carrying
+    only that kickoff, and the placeholder's features are returned — one row per
+    player in `upcoming`, with an `id` column.
+
+    With no upcoming fixture, rest is the player's last observed gap instead.
+    """
+    ids = np.array(list(upcoming.keys()), dtype='int64')
+    played = collapse_gameweeks(history[history['player_id'].isin(ids)]) if len(history) else None
+
+    placeholder = pd.DataFrame({'player_id': ids, 'round': np.inf,
+                                'kickoff_time': pd.to_datetime(list(upcoming.values()),
+                                                               errors='coerce', utc=True)})
+    placeholder['last_kickoff_time'] = placeholder['kickoff_time']
+    for col in ROLLING_COLS:
+        placeholder[col] = 0.0
+    placeholder['_placeholder'] = True
+
+    frame = pd.concat([played, placeholder], ignore_index=True) if played is not None \
+        else placeholder
+    frame['_placeholder'] = frame['_placeholder'].fillna(False).astype(bool)
+    frame = frame.sort_values(['player_id', 'round'], kind='stable').reset_index(drop=True)
+
+    feats = rolling_features(frame, ['player_id'])
+    blank = frame['kickoff_time'].isna() & frame['_placeholder'] & \
+        frame['player_id'].eq(frame['player_id'].shift(1))
+    feats.loc[blank, 'days_rest'] = feats['days_rest'].shift(1)[blank]
+
+    out = feats[frame['_placeholder'].to_numpy()].copy()
+    out.insert(0, 'id', frame.loc[frame['_placeholder'], 'player_id'].to_numpy())
+    return out.reset_index(drop=True)
@@ -25,12 +25,14 @@ except Exception as _e:  # never let a reload guard take the app down
     CODE_VERSION = 0.0
 
 from src.api.fpl import FPLClient
-from src.api.async_fpl import refresh_cache
+from src.api.async_fpl import refresh_cache, fetch_manager_context_sync
+from src.api.league import crawl_league_sync, league_ownership
 from src.features.processor import FeatureProcessor
 from src.model.predictor import PointsPredictor
-from src.optimization.solver import TransferOptimizer
+from src.optimization.solver import BENCH_WEIGHT, INCLUSION_COST_CAP, TransferOptimizer
 from src.optimization.team_selection import select_starting_xi, squad_expected_points, pick_captain
 from src.optimization.chips import ChipStrategy
+from src.optimization.simulation import simulate_squad, summarise
 from src.analysis.rivals import RivalSpy
 from src.interface.pitch_view import render_pitch_view, resolve_player_image
 from src.utils.season import load_bootstrap, get_season_label, get_next_gw, is_preseason
@@ -68,6 +70,13 @@ def get_league_members(code_version, league_id):
     return FPLClient().get_league_members(league_id)
 
 
+@st.cache_data(ttl=CACHE_TTL, show_spinner=False)
+def get_league_ownership(code_version, league_id, gw):
+    """Ownership / effective ownership / captaincy across every member of a league."""
+    tables = crawl_league_sync(league_id, gw)
+    return league_ownership(tables['members'], tables['picks']), len(tables['members'])
+
+
 @st.cache_data(ttl=CACHE_TTL, show_spinner=False)
 def describe_entry(code_version, team_id):
     """('Manager Name', 'Team Name') for a team id, or None if it does not exist."""
@@ -99,12 +108,8 @@ def get_predictions(code_version):
 @st.cache_data(ttl=CACHE_TTL, show_spinner=False)
 def get_squad_context(code_version, team_id, gw):
     """History, Free Hit GWs, current picks and free-transfer count for a manager."""
-    fpl = FPLClient()
-    history = fpl.get_history(team_id) or {}
-    freehit_gws = fpl.get_freehit_gws(team_id, history)
-    picks = fpl.get_team_picks(team_id, gw, freehit_gws=freehit_gws)
-    fts = fpl.calculate_free_transfers(team_id, gw, history)
-    return history, sorted(freehit_gws), picks, fts
+    ctx = fetch_manager_context_sync(team_id, gw)
+    return ctx['history'], sorted(ctx['freehit_gws']), ctx['picks'], ctx['free_transfers']
 
 
 @st.cache_data(ttl=CACHE_TTL, show_spinner=False)
@@ -125,6 +130,16 @@ def build_transfer_plan(code_version, current_ids, budget, free_transfers):
         df, list(current_ids), free_transfers=free_transfers)
 
 
+@st.cache_data(ttl=CACHE_TTL, show_spinner=False)
+def simulate_current_squad(code_version, squad_ids):
+    """10,000 simulated gameweeks for a squad: total, Bench Boost and Triple Captain gains."""
+    df, _, _, _ = get_predictions(CODE_VERSION)
+    if df is None:
+        return None
+    # Fixed seed: the quoted percentiles should not wobble between reruns.
+    return simulate_squad(df[df['id'].isin(squad_ids)], seed=0)
+
+
 @st.cache_data(ttl=CACHE_TTL, show_spinner=False)
 def explain_player(code_version, player_id, budget):
     """Why a given player is in, or out of, the optimal squad."""
@@ -151,6 +166,19 @@ def explain_player(code_version, player_id, budget):
     }
 
 
+@st.cache_data(ttl=CACHE_TTL, show_spinner=False)
+def price_every_player(code_version, budget):
+    """explain_player's cost for the whole player list, as one sortable table."""
+    df, _, _, _ = get_predictions(CODE_VERSION)
+    if df is None:
+        return None
+    costs = TransferOptimizer(budget=budget).inclusion_costs(df)
+    if costs is None:
+        return None
+    return df.loc[costs.index, ['web_name', 'position', 'team_name', 'price',
+                                'predicted_points']].join(costs[['cost_to_own', 'exact']])
+
+
 def render_player_inspector(df, budget, key):
     """
     "Why isn't X in my squad?" — the question a team sheet cannot answer.
@@ -166,6 +194,25 @@ def render_player_inspector(df, budget, key):
         }
         chosen = st.selectbox("Player", list(labels.keys()), key=f"inspect_{key}")
 
+        if st.button("Price every player", key=f"price_all_{key}"):
+            with st.spinner("Solving for every player..."):
+                table = price_every_player(CODE_VERSION, budget)
+            if table is None:
+                st.warning("Could not price the player list.")
+            else:
+                st.caption("Cost to own: points lost by forcing the player in, bench "
+                           f"counted at {BENCH_WEIGHT:.0%}. Costs of "
+                           f"{INCLUSION_COST_CAP:.0f}+ are shown as that floor.")
+                st.dataframe(
+                    table.sort_values('cost_to_own')[
+                        ['web_name', 'position', 'team_name', 'price', 'predicted_points',
+                         'cost_to_own']],
+                    column_config={"cost_to_own": st.column_config.NumberColumn(
+                        "Cost to own", format="%.2f")},
+                    hide_index=True,
+                    use_container_width=True,
+                )
+
         info = explain_player(CODE_VERSION, labels[chosen], budget)
         if not info:
             st.warning("Could not evaluate that player.")
@@ -462,12 +509,14 @@ with tab1:
         wc_xi_xp = squad_expected_points(wc_starters, wc_cap['id'] if wc_cap is not None else None)
         wc_diff = wc_xi_xp - current_xi_xp
 
+    outcomes = simulate_current_squad(CODE_VERSION, tuple(current_ids))
     chip_recs = ChipStrategy(team_id, history).analyze(
         current_starters, current_bench, gw,
         wildcard_diff=wc_diff,
         freehit_diff=wc_diff,  # a Free Hit is a one-week Wildcard
         active_players=active_count,
         current_xi_xp=current_xi_xp,
+        outcomes=outcomes,
     )
 
     with st.expander(f"💡 AI Chip Strategy Advisor (GW {gw})", expanded=True):
@@ -486,6 +535,12 @@ with tab1:
                 else:
                     st.error(rec['reason'])
 
+        if outcomes is not None and len(outcomes):
+            spread = summarise(outcomes['total'])
+            st.caption(f"Simulated GW score for your current squad (auto-subs included): "
+                       f"median {spread['p50']:.0f}, 10th–90th percentile "
+                       f"{spread['p10']:.0f}–{spread['p90']:.0f} pts.")
+
         if wc_squad is not None:
             with st.expander("👀 View AI's Ideal Wildcard/Free Hit Squad"):
                 st.caption(f"Projected XI: {wc_xi_xp:.1f} XP (vs current {current_xi_xp:.1f} XP)")
@@ -626,6 +681,29 @@ with tab4:
     rival_members = get_league_members(CODE_VERSION, int(spy_league_id)) if spy_league_id.isdigit() else {}
     rival_map = {name: entry for name, entry in rival_members.items() if entry != team_id}
 
+    if spy_league_id.isdigit() and gw > 1 and st.button("Scan the whole league"):
+        # Picks for the last deadline that has passed — the ones everyone is now locked into.
+        with st.spinner("Crawling every member's squad..."):
+            try:
+                own, n_members = get_league_ownership(CODE_VERSION, int(spy_league_id), int(gw) - 1)
+            except RuntimeError as e:
+                own, n_members = None, 0
+                st.error(f"League scan failed: {e}")
+        if own is not None and not own.empty:
+            own = own.merge(df[['id', 'web_name', 'predicted_points']],
+                            left_on='element', right_on='id', how='left')
+            st.caption(f"GW{int(gw) - 1} squads of {n_members} managers")
+            st.dataframe(
+                own.head(25)[['web_name', 'ownership', 'effective_ownership', 'captaincy',
+                              'predicted_points']],
+                column_config={c: st.column_config.ProgressColumn(c.replace('_', ' ').title(),
+                                                                  min_value=0, max_value=1,
+                                                                  format="%.2f")
+                               for c in ('ownership', 'captaincy')},
+                hide_index=True,
+                use_container_width=True,
+            )
+
     if not rival_map:
         st.info("No other managers found in this league yet.")
     else:
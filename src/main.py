@@ -10,8 +10,8 @@ from src.api.fpl import FPLClient
 from src.api.understat import UnderstatClient
 from src.api.async_fpl import refresh_cache
 from src.features.processor import FeatureProcessor
-from src.model.predictor import PointsPredictor
-from src.optimization.solver import TransferOptimizer
+from src.model.predictor import INFERENCE_BACKENDS, PointsPredictor
+from src.optimization.solver import BACKENDS, TransferOptimizer
 from src.optimization.team_selection import select_starting_xi, pick_captain
 from src.interface.reporter import ReportGenerator
 from src.utils.season import load_bootstrap, get_next_gw, get_season_label
@@ -25,6 +25,12 @@ def main():
     parser.add_argument("--team_id", type=int, help="FPL Team ID to optimize for")
     parser.add_argument("--budget", type=float, default=100.0, help="Budget in £m")
     parser.add_argument("--bank", type=float, default=0.0, help="Money in the bank, £m")
+    parser.add_argument("--horizon", type=int, default=1,
+                        help="Gameweeks to plan transfers over (1 = this gameweek only)")
+    parser.add_argument("--solver", choices=BACKENDS, default="cbc",
+                        help="Single-gameweek MILP backend (highs solves in process via scipy)")
+    parser.add_argument("--inference", choices=INFERENCE_BACKENDS, default="lightgbm",
+                        help="Model evaluation at serving time (compiled walks numpy tree arrays)")
     args = parser.parse_args()
 
     fpl = FPLClient()
@@ -60,14 +66,14 @@ def main():
 
     # 3. Predict Points
     print("Predicting points...")
-    predictor = PointsPredictor()
+    predictor = PointsPredictor(backend=args.inference)
     df_scored = predictor.predict(df_features)
     if predictor.prediction_mode == "fallback":
         print("WARNING: running on the heuristic fallback, not the ML model.")
 
     # 4. Optimize
     print("Optimizing team...")
-    optimizer = TransferOptimizer(budget=args.budget)
+    optimizer = TransferOptimizer(budget=args.budget, backend=args.solver)
     transfers_made = []
     best_team = None
 
@@ -93,6 +99,12 @@ def main():
             best_team = optimizer.recommend_transfers(
                 df_scored, current_ids, free_transfers=free_transfers)
 
+            if args.horizon > 1:
+                print(f"Planning transfers over the next {args.horizon} gameweeks...")
+                points_by_gw = predictor.predict_horizon(df_features, args.horizon)
+                optimizer.plan_transfers(df_scored, points_by_gw, current_ids,
+                                         free_transfers=free_transfers)
+
             if best_team is not None:
                 new_ids = best_team['id'].tolist()
                 out_ids = [pid for pid in current_ids if pid not in new_ids]
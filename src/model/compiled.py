@@ -0,0 +1,181 @@
+"""
+A LightGBM booster compiled to flat numpy arrays, for serving without LightGBM.
+
+`Booster.predict` on a pandas frame re-casts every categorical feature
+(`astype(str).astype('category')`), recodes it against the booster's
+`pandas_categorical` and converts the frame to a matrix before walking the trees. At
+serving sizes (a few thousand rows) that overhead is most of the call. `CompiledBooster`
+reads the trees once from `dump_model()` into arrays. Categorical features are encoded
+straight to their integer codes against the same vocabulary. Each input column is then
+compared against all of its splits in one broadcast, and every row walks every tree
+together, one depth level per numpy step.
+
+The decision rules are LightGBM's own (`Tree::NumericalDecision` and
+`Tree::CategoricalDecision`), so the predictions match `Booster.predict` to floating-point
+rounding, missing values and unseen categories included. Only single-output regression
+boosters are supported, because that is what PointsPredictor and MinutesPredictor train.
+"""
+
+import weakref
+
+import numpy as np
+import pandas as pd
+
+from src.features.categorical import category_codes
+
+# LightGBM's missing_type per split, and its zero tolerance for MissingType::Zero.
+_MISSING_NONE, _MISSING_ZERO, _MISSING_NAN = 0, 1, 2
+_MISSING_TYPES = {'None': _MISSING_NONE, 'Zero': _MISSING_ZERO, 'NaN': _MISSING_NAN}
+_ZERO_THRESHOLD = 1e-35
+
+# Rows evaluated together. The split-direction matrix is (nodes x rows) booleans, ~9k
+# nodes for the points model, so this caps it at a few tens of MB on a large batch.
+CHUNK_ROWS = 4096
+
+
+class CompiledBooster:
+    def __init__(self, booster):
+        model = booster.dump_model()
+        if model['objective'].split()[0] != 'regression' or model['num_tree_per_iteration'] != 1:
+            raise ValueError(f"Only single-output regression boosters can be compiled, "
+                             f"not {model['objective']!r}")
+
+        self.feature_names = list(model['feature_names'])
+        # Categorical features are those LightGBM recorded category values for; their
+        # vocabularies are pandas_categorical, in feature order.
+        categorical = [name for name in self.feature_names
+                       if model['feature_infos'].get(name, {}).get('values')]
+        vocabularies = model.get('pandas_categorical') or []
+        if len(vocabularies) != len(categorical):
+            raise ValueError(f"{len(categorical)} categorical features but "
+                             f"{len(vocabularies)} category lists in the booster")
+        self.categories = {name: pd.Index([str(v) for v in vocab])
+                           for name, vocab in zip(categorical, vocabularies)}
+
+        # Flatten every tree into one node table. Leaves are nodes too, looping back to
+        # themselves, so a fixed number of steps (the deepest tree's depth) takes every
+        # row of every tree to its leaf without tracking which walks have finished.
+        feature, threshold, default_left, missing, value = [], [], [], [], []
+        children, categories, depth = [], [], [0]
+
+        def add(node, level):
+            i = len(feature)
+            feature.append(-1)
+            threshold.append(np.inf)
+            default_left.append(True)
+            missing.append(_MISSING_NONE)
+            categories.append(None)
+            value.append(node.get('leaf_value', 0.0))
+            children.append([i, i])
+            if 'leaf_value' in node:
+                depth[0] = max(depth[0], level)
+                return i
+            feature[i] = node['split_feature']
+            default_left[i] = node['default_left']
+            missing[i] = _MISSING_TYPES[node['missing_type']]
+            if node['decision_type'] == '==':
+                categories[i] = [int(c) for c in str(node['threshold']).split('||')]
+            else:
+                threshold[i] = float(node['threshold'])
+            children[i] = [add(node['left_child'], level + 1),
+                           add(node['right_child'], level + 1)]
+            return i
+
+        self.roots = np.array([add(tree['tree_structure'], 0) for tree in model['tree_info']])
+        self.depth = depth[0]
+        self.n_nodes = len(feature)
+        self.value = np.array(value)
+        # children[2 * node + goes_right]
+        self.children = np.array(children, dtype=np.intp).ravel()
+
+        # Every split, grouped by the feature it reads, so each input column is compared
+        # against all of its thresholds (or category sets) in one broadcast.
+        feature, threshold = np.array(feature), np.array(threshold)
+        default_left, missing = np.array(default_left, dtype=bool), np.array(missing)
+        self._splits = []
+        for f in range(len(self.feature_names)):
+            on_f = feature == f
+            is_cat = np.array([c is not None for c in categories]) & on_f
+            numeric = np.flatnonzero(on_f & ~is_cat)
+            categorical = np.flatnonzero(is_cat)
+            # Category sets as one row per split; the extra last column is the code
+            # NaN, negative and unseen values map to, which is in no set.
+            width = max((max(categories[i]) for i in categorical), default=-1) + 2
+            outside = np.ones((len(categorical), width), dtype=bool)
+            for row, i in enumerate(categorical):
+                outside[row, categories[i]] = False
+            special = (missing[numeric] != _MISSING_NONE).any()
+            self._splits.append((numeric, threshold[numeric, None],
+                                 missing[numeric, None] if special else None,
+                                 ~default_left[numeric, None], categorical, outside))
+
+    def encode(self, frame):
+        """
+        `frame`'s features as a float matrix in booster order. Categorical columns become
+        their codes in the booster's vocabulary; unseen values and NaN become NaN, as
+        they do when LightGBM recodes a pandas categorical.
+        """
+        X = np.empty((len(frame), len(self.feature_names)))
+        for j, name in enumerate(self.feature_names):
+            vocab = self.categories.get(name)
+            if vocab is None:
+                X[:, j] = frame[name].to_numpy(dtype=float, na_value=np.nan)
+            else:
+                X[:, j] = category_codes(frame[name], vocab)
+        return X
+
+    def predict(self, frame):
+        """Raw predictions for a DataFrame carrying every feature column."""
+        return self.predict_array(self.encode(frame))
+
+    def predict_array(self, X):
+        """Raw predictions for an already-encoded matrix, as from encode()."""
+        X = np.asarray(X, dtype=float)
+        if len(X) > CHUNK_ROWS:
+            return np.concatenate([self._predict_chunk(X[i:i + CHUNK_ROWS])
+                                   for i in range(0, len(X), CHUNK_ROWS)])
+        return self._predict_chunk(X)
+
+    def _predict_chunk(self, X):
+        n = len(X)
+
+        # 1. Which way every split sends every row: one (splits x rows) matrix.
+        goes_right = np.zeros((self.n_nodes, n), dtype=bool)
+        for x, (numeric, threshold, missing, missing_right, categorical, outside) in zip(
+                X.T, self._splits):
+            nan = np.isnan(x)
+            if len(numeric):
+                # Tree::NumericalDecision: NaN reads as 0 unless the split's
+                # missing_type is NaN; a missing value takes the default direction.
+                x0 = np.where(nan, 0.0, x)
+                right = x0 > threshold
+                if missing is not None:
+                    is_missing = np.where(missing == _MISSING_NAN, nan,
+                                          (missing == _MISSING_ZERO)
+                                          & (np.abs(x0) <= _ZERO_THRESHOLD))
+                    right = np.where(is_missing, missing_right, right)
+                goes_right[numeric] = right
+            if len(categorical):
+                # Tree::CategoricalDecision: NaN, negative and unseen codes go right.
+                last = outside.shape[1] - 1
+                code = np.where(nan | (x < 0) | (x >= last), last, x).astype(np.intp)
+                goes_right[categorical] = outside[:, code]
+
+        # 2. Walk every tree for every row at once, one level per step.
+        flat = goes_right.ravel()
+        rows = np.arange(n)
+        node = np.repeat(self.roots[:, None], n, axis=1)
+        for _ in range(self.depth):
+            node = self.children[2 * node + flat[node * n + rows]]
+        return self.value[node].sum(axis=0)
+
+
+_COMPILED = weakref.WeakKeyDictionary()
+
+
+def compiled_for(booster):
+    """The CompiledBooster for `booster`, compiled once and kept while the booster lives."""
+    compiled = _COMPILED.get(booster)
+    if compiled is None:
+        compiled = _COMPILED[booster] = CompiledBooster(booster)
+    return compiled
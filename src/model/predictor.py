@@ -5,7 +5,10 @@ import os
 import re
 import sys
 import json
+import hashlib
 import joblib
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
 from datetime import datetime, timezone
 
 # Ensure project root is on sys.path
@@ -14,8 +17,16 @@ if _project_root not in sys.path:
     sys.path.insert(0, _project_root)
 
 from src.utils.season import (
-    load_bootstrap, get_season_label, get_current_gw, is_preseason,
+    load_bootstrap, get_season_label, get_current_gw, get_next_gw, is_preseason,
 )
+from src.api.odds import LEAGUE_DEFAULTS, anytime_scorer_probs
+from src.api.summary_store import ensure_store, summaries_from_store
+from src.features.fixtures import fixtures_long, upcoming_fixtures
+from src.features.categorical import CATEGORICAL_FEATURES, encode_categoricals
+from src.features.processor import FeatureProcessor, ODDS_COLS
+from src.features.rolling import next_gameweek_features, DEFAULT_REST_DAYS
+from src.model.compiled import compiled_for
+from src.model.tuning import successive_halving
 
 
 def season_label_or_unknown():
@@ -25,9 +36,11 @@ def season_label_or_unknown():
     except Exception:
         return "This season"
 
-# Categorical model features. Club NAMES — never the integer team ids, which FPL
-# reassigns every season — are the canonical keys for both team and opponent.
-CATEGORICAL_FEATURES = ['position', 'team_name', 'opponent_name', 'was_home']
+# How boosters are evaluated at serving time. 'lightgbm' hands a categorical-cast pandas
+# frame to Booster.predict. 'compiled' encodes the categoricals straight to integer codes
+# and walks the trees as numpy arrays (src/model/compiled.py); same predictions, about
+# half the time at squad-list sizes. Training always uses LightGBM.
+INFERENCE_BACKENDS = ('lightgbm', 'compiled')
 
 # --- Pre-season prior tuning -------------------------------------------------
 # FDR runs 1 (easiest) to 5 (hardest); 3 is a neutral fixture.
@@ -67,13 +80,43 @@ def _safe_print(text):
 # depend on — byte for byte.
 #
 # Legacy .pkl bundles are still readable so an existing checkout keeps working.
+#
+# Loaded boosters are memoised per bundle, keyed by the files' mtime and size and a hash
+# of the sidecar. A long-lived predictor calls load_model() for every request, and
+# re-parsing the model text each time dominated scenario scoring. Retraining rewrites
+# both files, which changes the key, so a fresh model is picked up without a restart.
 # ---------------------------------------------------------------------------
+_BOOSTER_CACHE = {}
+
+
+def _file_key(path):
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def booster_vocabulary(booster, features):
+    """
+    {feature: category list} as LightGBM recorded it at training time
+    (`pandas_categorical`, in feature order). Empty for a booster trained on other
+    categorical columns than CATEGORICAL_FEATURES.
+    """
+    categorical = [f for f in features if f in CATEGORICAL_FEATURES]
+    lists = getattr(booster, 'pandas_categorical', None) or []
+    if len(lists) != len(categorical):
+        return {}
+    return {f: [str(v) for v in values] for f, values in zip(categorical, lists)}
+
+
 def save_booster(booster, features, metadata, base_path):
-    """Write {base}.txt (native model) and {base}.meta.json (features + metadata)."""
+    """
+    Write {base}.txt (native model) and {base}.meta.json (features, the categorical
+    vocabulary under 'categories', and metadata).
+    """
     os.makedirs(os.path.dirname(base_path) or '.', exist_ok=True)
     booster.save_model(f"{base_path}.txt")
     payload = dict(metadata or {})
     payload['features'] = list(features)
+    payload['categories'] = booster_vocabulary(booster, features)
     with open(f"{base_path}.meta.json", 'w', encoding='utf-8') as f:
         json.dump(payload, f, indent=2)
 
@@ -82,34 +125,161 @@ def load_booster(base_path):
     """
     Load a model bundle. Returns (booster, meta_dict) or (None, None).
 
-    Prefers the portable text bundle; falls back to a legacy joblib pickle.
+    Prefers the portable text bundle; falls back to a legacy joblib pickle. An unchanged
+    bundle returns the booster already in memory; `meta` is always a fresh dict.
     """
     txt, meta_path = f"{base_path}.txt", f"{base_path}.meta.json"
     if os.path.exists(txt) and os.path.exists(meta_path):
-        with open(meta_path, 'r', encoding='utf-8') as f:
-            meta = json.load(f)
-        return lgb.Booster(model_file=txt), meta
+        with open(meta_path, 'rb') as f:
+            raw = f.read()
+        key = ('txt', _file_key(txt), hashlib.sha1(raw).hexdigest())
+        cached = _BOOSTER_CACHE.get(base_path)
+        if cached is None or cached[0] != key:
+            cached = _BOOSTER_CACHE[base_path] = (key, lgb.Booster(model_file=txt), None)
+        return cached[1], json.loads(raw.decode('utf-8'))
 
     legacy = f"{base_path}.pkl"
     if os.path.exists(legacy):
-        data = joblib.load(legacy)
-        meta = {k: v for k, v in data.items() if k != 'model'}
-        return data['model'], meta
+        key = ('pkl', _file_key(legacy))
+        cached = _BOOSTER_CACHE.get(base_path)
+        if cached is None or cached[0] != key:
+            data = joblib.load(legacy)
+            meta = {k: v for k, v in data.items() if k != 'model'}
+            cached = _BOOSTER_CACHE[base_path] = (key, data['model'], meta)
+        return cached[1], dict(cached[2])
 
     return None, None
 
 
+def booster_predict(booster, frame, features, backend='lightgbm', vocabulary=None):
+    """
+    `booster`'s raw predictions for frame[features], which must all be present. The
+    'lightgbm' backend encodes the categorical features of `frame` in place, against
+    `vocabulary` — the bundle's 'categories' — or the booster's own when not given.
+    """
+    if backend == 'compiled':
+        return compiled_for(booster).predict(frame)
+    encode_categoricals(frame, vocabulary or booster_vocabulary(booster, features))
+    return booster.predict(frame[features])
+
+
+def _check_backend(backend):
+    if backend not in INFERENCE_BACKENDS:
+        raise ValueError(f"Unknown inference backend {backend!r}; "
+                         f"expected one of {INFERENCE_BACKENDS}.")
+
+
 def model_bundle_exists(base_path):
     return (os.path.exists(f"{base_path}.txt") and os.path.exists(f"{base_path}.meta.json")) \
         or os.path.exists(f"{base_path}.pkl")
 
 
+# ---------------------------------------------------------------------------
+# Training pool
+#
+# Retraining fits five out-of-fold minutes models and four CV points models (two splits
+# for each of feature sets A and B), plus every trial of a hyperparameter search. They
+# are independent, so they run on a process pool, one job per process, each LightGBM
+# limited to its share of the cores rather than every job contending for all of them.
+#
+# Every job trains on rows of one of a few shared feature matrices. A process bins each
+# matrix into a Dataset once and hands its jobs Dataset.subset()s of it, so a fold
+# neither re-bins its rows nor builds a separate validation set.
+# ---------------------------------------------------------------------------
+_TRAINING = {}
+
+
+def _init_training(matrices, threads):
+    """
+    Pool initializer. `matrices` maps a name to (X, y, params); only the rows with a
+    target are trained on, and job row numbers count those rows alone.
+    """
+    _TRAINING.clear()
+    _TRAINING.update(matrices=matrices, threads=threads, datasets={})
+
+
+def _training_set(name):
+    datasets = _TRAINING['datasets']
+    if name not in datasets:
+        X, y, params = _TRAINING['matrices'][name]
+        labelled = y.notna().to_numpy()
+        cat_features = [c for c in X.columns if X[c].dtype.name == 'category']
+        datasets[name] = lgb.Dataset(X[labelled], label=y[labelled], params=params,
+                                     categorical_feature=cat_features).construct()
+    return datasets[name]
+
+
+def _job_params(name, params=None):
+    params = params or _TRAINING['matrices'][name][2]
+    return {**params, 'num_threads': _TRAINING['threads']}
+
+
+def _fit_and_predict(name, train_rows, predict_rows, num_boost_round):
+    """Fit on labelled rows `train_rows`; predict the matrix's rows `predict_rows`."""
+    model = lgb.train(_job_params(name), _training_set(name).subset(train_rows),
+                      num_boost_round=num_boost_round)
+    return model.predict(_TRAINING['matrices'][name][0].iloc[predict_rows])
+
+
+def _validation_fit(name, train_rows, val_rows, params=None, num_boost_round=500):
+    """
+    (best validation RMSE, best iteration) of a fit early-stopped on `val_rows`, with
+    `params` in place of the matrix's own. Both row sets count labelled rows.
+    """
+    dataset = _training_set(name)
+    model = lgb.train(_job_params(name, params), dataset.subset(train_rows),
+                      num_boost_round=num_boost_round, valid_sets=[dataset.subset(val_rows)],
+                      callbacks=[lgb.early_stopping(50, verbose=False)])
+    return model.best_score['valid_0']['rmse'], model.best_iteration or num_boost_round
+
+
+@contextmanager
+def _training_pool(matrices, workers=None, n_jobs=None):
+    """
+    A run(fn, jobs) that returns [fn(*job) for job in jobs], computed on up to `workers`
+    processes (default: one per CPU) sharing `matrices` (see _init_training). One worker
+    runs the jobs in process.
+    """
+    cores = os.cpu_count() or 1
+    workers = max(1, min(workers or cores, n_jobs or cores))
+    initargs = (matrices, max(1, cores // workers))
+    if workers == 1:
+        _init_training(*initargs)
+        try:
+            yield lambda fn, jobs: [fn(*job) for job in jobs]
+        finally:
+            _TRAINING.clear()
+    else:
+        with ProcessPoolExecutor(workers, initializer=_init_training,
+                                 initargs=initargs) as pool:
+            yield lambda fn, jobs: list(pool.map(fn, *zip(*jobs)))
+
+
+def _map_training(fn, jobs, matrices, workers=None):
+    with _training_pool(matrices, workers, len(jobs)) as run:
+        return run(fn, jobs)
+
+
+# The element-summary history columns prediction actually reads. Everything else in the
+# payload (per-round transfer counts, selection, fixture ids...) is skipped at read time.
+SUMMARY_HISTORY_COLUMNS = [
+    'round', 'kickoff_time',
+    'minutes', 'total_points', 'expected_goals', 'expected_assists',
+    'expected_goal_involvements', 'expected_goals_conceded',
+    'bps', 'influence', 'creativity', 'threat', 'starts',
+]
+
+
 def load_summary_cache(cache_dir="data/cache", static=None):
     """
     Load the element-summary cache for the CURRENT season, with an integrity check.
 
     Returns (summaries, error_reason). `summaries` is None when no usable cache exists.
 
+    Reads the columnar store (src/api/summary_store.py) projected to
+    SUMMARY_HISTORY_COLUMNS rather than parsing the whole JSON payload, building the
+    store from the JSON first if this cache predates it.
+
     This function exists because of a silent-corruption bug: FPL reassigns element ids
     every season, so a previous season's cache joins perfectly onto this season's
     players while describing entirely different people (100% id collision was measured
@@ -146,8 +316,9 @@ def load_summary_cache(cache_dir="data/cache", static=None):
         )
 
     gw, filename = max(matches)
-    with open(os.path.join(cache_dir, filename), 'r', encoding='utf-8') as f:
-        summaries = json.load(f)
+    ensure_store(cache_dir, season, gw, os.path.join(cache_dir, filename))
+    summaries = summaries_from_store(cache_dir, season, gw,
+                                     history_columns=SUMMARY_HISTORY_COLUMNS)
 
     # Belt and braces: even a correctly named file must describe this season's players.
     cache_ids = {int(k) for k in summaries.keys()}
@@ -164,12 +335,20 @@ def load_summary_cache(cache_dir="data/cache", static=None):
 
 
 class MinutesPredictor:
-    def __init__(self, model_dir="data/models"):
+    def __init__(self, model_dir="data/models", backend='lightgbm'):
+        _check_backend(backend)
+        self.backend = backend
         self.model_dir = model_dir
         os.makedirs(self.model_dir, exist_ok=True)
         self.model_base = os.path.join(self.model_dir, "lgb_ts_minutes")
         self.model_path = f"{self.model_base}.txt"
         self.model = None
+        self.categories = None  # the bundle's vocabulary; None reads it from the booster
+        # What train() fits with; PointsPredictor.train(tune_seconds=...) may replace them.
+        self.params = dict(self.PARAMS)
+        self.num_boost_round = 100
+        # A model trained in this process is never swapped for the one on disk.
+        self._trained_here = False
         self.features_list = [
             'minutes_last_1', 'minutes_mean_last_3', 'minutes_mean_last_5',
             'starts_last_1', 'starts_mean_last_3', 'starts_mean_last_5',
@@ -188,8 +367,11 @@ class MinutesPredictor:
         "verbose": -1,
     }
 
-    def train(self, df_train, gw=None, persist=True, verbose=True):
-        """Train the minutes model. persist=False keeps it in memory (used for OOF folds)."""
+    def train(self, df_train, gw=None, persist=True, verbose=True, tuning=None):
+        """
+        Train the minutes model. persist=False keeps it in memory. `tuning`, the record
+        of a hyperparameter search, is saved with the model.
+        """
         if verbose:
             print("\n--- Training Minutes Model ---")
         df_train = df_train.dropna(subset=['target_minutes'])
@@ -200,11 +382,14 @@ class MinutesPredictor:
         cat_features = [f for f in self.features_list if df_train[f].dtype.name == 'category']
         train_data = lgb.Dataset(X, label=y, categorical_feature=cat_features)
 
-        self.model = lgb.train(self.PARAMS, train_data, num_boost_round=100)
+        self.model = lgb.train(self.params, train_data, num_boost_round=self.num_boost_round)
+        self._trained_here = True
 
         if persist:
             meta = {'trained_at': datetime.now().isoformat(),
-                    'season': get_season_label(load_bootstrap()), 'gw': gw}
+                    'season': get_season_label(load_bootstrap()), 'gw': gw,
+                    'params': self.params, 'num_boost_round': self.num_boost_round,
+                    **({'tuning': tuning} if tuning else {})}
             save_booster(self.model, self.features_list, meta, self.model_base)
             print(f"Minutes Model saved to {self.model_base}.txt")
             if gw:
@@ -215,13 +400,14 @@ class MinutesPredictor:
         return self.model
 
     def load_model(self):
-        if self.model is not None:
+        if self._trained_here:
             return True
         booster, meta = load_booster(self.model_base)
         if booster is None:
             return False
         self.model = booster
         self.features_list = meta.get('features', self.features_list)
+        self.categories = meta.get('categories')
         return True
 
     def predict(self, df_features):
@@ -237,11 +423,8 @@ class MinutesPredictor:
         for c in [c for c in self.features_list if c not in df.columns]:
             df[c] = 0.0
 
-        for f in self.features_list:
-            if f in CATEGORICAL_FEATURES:
-                df[f] = df[f].astype(str).astype('category')
-
-        preds = self.model.predict(df[self.features_list])
+        preds = booster_predict(self.model, df, self.features_list, self.backend,
+                                self.categories)
         return pd.Series(preds, index=df.index).clip(0, 90)
 
 
@@ -261,18 +444,39 @@ class PointsPredictor:
         "verbose": -1,
     }
 
-    def __init__(self, model_dir="data/models"):
+    # Expanding-window CV within one season: the A/B feature test and tuning score on it.
+    CV_SEASON = "2023-24"
+    CV_SPLITS = [
+        ({'GW': (1, 20)}, {'GW': (21, 25)}),
+        ({'GW': (1, 25)}, {'GW': (26, 30)}),
+    ]
+
+    def __init__(self, model_dir="data/models", backend='lightgbm'):
+        _check_backend(backend)
+        self.backend = backend
         self.model_dir = model_dir
         os.makedirs(self.model_dir, exist_ok=True)
         self.model_base = os.path.join(self.model_dir, "lgb_ts_points")
         self.model_path = f"{self.model_base}.txt"
         self.model = None
         self.features_list = None
+        self.categories = None
         self.prediction_mode = "ml"
         self.prediction_warnings = []
         self.odds_confidence = "UNKNOWN"
         self._train_feature_means = None
         self._cv_rmse = None
+        self._minutes = None
+        # What train() fits the final model with; tune_seconds searches for better.
+        self.params = dict(self.PARAMS)
+        self.num_boost_round = 150
+
+    @property
+    def minutes_predictor(self):
+        """The stage-one model, kept for the predictor's lifetime rather than per call."""
+        if self._minutes is None:
+            self._minutes = MinutesPredictor(model_dir=self.model_dir, backend=self.backend)
+        return self._minutes
 
     def _get_feature_cols(self, df):
         """Feature columns, dropping identifiers, targets and same-gameweek leakage."""
@@ -290,7 +494,7 @@ class PointsPredictor:
     # ------------------------------------------------------------------
     # Out-of-fold minutes (prevents stacking leakage)
     # ------------------------------------------------------------------
-    def _oof_projected_minutes(self, df_train, n_blocks=5):
+    def _oof_projected_minutes(self, df_train, n_blocks=5, workers=None, minutes=None):
         """
         Generate projected_minutes for the training set using models that never saw
         the row being predicted.
@@ -303,31 +507,51 @@ class PointsPredictor:
         leave-one-block-out rather than a strictly forward-looking split — a block is
         predicted by a model trained on both earlier and later blocks — which still
         removes the memorisation that causes the bias, while keeping every row usable.
+        The folds train in parallel on up to `workers` processes, with `minutes`'s
+        parameters (a default MinutesPredictor's if not given).
         """
         print("\n--- Generating out-of-fold minutes predictions ---")
         keys = df_train['season'].astype(str) + "_" + df_train['GW'].astype(int).astype(str).str.zfill(2)
         ordered = sorted(keys.unique())
         blocks = np.array_split(np.array(ordered), n_blocks)
 
-        oof = pd.Series(np.nan, index=df_train.index, dtype=float)
+        minutes = minutes or MinutesPredictor(model_dir=self.model_dir)
+        y = df_train['target_minutes']
+        labelled = y.notna().to_numpy()
+        # A row's number among the labelled rows, which is what the fold Datasets count.
+        rank = np.cumsum(labelled) - 1
 
+        folds, jobs = [], []
         for i, block in enumerate(blocks, 1):
-            mask_val = keys.isin(set(block.tolist()))
-            mask_train = ~mask_val
+            mask_val = keys.isin(set(block.tolist())).to_numpy()
+            mask_train = ~mask_val & labelled
             if mask_train.sum() == 0 or mask_val.sum() == 0:
                 continue
-            fold_model = MinutesPredictor(model_dir=self.model_dir)
-            fold_model.train(df_train[mask_train], persist=False, verbose=False)
-            oof.loc[mask_val] = fold_model.predict(df_train[mask_val]).values
-            print(f"  fold {i}/{len(blocks)}: trained on {int(mask_train.sum()):>6} rows, "
-                  f"predicted {int(mask_val.sum()):>6}")
+            folds.append((i, int(mask_train.sum()), np.flatnonzero(mask_val)))
+            jobs.append(('minutes', rank[mask_train], folds[-1][2], minutes.num_boost_round))
+
+        matrices = {'minutes': (df_train[minutes.features_list], y, minutes.params)}
+        preds = _map_training(_fit_and_predict, jobs, matrices, workers) if jobs else []
+
+        oof = pd.Series(np.nan, index=df_train.index, dtype=float)
+        for (i, n_train, val_rows), fold_preds in zip(folds, preds):
+            oof.iloc[val_rows] = fold_preds
+            print(f"  fold {i}/{len(blocks)}: trained on {n_train:>6} rows, "
+                  f"predicted {len(val_rows):>6}")
 
         # Any row we could not cover falls back to its own recent minutes.
         oof = oof.fillna(df_train.get('minutes_mean_last_3', pd.Series(0, index=df_train.index)))
         return oof.clip(0, 90)
 
-    def train(self, df_train=None):
-        """Trains a LightGBM model to predict points using Time-Series CV."""
+    def train(self, df_train=None, workers=None, tune_seconds=None):
+        """
+        Trains a LightGBM model to predict points using Time-Series CV. The OOF minutes
+        folds and the CV fits run on up to `workers` processes (default: one per CPU).
+
+        With `tune_seconds`, both models' parameters and round counts are searched for
+        on the CV splits first, a third of the time for the minutes model and the rest
+        for the points model, and the winners are saved in each model's sidecar.
+        """
         if df_train is None:
             path = "data/processed/historical_features.parquet"
             if not os.path.exists(path):
@@ -338,13 +562,27 @@ class PointsPredictor:
         print(f"Loaded {len(df_train)} rows for training.")
         gw = _get_current_gw()
 
+        min_predictor = MinutesPredictor(model_dir=self.model_dir)
+        minutes_tuning = None
+        if tune_seconds:
+            print("\n--- Tuning the minutes model ---")
+            result = self._tune(df_train, min_predictor.features_list, 'target_minutes',
+                                min_predictor.PARAMS, min_predictor.num_boost_round,
+                                tune_seconds / 3, workers)
+            if result:
+                min_predictor.params = result['params']
+                min_predictor.num_boost_round = result['num_boost_round']
+                minutes_tuning = {'cv_rmse': result['cv_rmse'], **result['search']}
+                print(f"Tuned CV RMSE: {result['cv_rmse']:.4f} "
+                      f"({result['num_boost_round']} rounds)")
+
         # 1. Out-of-fold minutes for TRAINING the points model...
-        df_train['projected_minutes'] = self._oof_projected_minutes(df_train)
+        df_train['projected_minutes'] = self._oof_projected_minutes(
+            df_train, workers=workers, minutes=min_predictor)
         df_train['start_probability'] = (df_train['projected_minutes'] > 45).astype(float)
 
         # 2. ...then fit the minutes model on everything and persist it for serving.
-        min_predictor = MinutesPredictor(model_dir=self.model_dir)
-        min_predictor.train(df_train, gw=gw, persist=True)
+        min_predictor.train(df_train, gw=gw, persist=True, tuning=minutes_tuning)
 
         # 3. Setup Points Model Features
         base_features = self._get_feature_cols(df_train)
@@ -357,14 +595,9 @@ class PointsPredictor:
                      ['projected_minutes', 'start_probability']
         features_B = base_features + ['projected_minutes', 'start_probability']
 
-        cv_splits = [
-            ({'GW': (1, 20)}, {'GW': (21, 25)}),
-            ({'GW': (1, 25)}, {'GW': (26, 30)}),
-        ]
-
         print("\n--- Running A/B Test on Features ---")
-        best_rmse_A = self._run_cv(df_train, features_A, cv_splits, self.PARAMS)
-        best_rmse_B = self._run_cv(df_train, features_B, cv_splits, self.PARAMS)
+        best_rmse_A, best_rmse_B = self._run_cv(df_train, [features_A, features_B],
+                                                self.PARAMS, workers=workers)
 
         print(f"\nRMSE A (Projected Only): {best_rmse_A:.4f}")
         print(f"RMSE B (Projected + Raw): {best_rmse_B:.4f}")
@@ -380,6 +613,17 @@ class PointsPredictor:
 
         print(f"Using {len(self.features_list)} features for final Points Model training.")
 
+        points_tuning = None
+        if tune_seconds:
+            print("\n--- Tuning the points model ---")
+            result = self._tune(df_train, self.features_list, 'target', self.PARAMS,
+                                self.num_boost_round, tune_seconds - tune_seconds / 3, workers)
+            if result:
+                self.params, self.num_boost_round = result['params'], result['num_boost_round']
+                self._cv_rmse = result['cv_rmse']
+                points_tuning = result['search']
+                print(f"Tuned CV RMSE: {self._cv_rmse:.4f} ({self.num_boost_round} rounds)")
+
         print("\nTraining final points model on all data...")
         df_train = df_train.dropna(subset=['target'])
 
@@ -388,7 +632,7 @@ class PointsPredictor:
         cat_features = [f for f in self.features_list if df_train[f].dtype.name == 'category']
         train_data_all = lgb.Dataset(X_all, label=y_all, categorical_feature=cat_features)
 
-        self.model = lgb.train(self.PARAMS, train_data_all, num_boost_round=150)
+        self.model = lgb.train(self.params, train_data_all, num_boost_round=self.num_boost_round)
 
         num_features = [f for f in self.features_list if df_train[f].dtype.name != 'category']
         self._train_feature_means = df_train[num_features].mean().to_dict()
@@ -401,7 +645,11 @@ class PointsPredictor:
             'cv_rmse': self._cv_rmse,
             'n_train_rows': int(len(df_train)),
             'train_seasons': sorted(df_train['season'].astype(str).unique().tolist()),
+            'params': self.params,
+            'num_boost_round': self.num_boost_round,
         }
+        if points_tuning:
+            meta['tuning'] = points_tuning
         save_booster(self.model, self.features_list, meta, self.model_base)
         print(f"Points Model saved to {self.model_base}.txt")
 
@@ -412,34 +660,66 @@ class PointsPredictor:
 
         return True
 
-    def _run_cv(self, df_train, features, cv_splits, params):
-        cat_features = [f for f in features if df_train[f].dtype.name == 'category']
-        cv_season = "2023-24"
-        mask_season = df_train['season'] == cv_season
-        rmse_list = []
-
-        for train_bounds, val_bounds in cv_splits:
+    def _cv_folds(self, df_train, target):
+        """
+        `target` kept only on CV_SEASON's rows, and each CV_SPLITS split's (train, val)
+        rows numbered among the rows that keep it.
+        """
+        y = df_train[target].where(df_train['season'] == self.CV_SEASON)
+        gw = df_train['GW'].to_numpy()[y.notna().to_numpy()]
+        folds = []
+        for train_bounds, val_bounds in self.CV_SPLITS:
             t_start, t_end = train_bounds['GW']
             v_start, v_end = val_bounds['GW']
-
-            mask_train = mask_season & (df_train['GW'] >= t_start) & (df_train['GW'] <= t_end)
-            mask_val = mask_season & (df_train['GW'] >= v_start) & (df_train['GW'] <= v_end)
-
-            df_t, df_v = df_train[mask_train], df_train[mask_val]
-            if df_t.empty or df_v.empty:
-                continue
-
-            train_data = lgb.Dataset(df_t[features], label=df_t['target'],
-                                     categorical_feature=cat_features)
-            val_data = lgb.Dataset(df_v[features], label=df_v['target'],
-                                   categorical_feature=cat_features, reference=train_data)
-
-            model_cv = lgb.train(params, train_data, num_boost_round=500,
-                                 valid_sets=[val_data],
-                                 callbacks=[lgb.early_stopping(50, verbose=False)])
-            rmse_list.append(model_cv.best_score['valid_0']['rmse'])
-
-        return sum(rmse_list) / len(rmse_list) if rmse_list else 999.0
+            train_rows = np.flatnonzero((gw >= t_start) & (gw <= t_end))
+            val_rows = np.flatnonzero((gw >= v_start) & (gw <= v_end))
+            if len(train_rows) and len(val_rows):
+                folds.append((train_rows, val_rows))
+        return y, folds
+
+    def _run_cv(self, df_train, feature_sets, params, workers=None):
+        """Mean validation RMSE over CV_SPLITS for each feature set, fitted in parallel."""
+        y, folds = self._cv_folds(df_train, 'target')
+        jobs = [(k, train_rows, val_rows) for train_rows, val_rows in folds
+                for k in range(len(feature_sets))]
+
+        matrices = {k: (df_train[features], y, params) for k, features in enumerate(feature_sets)}
+        fits = _map_training(_validation_fit, jobs, matrices, workers) if jobs else []
+
+        results = []
+        for k in range(len(feature_sets)):
+            rmse_list = [rmse for (name, _, _), (rmse, _) in zip(jobs, fits) if name == k]
+            results.append(sum(rmse_list) / len(rmse_list) if rmse_list else 999.0)
+        return results
+
+    def _tune(self, df_train, features, target, base, default_rounds, budget_seconds,
+              workers=None):
+        """
+        tuning.successive_halving around `base` on the CV splits, its trials run on one
+        pool of up to `workers` processes. `default_rounds` is what the model trains with
+        untuned. None when no split has data to tune on.
+        """
+        y, folds = self._cv_folds(df_train, target)
+        if not folds:
+            print("  No CV rows to tune on; keeping the default parameters.")
+            return None
+        # Pre-filtering features at base's min_data_in_leaf would hide some from trials
+        # with a smaller one.
+        matrices = {'tune': (df_train[features], y, {**base, 'feature_pre_filter': False})}
+        workers = workers or os.cpu_count() or 1
+
+        with _training_pool(matrices, workers) as run:
+            def evaluate(configs, max_rounds):
+                fits = run(_validation_fit, [('tune', train_rows, val_rows, params, max_rounds)
+                                             for params in configs
+                                             for train_rows, val_rows in folds])
+                per = [fits[i:i + len(folds)] for i in range(0, len(fits), len(folds))]
+                return [(np.mean([rmse for rmse, _ in f]), np.mean([it for _, it in f]))
+                        for f in per]
+
+            return successive_halving(evaluate, base, budget_seconds,
+                                      batch_size=max(1, -(-workers // len(folds))),
+                                      default_rounds=default_rounds)
 
     def load_model(self):
         booster, meta = load_booster(self.model_base)
@@ -447,6 +727,8 @@ class PointsPredictor:
             return False
         self.model = booster
         self.features_list = meta['features']
+        # Bundles saved before the vocabulary was persisted fall back to the booster's.
+        self.categories = meta.get('categories')
         self._train_feature_means = meta.get('train_feature_means', {})
         self._cv_rmse = meta.get('cv_rmse')
         return True
@@ -458,106 +740,22 @@ class PointsPredictor:
         """
         Rebuild the rolling features from element-summary history.
 
-        Definitions here MUST mirror history_builder exactly, since the model was
-        trained on that version of each feature.
+        Computed by src/features/rolling.py — the same engine history_builder trains
+        on — over each player's history plus a placeholder row for the upcoming
+        fixture. One row per player in `summaries`, with an `id` column.
         """
-        rolling_cols = [
-            'minutes', 'total_points', 'expected_goals', 'expected_assists',
-            'expected_goal_involvements', 'expected_goals_conceded',
-            'bps', 'influence', 'creativity', 'threat', 'starts'
-        ]
-
-        # Upcoming kickoff per player, so days_rest can be measured against the match
-        # being predicted (as in training) rather than between the last two played.
-        next_kickoff = {}
+        upcoming = {int(pid): None for pid in summaries}
         if 'next_kickoff_time' in df_features.columns:
             for pid, ko in zip(df_features['id'], df_features['next_kickoff_time']):
-                next_kickoff[int(pid)] = ko
-
-        def _parse(ts):
-            if not ts or pd.isna(ts):
-                return None
-            try:
-                return pd.to_datetime(ts, utc=True).to_pydatetime()
-            except Exception:
-                return None
-
-        def collapse_double_gameweeks(history):
-            """
-            Merge a gameweek's multiple fixtures into one entry.
-
-            history_builder groups training rows by (player_id, GW) and SUMS the stats,
-            so a double gameweek is one row there. element-summary returns one entry per
-            MATCH, so without this a DGW would make the last-3 window span 3 matches
-            instead of 3 gameweeks — a different feature from the one trained on.
-            """
-            by_round = {}
-            order = []
-            for hw in history:
-                rnd = hw.get('round')
-                if rnd is None:
-                    rnd = f"_{len(order)}"  # keep unroundable entries distinct
-                if rnd not in by_round:
-                    by_round[rnd] = dict(hw)
-                    order.append(rnd)
-                else:
-                    merged_hw = by_round[rnd]
-                    for col in rolling_cols:
-                        merged_hw[col] = (float(merged_hw.get(col, 0) or 0)
-                                          + float(hw.get(col, 0) or 0))
-                    # Latest kickoff in the gameweek is the one rest is measured from.
-                    if str(hw.get('kickoff_time') or '') > str(merged_hw.get('kickoff_time') or ''):
-                        merged_hw['kickoff_time'] = hw.get('kickoff_time')
-            return [by_round[r] for r in order]
-
-        rolling_data = []
-        for pid_str, data in summaries.items():
-            pid = int(pid_str)
-            history = collapse_double_gameweeks(data.get('history', []))
-            row = {'id': pid}
-
-            if not history:
-                for col in rolling_cols:
-                    row[f'{col}_last_1'] = 0.0
-                    row[f'{col}_mean_last_3'] = 0.0
-                    row[f'{col}_mean_last_5'] = 0.0
-                row['benched_sum_last_3'] = 0.0
-                row['benched_sum_last_5'] = 0.0
-                row['days_rest'] = 7.0
-                rolling_data.append(row)
-                continue
-
-            vals = {col: [float(hw.get(col, 0) or 0) for hw in history] for col in rolling_cols}
-
-            for col in rolling_cols:
-                lst = vals[col]
-                row[f'{col}_last_1'] = lst[-1] if lst else 0.0
-                row[f'{col}_mean_last_3'] = sum(lst[-3:]) / len(lst[-3:]) if lst else 0.0
-                row[f'{col}_mean_last_5'] = sum(lst[-5:]) / len(lst[-5:]) if lst else 0.0
-
-            starts_list = vals.get('starts', [])
-            benched_flags = [1 if s == 0 else 0 for s in starts_list]
-            row['benched_sum_last_3'] = float(sum(benched_flags[-3:])) if benched_flags else 0.0
-            row['benched_sum_last_5'] = float(sum(benched_flags[-5:])) if benched_flags else 0.0
-
-            # days_rest = UPCOMING kickoff - last played kickoff.
-            last_ko = _parse(history[-1].get('kickoff_time'))
-            upcoming = _parse(next_kickoff.get(pid))
-            if last_ko and upcoming:
-                row['days_rest'] = max((upcoming - last_ko).total_seconds() / 86400, 0)
-            elif len(history) >= 2:
-                # No fixture scheduled (blank GW): fall back to the last observed gap.
-                prev_ko = _parse(history[-2].get('kickoff_time'))
-                row['days_rest'] = (
-                    max((last_ko - prev_ko).total_seconds() / 86400, 0)
-                    if last_ko and prev_ko else 7.0
-                )
-            else:
-                row['days_rest'] = 7.0
+                if int(pid) in upcoming:
+                    upcoming[int(pid)] = ko
 
-            rolling_data.append(row)
-
-        return pd.DataFrame(rolling_data)
+        history = pd.DataFrame.from_records(
+            [{**hw, 'player_id': int(pid)}
+             for pid, data in summaries.items() for hw in (data.get('history') or [])])
+        if history.empty:
+            history = pd.DataFrame(columns=['player_id', 'round', 'kickoff_time'])
+        return next_gameweek_features(history, upcoming)
 
     # ------------------------------------------------------------------
     # Pre-season
@@ -685,64 +883,66 @@ class PointsPredictor:
         df_features['prediction_mode'] = "preseason"
         return df_features
 
-    def predict(self, df_features):
-        """Two-stage prediction: Minutes Model → Points Model.
-
-        Sets self.prediction_mode / .prediction_warnings / .odds_confidence for callers.
-        `prediction_mode` is one of:
-          "ml"        - the trained two-stage model ran
-          "preseason" - season not started; previous-season prior (expected, not an error)
-          "fallback"  - something is wrong; heuristic in use
-        """
-        self.prediction_mode = "ml"
-        self.prediction_warnings = []
-        self.odds_confidence = "UNKNOWN"
-
-        # Pre-season short-circuit: rolling features would all be zero, so the model
-        # would read a constant row for every player and rank them arbitrarily.
-        static = load_bootstrap()
-        if is_preseason(static):
-            summaries, _ = load_summary_cache(static=static)
-            return self._preseason_prediction(df_features, summaries)
-
+    def _load_inputs(self):
+        """(element summaries, None), or (None, reason) when the ML path cannot run."""
         if not self.load_model():
-            return self._emergency_heuristic(
-                df_features,
-                reason=f"ML Points Model not found at {self.model_base}.txt — "
-                       f"the trained model must be committed to the repo, since a "
-                       f"deployed instance cannot retrain itself")
+            return None, (f"ML Points Model not found at {self.model_base}.txt — "
+                          f"the trained model must be committed to the repo, since a "
+                          f"deployed instance cannot retrain itself")
 
         summaries, err = load_summary_cache()
         if summaries is None:
-            return self._emergency_heuristic(df_features, reason=err)
+            return None, err
         if not summaries:
-            return self._emergency_heuristic(
-                df_features, reason="Element-summary cache is empty (0 players)")
+            return None, "Element-summary cache is empty (0 players)"
+        return summaries, None
+
+    def _merge_rolling(self, df_features, rows=None, summaries=None):
+        """
+        (rows with their rolling features attached, None), or (None, reason) when the
+        ML path cannot run.
+
+        Rolling features are built once per player from `df_features`, whose
+        next_kickoff_time sets days_rest, and merged onto `rows` — df_features itself
+        unless predict_horizon passes one row per upcoming fixture. `summaries` skips
+        _load_inputs when the caller has already loaded them.
+        """
+        rows = df_features if rows is None else rows
+        if summaries is None:
+            summaries, err = self._load_inputs()
+            if summaries is None:
+                return None, err
 
         df_rolling = self._build_rolling_features(summaries, df_features)
         if df_rolling.empty or 'id' not in df_rolling.columns:
-            return self._emergency_heuristic(
-                df_features, reason="Could not build any rolling features from the cache")
+            return None, "Could not build any rolling features from the cache"
+        return self._attach_rolling(rows, df_rolling)
 
-        df_merged = df_features.merge(df_rolling, on='id', how='left')
+    def _attach_rolling(self, rows, df_rolling):
+        """Left-merge built rolling features onto `rows`; see _merge_rolling."""
+        df_merged = rows.merge(df_rolling, on='id', how='left')
         # A left merge must not change row count; duplicate ids in df_rolling would
         # expand it and silently desync the positional assignments below.
-        if len(df_merged) != len(df_features):
-            return self._emergency_heuristic(
-                df_features,
-                reason=f"Rolling-feature merge changed row count "
-                       f"({len(df_features)} -> {len(df_merged)}); cache has duplicate ids")
-
-        covered = df_merged['days_rest'].notna().sum()
-        if covered < len(df_merged):
+        if len(df_merged) != len(rows):
+            return None, (f"Rolling-feature merge changed row count "
+                          f"({len(rows)} -> {len(df_merged)}); cache has duplicate ids")
+
+        covered = df_merged.drop_duplicates('id')['days_rest'].notna()
+        if not covered.all():
             self.prediction_warnings.append(
-                f"{len(df_merged) - covered}/{len(df_merged)} players have no history in the "
+                f"{(~covered).sum()}/{len(covered)} players have no history in the "
                 f"cache; their rolling features are missing."
             )
+        return df_merged, None
 
+    def _score_rows(self, df_merged):
+        """
+        Minutes model, then points model, over every row of `df_merged` in one call
+        each. Adds projected_minutes / start_probability to `df_merged` and returns the
+        raw points predictions.
+        """
         # --- Stage 1: Minutes Model ---
-        min_predictor = MinutesPredictor(model_dir=self.model_dir)
-        df_merged['projected_minutes'] = min_predictor.predict(df_merged)
+        df_merged['projected_minutes'] = self.minutes_predictor.predict(df_merged)
         df_merged['start_probability'] = (df_merged['projected_minutes'] > 45).astype(float)
 
         print(f"  Minutes Model: avg projected = {df_merged['projected_minutes'].mean():.1f} min")
@@ -759,12 +959,88 @@ class PointsPredictor:
             for col in missing_cols:
                 df_merged[col] = 0.0
 
-        for f in self.features_list:
-            if f in CATEGORICAL_FEATURES:
-                df_merged[f] = df_merged[f].astype(str).astype('category')
+        return booster_predict(self.model, df_merged, self.features_list, self.backend,
+                               self.categories)
+
+    def predict(self, df_features):
+        """Two-stage prediction: Minutes Model → Points Model.
+
+        Sets self.prediction_mode / .prediction_warnings / .odds_confidence for callers.
+        `prediction_mode` is one of:
+          "ml"        - the trained two-stage model ran
+          "preseason" - season not started; previous-season prior (expected, not an error)
+          "fallback"  - something is wrong; heuristic in use
+        """
+        return self.score_batch([df_features])[0]
+
+    def score_batch(self, frames):
+        """
+        predict() for many scenario frames at once — injury what-ifs, fixture swaps,
+        horizons — returning one predict()-shaped frame per input, in order.
 
-        preds = self.model.predict(df_merged[self.features_list])
+        The bootstrap, summary cache and models are loaded once for the batch. Frames
+        sharing the same next kickoffs share one build of the rolling features. Every
+        row of every frame then goes through ONE predict call per model, so a scenario
+        costs its share of a single LightGBM call rather than a full predict().
 
+        prediction_mode and prediction_warnings describe the whole batch;
+        odds_confidence is HIGH only if every frame has live odds.
+        """
+        self.prediction_mode = "ml"
+        self.prediction_warnings = []
+        self.odds_confidence = "UNKNOWN"
+        frames = list(frames)
+        if not frames:
+            return []
+
+        # Pre-season short-circuit: rolling features would all be zero, so the model
+        # would read a constant row for every player and rank them arbitrarily.
+        static = load_bootstrap()
+        if is_preseason(static):
+            summaries, _ = load_summary_cache(static=static)
+            out = [self._preseason_prediction(frame, summaries) for frame in frames]
+            self.prediction_warnings = list(dict.fromkeys(self.prediction_warnings))
+            return out
+
+        summaries, reason = self._load_inputs()
+        merged, built = [], {}
+        for frame in frames:
+            if summaries is None:
+                break
+            kickoffs = (frame['next_kickoff_time'].astype(str) if 'next_kickoff_time'
+                        in frame.columns else pd.Series('', index=frame.index))
+            key = tuple(sorted(zip(frame['id'].astype(int), kickoffs)))
+            if key not in built:
+                built[key] = self._build_rolling_features(summaries, frame)
+            df_rolling = built[key]
+            if df_rolling.empty or 'id' not in df_rolling.columns:
+                reason = "Could not build any rolling features from the cache"
+                break
+            df_merged, reason = self._attach_rolling(frame, df_rolling)
+            if df_merged is None:
+                break
+            merged.append(df_merged)
+
+        if len(merged) < len(frames):
+            self.prediction_warnings = []
+            out = [self._emergency_heuristic(frame, reason=reason) for frame in frames]
+            self.prediction_warnings = list(dict.fromkeys(self.prediction_warnings))
+            return out
+
+        batch = pd.concat(merged, ignore_index=True)
+        preds = self._score_rows(batch)
+        bounds = np.cumsum([0] + [len(m) for m in merged])
+
+        out, confidence = [], []
+        for frame, a, b in zip(frames, bounds[:-1], bounds[1:]):
+            out.append(self._finish_ml(frame, preds[a:b], batch.iloc[a:b]))
+            confidence.append(self.odds_confidence)
+        self.odds_confidence = "HIGH" if all(c == "HIGH" for c in confidence) else "LOW"
+        self.prediction_warnings = list(dict.fromkeys(self.prediction_warnings))
+        return out
+
+    def _finish_ml(self, df_features, preds, df_merged):
+        """A predict() frame from one scenario's raw predictions and its merged rows."""
         df_features = df_features.copy()
         df_features['predicted_points'] = np.clip(preds, 0, None)
         df_features['projected_minutes'] = df_merged['projected_minutes'].values
@@ -808,6 +1084,113 @@ class PointsPredictor:
         df_features['prediction_mode'] = "ml"
         return df_features
 
+    # ------------------------------------------------------------------
+    # Multi-gameweek horizon
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _horizon_rows(df_features, fixtures, gws):
+        """
+        One row per (player, fixture) in gameweeks `gws`, with `event` and `order`
+        columns. The fixture-specific columns of df_features describe each club's NEXT
+        fixture (order 0) and are kept for it. Later fixtures take the opponent, venue
+        and difficulty from the schedule. They take league-default odds, since live
+        odds only cover the next match. Their rest is the gap since the club's
+        previous fixture (`_rest_days`).
+
+        Without a fixture list every player gets one fixture per gameweek, namely
+        their next one.
+        """
+        if fixtures is None:
+            rows = df_features.loc[df_features.index.repeat(len(gws))].reset_index(drop=True)
+            rows['event'] = np.tile(gws, len(df_features))
+            rows['order'] = 0
+            rows['_rest_days'] = np.nan
+            return rows
+
+        future = upcoming_fixtures(fixtures_long(fixtures))
+        ko = pd.to_datetime(future['kickoff_time'], errors='coerce', utc=True)
+        future['_rest_days'] = ko.groupby(future['team']).diff().dt.total_seconds() / 86400
+        future = future[future['event'].isin(gws)]
+
+        rows = df_features.merge(
+            future[['team', 'opponent', 'is_home', 'difficulty', 'kickoff_time',
+                    'event', 'order', '_rest_days']].rename(columns={'kickoff_time': '_kickoff'}),
+            on='team', how='inner')
+        rows['event'] = rows['event'].astype(int)
+
+        later = rows['order'] > 0
+        names = dict(zip(df_features['team'], df_features['team_name']))
+        rows.loc[later, 'opponent_name'] = rows.loc[later, 'opponent'].map(names).fillna("UNKNOWN")
+        rows.loc[later, 'was_home'] = rows.loc[later, 'is_home'].astype(str)
+        rows.loc[later, 'next_fixture_difficulty'] = rows.loc[later, 'difficulty']
+        rows.loc[later, 'next_kickoff_time'] = rows.loc[later, '_kickoff'].astype(str)
+        for col in ODDS_COLS:
+            rows.loc[later, col] = LEAGUE_DEFAULTS[col]
+        rows.loc[later, 'anytime_goal_scorer_prob'] = anytime_scorer_probs(
+            rows.loc[later, 'team_implied_goals'], rows.loc[later, 'position'])
+        return rows.drop(columns=['opponent', 'is_home', 'difficulty', '_kickoff'])
+
+    def predict_horizon(self, df_features, n_gws, fixtures=None):
+        """
+        Expected points per player for each of the next `n_gws` gameweeks. The
+        availability haircut (minutes_prob) applies to the first gameweek only.
+
+        Returns a player x gameweek DataFrame: indexed by `id` in df_features order,
+        one column per gameweek number. A blank gameweek is 0; a double is the sum of
+        both fixtures. Every (player, fixture) row is scored in ONE call to each
+        model. The summary cache and the rolling features are loaded once, as in
+        predict(). Form is held at its current value across the horizon, because
+        nothing later has been played yet.
+
+        `fixtures` defaults to data/raw/fixtures.json. prediction_mode and
+        prediction_warnings are set exactly as by predict().
+        """
+        self.prediction_mode = "ml"
+        self.prediction_warnings = []
+        self.odds_confidence = "UNKNOWN"
+
+        static = load_bootstrap()
+        start = get_next_gw(static)
+        last = max((ev['id'] for ev in (static or {}).get('events', [])), default=None)
+        gws = [gw for gw in range(start, start + n_gws) if last is None or gw <= last]
+
+        if fixtures is None:
+            fixtures = FeatureProcessor().load_fixtures()
+            if fixtures is None:
+                self.prediction_warnings.append(
+                    "No fixture list (data/raw/fixtures.json): every gameweek in the "
+                    "horizon is scored as a repeat of the next fixture, with no blanks or "
+                    "doubles.")
+        rows = self._horizon_rows(df_features, fixtures, gws)
+        # chance_of_playing_next_round describes the next round only: an injured player
+        # is expected back later, so later gameweeks take no availability haircut.
+        if 'minutes_prob' in rows.columns:
+            rows.loc[rows['event'] != start, 'minutes_prob'] = 1.0
+
+        if is_preseason(static):
+            summaries, _ = load_summary_cache(static=static)
+            points = self._preseason_prediction(rows, summaries)['predicted_points']
+        else:
+            df_merged, reason = self._merge_rolling(df_features, rows)
+            if df_merged is None:
+                points = self._emergency_heuristic(rows, reason=reason)['predicted_points']
+            else:
+                # The rolling days_rest counts up to the next fixture. Later fixtures
+                # are rested from the fixture before them, which is short in a double.
+                later = df_merged['order'] > 0
+                df_merged.loc[later, 'days_rest'] = df_merged.loc[later, '_rest_days'].fillna(
+                    DEFAULT_REST_DAYS).clip(lower=0)
+                points = pd.Series(np.clip(self._score_rows(df_merged), 0, None),
+                                   index=df_merged.index)
+                if 'minutes_prob' in df_merged.columns:
+                    points *= df_merged['minutes_prob'].fillna(1.0).to_numpy()
+
+        grid = (pd.DataFrame({'id': rows['id'].to_numpy(), 'event': rows['event'].to_numpy(),
+                              'points': points.to_numpy()})
+                  .pivot_table(index='id', columns='event', values='points', aggfunc='sum'))
+        return grid.reindex(index=pd.Index(df_features['id'], name='id'),
+                            columns=gws).fillna(0.0)
+
     def generate_audit_report(self, df_train, df_features):
         """Audit report to catch leakage and check model behaviour. Saves a CSV."""
         gw = _get_current_gw()
@@ -834,17 +1217,14 @@ class PointsPredictor:
         df_val = df_train[mask_val].copy()
 
         if not df_val.empty:
-            min_predictor = MinutesPredictor(model_dir=self.model_dir)
-            df_val['projected_minutes'] = min_predictor.predict(df_val)
+            df_val['projected_minutes'] = self.minutes_predictor.predict(df_val)
             df_val['start_probability'] = (df_val['projected_minutes'] > 45).astype(float)
 
             for c in [c for c in self.features_list if c not in df_val.columns]:
                 df_val[c] = 0.0
-            for f in self.features_list:
-                if f in CATEGORICAL_FEATURES:
-                    df_val[f] = df_val[f].astype(str).astype('category')
 
-            df_val['pred'] = self.model.predict(df_val[self.features_list])
+            df_val['pred'] = booster_predict(self.model, df_val, self.features_list,
+                                             self.backend, self.categories)
             df_val['sq_err'] = (df_val['target'] - df_val['pred']) ** 2
 
             print("\n--- In-sample RMSE (2023-24 GW30+) ---")
@@ -961,8 +1341,17 @@ class PointsPredictor:
 
 
 if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Train the minutes and points models")
+    parser.add_argument('--tune', type=float, default=None, metavar='SECONDS',
+                        help="Search both models' parameters for this long before training")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="Training processes (default: one per CPU)")
+    args = parser.parse_args()
+
     predictor = PointsPredictor()
-    predictor.train()
+    predictor.train(workers=args.workers, tune_seconds=args.tune)
 
     if os.path.exists("data/processed/player_features.parquet") and \
             os.path.exists("data/processed/historical_features.parquet"):
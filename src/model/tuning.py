@@ -0,0 +1,109 @@
+"""
+Hyperparameter search for the LightGBM models, by successive halving under a time budget.
+
+A rung scores every surviving configuration on the chronological CV splits. Each fit
+is early-stopped, but never past the rung's round cap. Only the best 1/ETA of the
+configurations go on to the next rung, which has ETA times the rounds. Bad
+configurations are dropped after a cheap fit instead of being trained to convergence.
+
+The hand-set PARAMS are always trial 0, so a search that runs out of time — or finds
+nothing better — returns them rather than something worse. Within a rung the
+configurations are scored in batches, and no batch is started that the budget is not
+expected to cover. Configurations left unscored when time runs out are dropped.
+
+The caller supplies `evaluate(configs, max_rounds)`, which returns one
+(rmse, best_iteration) per configuration. This module knows nothing about the data or
+the process pool.
+"""
+
+import time
+
+import numpy as np
+
+ETA = 3
+
+# name: (low, high, scale). 'log' samples uniformly in log space; 'int' rounds.
+SEARCH_SPACE = {
+    'learning_rate': (0.01, 0.1, 'log'),
+    'num_leaves': (15, 127, 'int'),
+    'max_depth': (4, 10, 'int'),
+    'min_data_in_leaf': (20, 200, 'int'),
+    'feature_fraction': (0.6, 1.0, 'linear'),
+    'bagging_fraction': (0.6, 1.0, 'linear'),
+    'lambda_l1': (1e-3, 1.0, 'log'),
+    'lambda_l2': (1e-2, 10.0, 'log'),
+}
+
+
+def sample_params(rng, base):
+    """`base` with every SEARCH_SPACE parameter drawn at random."""
+    params = dict(base)
+    for name, (low, high, scale) in SEARCH_SPACE.items():
+        if scale == 'log':
+            params[name] = float(np.exp(rng.uniform(np.log(low), np.log(high))))
+        elif scale == 'int':
+            params[name] = int(rng.integers(low, high + 1))
+        else:
+            params[name] = float(rng.uniform(low, high))
+    if params.get('bagging_fraction', 1.0) < 1.0:
+        params.setdefault('bagging_freq', 1)
+    return params
+
+
+def successive_halving(evaluate, base, budget_seconds, n_trials=27, min_rounds=100,
+                       max_rounds=900, batch_size=1, seed=0, default_rounds=None):
+    """
+    Search around `base` for at most `budget_seconds` of wall-clock time.
+
+    `batch_size` is how many configurations `evaluate` should receive at once — the
+    number of trials it can run in parallel.
+
+    Returns a dict: params, num_boost_round (the best trial's mean early-stopping
+    iteration), cv_rmse, and a record of the search (trials scored, rungs reached,
+    seconds spent). A winner only ever fitted under a round cap below `default_rounds`
+    (the rounds the caller trains with untuned) cannot have shown it needs fewer, so it
+    keeps at least `default_rounds`. Otherwise a search cut short after its first rung
+    would train the hand-set PARAMS with fewer rounds than not tuning at all.
+    """
+    rng = np.random.default_rng(seed)
+    configs = [dict(base)] + [sample_params(rng, base) for _ in range(n_trials - 1)]
+    deadline = time.monotonic() + budget_seconds
+    best, scored, rungs, batch_seconds = None, 0, 0, 0.0
+
+    rounds = min_rounds
+    while configs and rounds <= max_rounds:
+        results = []
+        for start in range(0, len(configs), batch_size):
+            # The first batch, holding trial 0, always runs.
+            if best is not None or results:
+                if time.monotonic() + batch_seconds > deadline:
+                    break
+            started = time.monotonic()
+            batch = configs[start:start + batch_size]
+            results += zip(batch, evaluate(batch, rounds))
+            batch_seconds = time.monotonic() - started
+        if not results:
+            break
+        rungs += 1
+        scored += len(results)
+        for params, (rmse, best_iteration) in results:
+            if best is None or rmse < best[1]:
+                best = (params, rmse, best_iteration, rounds)
+
+        results.sort(key=lambda r: r[1][0])
+        configs = [params for params, _ in results[:max(1, len(results) // ETA)]]
+        rounds *= ETA
+        # The next rung's fits can run up to ETA times longer.
+        batch_seconds *= ETA
+
+    params, rmse, best_iteration, cap = best
+    if default_rounds and cap < default_rounds:
+        best_iteration = max(best_iteration, default_rounds)
+    return {
+        'params': params,
+        'num_boost_round': int(best_iteration),
+        'cv_rmse': float(rmse),
+        'search': {'trials_scored': scored, 'rungs': rungs,
+                   'budget_seconds': round(budget_seconds, 1),
+                   'seconds': round(budget_seconds - (deadline - time.monotonic()), 1)},
+    }
@@ -39,6 +39,12 @@ CHIP_KEYS = {
     'Free Hit': 'freehit',
 }
 
+# simulate_squad's column for each chip's gain over a normal gameweek.
+CHIP_OUTCOME_COLUMNS = {
+    'Bench Boost': 'bench_boost',
+    'Triple Captain': 'triple_captain',
+}
+
 CHIP_DISPLAY_2 = {
     'bboost': 'Bench Boost 2',
     '3xc': 'Triple Captain 2',
@@ -59,7 +65,7 @@ class ChipStrategy:
 
     def analyze(self, current_starters, current_bench, current_gw,
                 wildcard_diff=0, freehit_diff=0, active_players=15,
-                current_xi_xp=None):
+                current_xi_xp=None, outcomes=None):
         """
         Recommend chips for the upcoming gameweek.
 
@@ -69,6 +75,10 @@ class ChipStrategy:
 
         wildcard_diff / freehit_diff are XI-level point gains, not 15-man squad sums —
         you only score your XI, so comparing full squads overstates the benefit.
+
+        outcomes, if given, is simulation.simulate_squad's frame for the same squad. The
+        decisions stay on the XP ratios above; the Bench Boost and Triple Captain reasons
+        gain the simulated 10th-90th percentile range of what the chip would add.
         """
         recommendations = []
 
@@ -87,6 +97,13 @@ class ChipStrategy:
         recommendations.append(self._check_wildcard(current_gw, wildcard_diff, current_xi_xp))
         recommendations.append(self._check_freehit(current_gw, freehit_diff, active_players, current_xi_xp))
 
+        if outcomes is not None and len(outcomes):
+            for rec in recommendations[:2]:
+                if rec['recommendation'] != 'Used':
+                    gain = outcomes[CHIP_OUTCOME_COLUMNS[rec['chip']]]
+                    rec['reason'] += (f" Simulated gain {gain.quantile(0.1):.0f}"
+                                      f"–{gain.quantile(0.9):.0f} pts (10th–90th pct).")
+
         # Flag chips that are only available because of the GW20 restoration.
         if current_gw >= GW_RESTORATION_THRESHOLD:
             for rec in recommendations:
@@ -0,0 +1,150 @@
+"""
+The single-gameweek squad problem as sparse arrays, solved in process by HiGHS.
+
+The PuLP path builds a fresh LpProblem of ~3 binaries per player for every solve, then
+writes an MPS file and starts a CBC subprocess to read it. On problems this small,
+that overhead is most of the solve time. `SquadMILP` builds the constraint matrix of
+TransferOptimizer._build once per player pool and hands it to scipy.optimize.milp,
+which runs HiGHS in process. Between solves only the cheap parts change: the objective
+(new predictions), variable bounds (forced players, a pinned transfer count) and the
+transfer rows, which depend on the current squad.
+
+Column layout: x[0:n] squad, y[n:2n] XI, c[2n:3n] captain, then k (transfers) and hits.
+"""
+
+import numpy as np
+import scipy.sparse as sp
+from scipy.optimize import Bounds, LinearConstraint, linprog, milp
+
+from src.optimization.solver import (
+    FORMATION_MAX, FORMATION_MIN, MAX_PER_CLUB, MAX_TRANSFERS_CONSIDERED, SQUAD_QUOTA,
+    SQUAD_SIZE, XI_SIZE,
+)
+
+
+class SquadMILP:
+    def __init__(self, price, etype, team, budget):
+        """`price`, `etype`, `team`: one entry per player, in pool order."""
+        self.n = n = len(price)
+        self.price = np.asarray(price, dtype=float)
+        self.status = None
+        self.K, self.H = 3 * n, 3 * n + 1
+        self.n_cols = 3 * n + 2
+        etype, team = np.asarray(etype), np.asarray(team)
+
+        rows, lo, hi = [], [], []
+
+        def add(cols, coefs, lb, ub):
+            rows.append((np.asarray(cols), np.asarray(coefs, dtype=float)))
+            lo.append(lb)
+            hi.append(ub)
+
+        idx = np.arange(n)
+        ones = np.ones(n)
+        # --- squad (15) ---
+        add(idx, self.price, -np.inf, budget)
+        add(idx, ones, SQUAD_SIZE, SQUAD_SIZE)
+        for pos, quota in SQUAD_QUOTA.items():
+            members = idx[etype == pos]
+            add(members, np.ones(len(members)), quota, quota)
+        for club in np.unique(team):
+            members = idx[team == club]
+            add(members, np.ones(len(members)), -np.inf, MAX_PER_CLUB)
+        # --- starting XI (11), a legal formation drawn from the squad ---
+        add(n + idx, ones, XI_SIZE, XI_SIZE)
+        for pos in SQUAD_QUOTA:
+            members = n + idx[etype == pos]
+            add(members, np.ones(len(members)), FORMATION_MIN[pos], FORMATION_MAX[pos])
+        # --- captain: exactly one, and starting ---
+        add(2 * n + idx, ones, 1, 1)
+
+        data = [coefs for _, coefs in rows]
+        indices = [cols for cols, _ in rows]
+        indptr = np.cumsum([0] + [len(c) for c in indices])
+        dense_part = sp.csr_matrix((np.concatenate(data), np.concatenate(indices), indptr),
+                                   shape=(len(rows), self.n_cols))
+        # y_i - x_i <= 0 and c_i - y_i <= 0, one row each per player
+        eye = sp.identity(n, format='csr')
+        link = sp.bmat([[-eye, eye, None], [None, -eye, eye]], format='csr')
+        link = sp.hstack([link, sp.csr_matrix((2 * n, 2))], format='csr')
+
+        self.A = sp.vstack([dense_part, link], format='csr')
+        self.lo = np.concatenate([lo, np.full(2 * n, -np.inf)])
+        self.hi = np.concatenate([hi, np.zeros(2 * n)])
+        self.integrality = np.ones(self.n_cols)
+
+    def objective(self, points, bench_weight):
+        """Points actually scored, per column: XI, captain again, bench at bench_weight."""
+        n = self.n
+        points = np.asarray(points, dtype=float)
+        obj = np.zeros(self.n_cols)
+        obj[:n] = bench_weight * points
+        obj[n:2 * n] = (1 - bench_weight) * points
+        obj[2 * n:3 * n] = points
+        return obj
+
+    def relaxation(self, points, bench_weight):
+        """
+        The LP relaxation's optimum and each player's reduced cost for joining the
+        squad, or None if the LP fails.
+
+        Raising x_j's lower bound from 0 to 1 leaves the LP's dual solution feasible,
+        so forcing any set of players in costs the relaxation at least the sum of their
+        reduced costs — and the relaxation bounds the integer problem from above.
+        """
+        n = self.n
+        obj = self.objective(points, bench_weight)[:3 * n]
+        A = self.A[:, :3 * n]
+        eq = self.lo == self.hi
+        upper, lower = ~eq & np.isfinite(self.hi), ~eq & np.isfinite(self.lo)
+        res = linprog(-obj, A_ub=sp.vstack([A[upper], -A[lower]]),
+                      b_ub=np.concatenate([self.hi[upper], -self.lo[lower]]),
+                      A_eq=A[eq], b_eq=self.lo[eq], bounds=(0, 1), method='highs')
+        if res.status != 0:
+            return None
+        return -res.fun, res.lower.marginals[:n]
+
+    def solve(self, points, bench_weight, forced=None, owned=None, free_transfers=0,
+              cost_per_hit=4, net_gain_margin=0.0, k_bounds=(0, MAX_TRANSFERS_CONSIDERED)):
+        """
+        Maximise points actually scored. `forced`: player positions pinned into the
+        squad. `owned`: boolean mask of the current squad. When given, the transfer
+        count k = 15 - owned squad members is priced like TransferOptimizer's CBC
+        model and kept within `k_bounds`.
+
+        Returns (squad, xi, captain, k, hits, score) with boolean masks, or None when
+        no optimum was found (the reason is left in self.status). `score` excludes the
+        hit and margin charges.
+        """
+        n = self.n
+        obj = self.objective(points, bench_weight)
+
+        lb, ub = np.zeros(self.n_cols), np.ones(self.n_cols)
+        lb[self.K] = ub[self.K] = lb[self.H] = ub[self.H] = 0
+        if forced is not None:
+            lb[np.asarray(forced, dtype=int)] = 1
+
+        A, lo, hi = self.A, self.lo, self.hi
+        if owned is not None:
+            owned = np.asarray(owned, dtype=float)
+            lb[self.K], ub[self.K] = k_bounds
+            ub[self.H] = np.inf
+            obj[self.K], obj[self.H] = -net_gain_margin, -cost_per_hit
+            # k + sum(owned_i * x_i) = 15   and   hits - k >= -free_transfers
+            rows = sp.lil_matrix((2, self.n_cols))
+            rows[0, np.flatnonzero(owned)] = 1
+            rows[0, self.K] = 1
+            rows[1, self.K], rows[1, self.H] = -1, 1
+            A = sp.vstack([A, rows.tocsr()], format='csr')
+            lo = np.concatenate([lo, [SQUAD_SIZE, -free_transfers]])
+            hi = np.concatenate([hi, [SQUAD_SIZE, np.inf]])
+
+        res = milp(-obj, constraints=LinearConstraint(A, lo, hi), bounds=Bounds(lb, ub),
+                   integrality=self.integrality)
+        self.status = res.message
+        if res.status != 0:
+            return None
+        v = np.round(res.x).astype(int)
+        score = float(obj[:3 * n] @ v[:3 * n])
+        return (v[:n] == 1, v[n:2 * n] == 1, v[2 * n:3 * n] == 1,
+                int(v[self.K]), int(v[self.H]), score)
@@ -0,0 +1,232 @@
+"""
+Monte Carlo squad simulation: points distributions rather than point estimates.
+
+Everything else in src/optimization maximises `predicted_points`, a mean. Captaincy,
+Bench Boost and hit decisions also turn on spread and downside, which a mean hides.
+This module draws whole gameweeks, vectorised over scenarios:
+
+  * each club draws its goals for, Poisson(team_implied_goals), and its goals against,
+    Poisson(-ln clean_sheet_prob), ONCE per scenario — teammates share them, so a
+    back four's clean sheets and a front three's goals are correlated, as in FPL;
+  * each player draws minutes (60+, a cameo, or none) from projected_minutes;
+  * a player's goals are thinned from their club's, at the per-goal share implied by
+    anytime_goal_scorer_prob;
+  * FPL scoring turns those into points (appearance, goals, clean sheet, goals
+    conceded), plus a constant per appearance for everything not modelled (assists,
+    bonus, saves...) chosen so each player's mean is exactly their predicted_points.
+
+simulate_squad then applies FPL's auto-subs and the vice-captain fallback per scenario.
+"""
+
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+_project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+if _project_root not in sys.path:
+    sys.path.insert(0, _project_root)
+
+from src.api.odds import LEAGUE_DEFAULTS, anytime_scorer_probs
+from src.optimization.team_selection import (
+    FORMATION_MAX, FORMATION_MIN, pick_captain, select_starting_xi,
+)
+from src.utils.season import ELEMENT_TYPE_TO_POSITION
+
+N_SIMS = 10_000
+QUANTILES = (0.1, 0.5, 0.9)
+
+# FPL scoring by element_type (1=GK, 2=DEF, 3=MID, 4=FWD).
+GOAL_POINTS = np.array([0, 6, 6, 5, 4])
+CLEAN_SHEET_POINTS = np.array([0, 4, 4, 1, 0])
+CONCEDED_PENALTY = np.array([0, 1, 1, 0, 0])  # per 2 goals conceded, when playing 60+
+
+# A cameo is ~30 minutes: its share of the club's attacking output.
+CAMEO_SHARE = 1 / 3
+
+
+def _column(players, name, default):
+    if name in players.columns:
+        return pd.to_numeric(players[name], errors='coerce').fillna(default).to_numpy(dtype=float)
+    return np.full(len(players), float(default))
+
+
+def _minutes_probs(players):
+    """
+    (P(60+ minutes), P(any appearance)) per player.
+
+    From projected_minutes (m/90 and m/60) when the minutes model ran; the fallback
+    and pre-season paths leave it at zero, and then minutes_prob stands in for both.
+    """
+    minutes = _column(players, 'projected_minutes', 0.0)
+    if (minutes > 0).any():
+        return np.clip(minutes / 90, 0, 1), np.clip(minutes / 60, 0, 1)
+    p = np.clip(_column(players, 'minutes_prob', 1.0), 0, 1)
+    return p, p
+
+
+def simulate_points(players, n_sims=N_SIMS, seed=None):
+    """
+    Points per (scenario, player) as an (n_sims, len(players)) array, and whether each
+    player appeared, as a same-shaped bool array. Players of the same club share their
+    club's goals for and against in every scenario.
+    """
+    rng = np.random.default_rng(seed)
+    n = len(players)
+    etype = players['element_type'].to_numpy(dtype=int)
+    clubs = pd.factorize(players['team'])[0]
+    p60, p_app = _minutes_probs(players)
+
+    tig = _column(players, 'team_implied_goals', LEAGUE_DEFAULTS['team_implied_goals'])
+    tig = np.maximum(tig, 1e-6)
+    cs = np.clip(_column(players, 'clean_sheet_prob', LEAGUE_DEFAULTS['clean_sheet_prob']),
+                 1e-6, 1.0)
+    scorer = _column(players, 'anytime_goal_scorer_prob', np.nan)
+    scorer = np.where(np.isnan(scorer),
+                      anytime_scorer_probs(tig, pd.Series(etype).map(ELEMENT_TYPE_TO_POSITION)),
+                      scorer)
+    share = np.clip(-np.log1p(-np.clip(scorer, 0, 1 - 1e-9)) / tig, 0, 1)
+    against = -np.log(cs)
+
+    # --- shared club draws: one per club, broadcast to its players ---
+    first = pd.Series(np.arange(n)).groupby(clubs).first().to_numpy()
+    goals_for = rng.poisson(tig[first], size=(n_sims, len(first)))[:, clubs]
+    conceded = rng.poisson(against[first], size=(n_sims, len(first)))[:, clubs]
+
+    # --- minutes ---
+    u = rng.random((n_sims, n))
+    full = u < p60
+    appeared = u < p_app
+    involvement = np.where(full, 1.0, np.where(appeared, CAMEO_SHARE, 0.0))
+
+    goals = rng.binomial(goals_for, share * involvement)
+    points = (np.where(full, 2, 0) + np.where(appeared & ~full, 1, 0)
+              + GOAL_POINTS[etype] * goals
+              + full * (CLEAN_SHEET_POINTS[etype] * (conceded == 0)
+                        - CONCEDED_PENALTY[etype] * (conceded // 2)))
+
+    # --- everything unmodelled, as a constant per appearance that matches the mean ---
+    cameo = p_app - p60
+    pairs_conceded = (against - (1 - np.exp(-2 * against)) / 2) / 2   # E[floor(C / 2)]
+    expected = (2 * p60 + cameo
+                + GOAL_POINTS[etype] * tig * share * (p60 + CAMEO_SHARE * cameo)
+                + p60 * (CLEAN_SHEET_POINTS[etype] * cs - CONCEDED_PENALTY[etype] * pairs_conceded))
+    predicted = _column(players, 'predicted_points', 0.0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        residual = np.where(p_app > 0, (predicted - expected) / p_app, 0.0)
+    return points + appeared * residual, appeared
+
+
+def player_quantiles(players, n_sims=N_SIMS, seed=None, quantiles=QUANTILES):
+    """
+    Per-player distribution summary, indexed like `players`:
+
+        points_mean   points_p10   points_p50   points_p90   (for the default quantiles)
+
+    Add it to a starters frame and rank with pick_captain(starters, by='points_p90') to
+    captain for upside rather than the mean.
+    """
+    points, _ = simulate_points(players, n_sims, seed)
+    out = pd.DataFrame({'points_mean': points.mean(axis=0)}, index=players.index)
+    for q, values in zip(quantiles, np.quantile(points, quantiles, axis=0)):
+        out[f'points_p{round(q * 100)}'] = values
+    return out
+
+
+def _auto_subs(points, appeared, etype, n_starters):
+    """
+    Score the XI per scenario, with FPL's automatic substitutions.
+
+    Columns [0, n_starters) are the XI and the rest the bench, in _order_bench order
+    (reserve keeper first). A keeper only replaces the keeper; each outfield bench
+    player who appeared replaces the first non-playing outfield starter whose exit
+    leaves a legal formation.
+    """
+    n_sims = len(points)
+    counted = np.zeros(points.shape, dtype=bool)
+    counted[:, :n_starters] = True
+    out_of_xi = np.zeros(points.shape, dtype=bool)
+    counts = np.tile([np.sum(etype[:n_starters] == pos) for pos in range(5)], (n_sims, 1))
+
+    starters = range(n_starters)
+    for b in range(n_starters, len(etype)):
+        waiting = appeared[:, b].copy()
+        for s in starters:
+            if (etype[s] == 1) != (etype[b] == 1):
+                continue
+            swap = waiting & ~appeared[:, s] & ~out_of_xi[:, s]
+            if etype[s] != etype[b]:
+                swap &= (counts[:, etype[s]] > FORMATION_MIN[etype[s]]) \
+                    & (counts[:, etype[b]] < FORMATION_MAX[etype[b]])
+            out_of_xi[swap, s] = True
+            counted[swap, s], counted[swap, b] = False, True
+            counts[swap, etype[s]] -= 1
+            counts[swap, etype[b]] += 1
+            waiting &= ~swap
+    return counted
+
+
+def _simulate_chunk(squad, n_sims, seed):
+    """One process's share of simulate_squad: per-scenario totals as a DataFrame."""
+    starters, bench = select_starting_xi(squad)
+    captain, vice = pick_captain(starters)
+    lineup = pd.concat([starters, bench])
+    points, appeared = simulate_points(lineup, n_sims, seed)
+    etype = lineup['element_type'].to_numpy(dtype=int)
+
+    counted = _auto_subs(points, appeared, etype, len(starters))
+    total = np.where(counted, points, 0.0).sum(axis=1)
+
+    # The armband passes to the vice only if the captain did not play at all.
+    armband = np.zeros(len(points))
+    ids = lineup['id'].to_numpy()
+    if captain is not None:
+        c = np.flatnonzero(ids == captain['id'])[0]
+        armband = np.where(appeared[:, c], points[:, c], 0.0)
+        if vice is not None:
+            v = np.flatnonzero(ids == vice['id'])[0]
+            armband = np.where(appeared[:, c], armband,
+                               np.where(appeared[:, v], points[:, v], 0.0))
+
+    return pd.DataFrame({
+        'total': total + armband,
+        # Chip gains over the normal total: Bench Boost scores all fifteen with no subs,
+        # Triple Captain adds the armband's points once more.
+        'bench_boost': points.sum(axis=1) + armband - (total + armband),
+        'triple_captain': armband,
+    })
+
+
+def simulate_squad(squad, n_sims=N_SIMS, seed=None, workers=1):
+    """
+    Simulated gameweeks for a 15-man squad, one row per scenario:
+
+        total            points actually scored: XI after auto-subs, armband included
+        bench_boost      what playing Bench Boost would have added
+        triple_captain   what playing Triple Captain would have added
+
+    The XI, bench order, captain and vice are those select_starting_xi and
+    pick_captain would show. With `workers` > 1 the scenarios are split across a
+    process pool, each chunk on its own seed stream.
+    """
+    if squad is None or squad.empty:
+        return pd.DataFrame(columns=['total', 'bench_boost', 'triple_captain'])
+    if workers <= 1:
+        return _simulate_chunk(squad, n_sims, seed)
+
+    sizes = [n_sims // workers + (i < n_sims % workers) for i in range(workers)]
+    seeds = np.random.SeedSequence(seed).spawn(workers)
+    with ProcessPoolExecutor(workers) as pool:
+        chunks = list(pool.map(_simulate_chunk, [squad] * workers, sizes, seeds))
+    return pd.concat(chunks, ignore_index=True)
+
+
+def summarise(values, quantiles=QUANTILES):
+    """{'mean': ..., 'p10': ..., 'p50': ..., 'p90': ...} for one simulated column."""
+    values = np.asarray(values, dtype=float)
+    out = {'mean': float(values.mean()) if len(values) else 0.0}
+    for q in quantiles:
+        out[f'p{round(q * 100)}'] = float(np.quantile(values, q)) if len(values) else 0.0
+    return out
@@ -1,6 +1,18 @@
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
 import pulp
 import pandas as pd
 
+_project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+if _project_root not in sys.path:
+    sys.path.insert(0, _project_root)
+
+from src.api.fpl import MAX_FREE_TRANSFERS
+from src.optimization.team_selection import select_starting_xi
+
 # element_type: 1=GK, 2=DEF, 3=MID, 4=FWD
 SQUAD_QUOTA = {1: 2, 2: 5, 3: 5, 4: 3}
 SQUAD_SIZE = 15
@@ -8,6 +20,9 @@ XI_SIZE = 11
 MAX_PER_CLUB = 3
 MAX_TRANSFERS_CONSIDERED = 3
 
+# A squad's other 14 players can fill at most this many clubs to the cap (_presolve).
+MAX_FULL_CLUBS = (SQUAD_SIZE - 1) // MAX_PER_CLUB
+
 # Legal starting-XI shape.
 FORMATION_MIN = {1: 1, 2: 3, 3: 2, 4: 1}
 FORMATION_MAX = {1: 1, 2: 5, 3: 5, 4: 3}
@@ -20,16 +35,35 @@ FORMATION_MAX = {1: 1, 2: 5, 3: 5, 4: 3}
 # with cheap cover, which systematically prices out premiums.
 BENCH_WEIGHT = 0.15
 
-# An extra transfer must beat the incumbent plan by more than this to be worth making.
+# Each transfer must beat the incumbent plan by more than this to be worth making.
 # Point predictions carry roughly this much noise, so churning the squad for a smaller
 # margin trades a real, banked free transfer for a difference the model cannot resolve.
-# k is evaluated in ascending order, so ties keep the FEWER-transfer plan.
+# It is charged per transfer inside the objective, so ties keep the FEWER-transfer plan.
 NET_GAIN_MARGIN = 0.5
 
+# Multi-gameweek planner. Free transfers bank up to the game's cap; beyond a few weeks
+# the projections are too uncertain to plan against, and the model grows linearly.
+MAX_PLAN_HORIZON = 8
+PLAN_TIME_LIMIT = 30  # seconds; CBC returns its best plan found so far
+
+# Solver backends for the single-gameweek problems (solve_team, explain_exclusion and
+# the transfer methods). 'cbc' builds a PuLP model and runs CBC as a subprocess per
+# solve. 'highs' keeps the constraint matrix in memory per player pool and re-solves
+# it in process through scipy.optimize.milp; see highs_model. The multi-gameweek
+# planner always uses CBC.
+BACKENDS = ('cbc', 'highs')
+
+# inclusion_costs() prices players exactly up to this many points; a pick proven to
+# cost more is a clear loss under the model, and the table only reports that bound.
+INCLUSION_COST_CAP = 2.0
 
 class TransferOptimizer:
-    def __init__(self, budget=100.0):
+    def __init__(self, budget=100.0, backend='cbc'):
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown solver backend {backend!r}; expected one of {BACKENDS}.")
         self.budget = budget
+        self.backend = backend
+        self._milp = None  # (pool key, SquadMILP) of the last pool solved in process
 
     @staticmethod
     def _lookups(df):
@@ -110,6 +144,69 @@ class TransferOptimizer:
         squad['is_captain'] = [c[i].value() == 1.0 for i in chosen]
         return squad
 
+    @staticmethod
+    def _extract_masks(df, squad, xi, captain):
+        """_extract for the in-process backend, which returns boolean masks over df."""
+        out = df[squad].copy()
+        out['is_starter'] = xi[squad].tolist()
+        out['is_captain'] = captain[squad].tolist()
+        return out
+
+    def _squad_milp(self, df):
+        """
+        The in-process model of the squad problem over `df`.
+
+        It is keyed on everything its constraints read — ids, prices, positions, clubs
+        and the budget — so re-solving the same pool with new predictions, a forced
+        player or a pinned transfer count reuses it.
+        """
+        from src.optimization.highs_model import SquadMILP
+
+        key = (self.budget,) + tuple(tuple(df[col]) for col in
+                                     ('id', 'price', 'element_type', 'team'))
+        if self._milp is None or self._milp[0] != key:
+            self._milp = (key, SquadMILP(df['price'].to_numpy(), df['element_type'].to_numpy(),
+                                         df['team'].to_numpy(), self.budget))
+        return self._milp[1]
+
+    def _solve_in_process(self, df, **kwargs):
+        """One HiGHS solve of the squad problem over `df` (SquadMILP.solve's result)."""
+        model = self._squad_milp(df)
+        return model.solve(df['predicted_points'].to_numpy(dtype=float), BENCH_WEIGHT,
+                           **kwargs), model.status
+
+    @staticmethod
+    def _presolve(df, keep=()):
+        """
+        The pool without players no optimal squad needs.
+
+        Player j goes when same-position players from at least quota + MAX_FULL_CLUBS
+        other clubs each cost no more and score no less. In any squad holding j, at
+        most quota - 1 of those sit in the squad and at most MAX_FULL_CLUBS clubs are
+        full, so one of them can always take j's place — and role — for no less. Ties
+        are broken by row order, so of two identical players one survives. Ids in
+        `keep` (forced or owned players, whose presence the model prices) stay.
+        """
+        points = df['predicted_points'].to_numpy(dtype=float)
+        price = df['price'].to_numpy(dtype=float)
+        etype = df['element_type'].to_numpy()
+        clubs = pd.factorize(df['team'])[0]
+        onehot = np.eye(clubs.max() + 1, dtype=int)[clubs] if len(df) else clubs
+
+        drop = np.zeros(len(df), dtype=bool)
+        for pos, quota in SQUAD_QUOTA.items():
+            rows = np.flatnonzero(etype == pos)
+            p, c, t = points[rows], price[rows], clubs[rows]
+            # beats[a, b]: a, from another club, is no dearer and no worse than b
+            beats = (c[:, None] <= c[None, :]) & (p[:, None] >= p[None, :]) \
+                & ((c[:, None] < c[None, :]) | (p[:, None] > p[None, :])
+                   | (rows[:, None] < rows[None, :])) \
+                & (t[:, None] != t[None, :])
+            rival_clubs = ((beats.T.astype(int) @ onehot[rows]) > 0).sum(axis=1)
+            drop[rows] = rival_clubs >= quota + MAX_FULL_CLUBS
+        drop &= ~df['id'].isin(set(keep)).to_numpy()
+        return df[~drop]
+
     def solve_team(self, df, current_team_ids=None, must_include=None, verbose=True):
         """
         Selects the best 15 (11 starters + 4 bench) to maximize points actually scored.
@@ -126,17 +223,31 @@ class TransferOptimizer:
                 print("No priced players available.")
             return None
 
-        players = df.index.tolist()
-        lk = self._lookups(df)
-        prob, x, y, c = self._build(players, lk, self.budget, "squad")
-
         for pid in (must_include or []):
-            forced = [i for i in players if lk['id'][i] == pid]
-            if not forced:
+            if not (df['id'] == pid).any():
                 if verbose:
                     print(f"Cannot force player id {pid}: not in the pool.")
                 return None
-            prob += x[forced[0]] == 1
+        pool = self._presolve(df, keep=must_include or ())
+        if verbose:
+            print(f"Presolve: {len(pool)} of {len(df)} players are candidates.")
+        df = pool
+        ids = df['id'].to_numpy()
+        forced = [(ids == pid).nonzero()[0][0] for pid in (must_include or [])]
+
+        if self.backend == 'highs':
+            result, status = self._solve_in_process(df, forced=forced)
+            if result is None:
+                if verbose:
+                    print(f"No optimal solution found (status: {status}).")
+                return None
+            return self._extract_masks(df, *result[:3])
+
+        players = df.index.tolist()
+        lk = self._lookups(df)
+        prob, x, y, c = self._build(players, lk, self.budget, "squad")
+        for pos in forced:
+            prob += x[players[pos]] == 1
 
         prob.solve(pulp.PULP_CBC_CMD(msg=0))
         if pulp.LpStatus[prob.status] != 'Optimal':
@@ -208,60 +319,405 @@ class TransferOptimizer:
         )
         return result
 
-    def recommend_transfers(self, df_all, current_team_ids, free_transfers=1, cost_per_hit=4):
+    def inclusion_costs(self, df, workers=None, cap=INCLUSION_COST_CAP):
         """
-        Suggests transfers maximizing (points scored - hit costs).
+        explain_exclusion's question for every player at once: what forcing them into
+        the squad costs against the unconstrained optimum, in the optimizer's own
+        objective (XI, captain twice, bench at BENCH_WEIGHT).
+
+        One LP relaxation bounds every player's cost from below through their reduced
+        cost, tightened by dominance (_dominance_bounds). Players whose bound reaches
+        `cap` are not solved. The rest are solved exactly, each over a reduced pool:
+        _presolve's candidates, less any player i who could only sit in a squad forced
+        to hold j and costing under `cap` if
+
+            z_lp - reduced[i] - reduced[j] > best - cap
 
-        The hit cost max(0, k - free_transfers) * 4 is non-linear, so rather than
-        linearising it we solve a separate program for exactly k transfers
-        (k = 0..MAX_TRANSFERS_CONSIDERED) and keep the best NET score. k is capped to
-        stop the solver churning the whole squad for a marginal gain.
+        fails — neither cut changes j's answer. Those
+        solves run on a pool of `workers` processes (default: one per CPU). Always
+        solved in process with HiGHS, whatever self.backend.
+
+        Returns the priced players (df's index) with `id`, `cost_to_own` and `exact`.
+        Where `exact` is False, cost_to_own is a lower bound of at least `cap`.
         """
-        df = df_all[df_all['price'] > 0].copy()
+        df = df[df['price'] > 0]
         if df.empty:
-            print("No priced players available.")
             return None
+        relaxed = self._squad_milp(df).relaxation(df['predicted_points'].to_numpy(dtype=float),
+                                                  BENCH_WEIGHT)
+        if relaxed is None:
+            print("The squad problem's LP relaxation failed.")
+            return None
+        z_lp, reduced = relaxed
+        # Every solve may leave out what _presolve drops, bar the player being forced.
+        kept = df.index.isin(self._presolve(df).index)
+        result, status = self._solve_in_process(df[kept])
+        if result is None:
+            print(f"No optimal solution found (status: {status}).")
+            return None
+        squad = df.index.isin(df.index[kept][result[0]])
+        best = result[5]
+
+        cost = np.maximum(best - self._dominance_bounds(df, z_lp - reduced), 0.0)
+        cost[squad] = 0.0
+        exact = squad.copy()
+        todo = np.flatnonzero(~squad & (cost < cap))
+        # 1e-6: slack for the LP's own tolerances
+        pools = [np.union1d(np.flatnonzero(kept & (reduced <= z_lp - reduced[j] - best + cap
+                                                   + 1e-6)), [j])
+                 for j in todo]
+
+        workers = workers or os.cpu_count() or 1
+        if workers > 1 and len(todo) > 1:
+            with ProcessPoolExecutor(min(workers, len(todo)), initializer=_init_worker,
+                                     initargs=(self.budget, df)) as pool:
+                scores = list(pool.map(_forced_score, pools, todo,
+                                       chunksize=max(1, len(todo) // (4 * workers))))
+        else:
+            scores = [self._forced_score(df, rows, j) for rows, j in zip(pools, todo)]
+
+        for j, score in zip(todo, scores):
+            # A pool answer at or above `cap` proves only that: the true squad may lie
+            # outside it.
+            if score is not None and best - score < cap:
+                cost[j], exact[j] = max(best - score, 0.0), True
+        cost[~exact] = np.maximum(cost[~exact], cap)
+        return pd.DataFrame({'id': df['id'].to_numpy(), 'cost_to_own': cost, 'exact': exact},
+                            index=df.index)
+
+    def _forced_score(self, df, rows, pos):
+        """
+        Best objective with df's row `pos` forced in, choosing only among `rows` (a
+        sorted array holding pos). None if no squad fits.
+        """
+        from src.optimization.highs_model import SquadMILP
+
+        pool = df.iloc[rows]
+        model = SquadMILP(pool['price'].to_numpy(), pool['element_type'].to_numpy(),
+                          pool['team'].to_numpy(), self.budget)
+        result = model.solve(pool['predicted_points'].to_numpy(dtype=float), BENCH_WEIGHT,
+                             forced=[np.searchsorted(rows, pos)])
+        return None if result is None else result[5]
+
+    @staticmethod
+    def _dominance_bounds(df, upper):
+        """
+        Tighten per-player bounds on the forced score across each (club, position)
+        group. If a is no dearer and scores no less than b, swapping a for b turns any
+        squad holding b into a legal one holding a that scores at least as much — so b
+        can do no better than a's bound.
+        """
+        upper = upper.copy()
+        points = df['predicted_points'].to_numpy(dtype=float)
+        price = df['price'].to_numpy(dtype=float)
+        for rows in df.groupby(['team', 'element_type'], sort=False).indices.values():
+            if len(rows) < 2:
+                continue
+            dominates = (price[rows][:, None] <= price[rows][None, :]) \
+                & (points[rows][:, None] >= points[rows][None, :])
+            upper[rows] = np.where(dominates, upper[rows][:, None], np.inf).min(axis=0)
+        return upper
+
+    def _transfer_model(self, df, current_team_ids, free_transfers, cost_per_hit):
+        """
+        The squad problem from the current squad, with the hit cost inside it.
 
+        max(0, k - free_transfers) is linearised with an integer `hits >= k - FT`,
+        which the maximisation holds at exactly max(0, k - FT). Every transfer also
+        pays NET_GAIN_MARGIN, so one is only made when it beats holding by more than
+        the predictions can resolve. The transfer count `k` is a variable whose bounds
+        transfer_frontier() moves to re-solve the same model for each fixed k.
+        """
         players = df.index.tolist()
         lk = self._lookups(df)
-
         current_set = set(current_team_ids)
         incoming = [i for i in players if lk['id'][i] not in current_set]
-        retained_count = len(players) - len(incoming)
 
-        best_solution = None
-        best_net_score = float('-inf')
+        prob, x, y, c = self._build(players, lk, self.budget, "tx")
+        k = pulp.LpVariable("n_transfers", 0, MAX_TRANSFERS_CONSIDERED, pulp.LpInteger)
+        hits = pulp.LpVariable("hits", 0, None, pulp.LpInteger)
+        prob += pulp.lpSum([x[i] for i in incoming]) == k
+        prob += hits >= k - free_transfers
+        score = prob.objective
+        prob.setObjective(score - cost_per_hit * hits - NET_GAIN_MARGIN * k)
+        return prob, players, (x, y, c), k, hits, score
 
-        for k in range(0, MAX_TRANSFERS_CONSIDERED + 1):
-            # Infeasible if we cannot field (15 - k) players we already own — e.g. when
-            # a squad member has left the league and is absent from the player list.
-            if retained_count < (SQUAD_SIZE - k):
-                print(f"Skipping k={k}: only {retained_count} owned players available "
-                      f"(need {SQUAD_SIZE - k}).")
-                continue
+    @staticmethod
+    def _transfer_terms(df, current_team_ids, free_transfers, cost_per_hit):
+        """_transfer_model's extra terms, as SquadMILP.solve arguments."""
+        return {'owned': df['id'].isin(set(current_team_ids)).to_numpy(),
+                'free_transfers': free_transfers, 'cost_per_hit': cost_per_hit,
+                'net_gain_margin': NET_GAIN_MARGIN}
 
-            prob, x, y, c = self._build(players, lk, self.budget, f"tx{k}")
-            prob += pulp.lpSum([x[i] for i in incoming]) == k
+    def recommend_transfers(self, df_all, current_team_ids, free_transfers=1, cost_per_hit=4):
+        """
+        Suggests transfers maximizing (points scored - hit costs), in ONE solve.
 
+        The hit cost max(0, k - free_transfers) * 4 is modelled inside the program
+        (see _transfer_model), so there is no separate solve per k. k is capped at
+        MAX_TRANSFERS_CONSIDERED to stop the solver churning the whole squad for a
+        marginal gain.
+        """
+        df = df_all[df_all['price'] > 0].copy()
+        if df.empty:
+            print("No priced players available.")
+            return None
+        pool = self._presolve(df, keep=current_team_ids)
+        print(f"Presolve: {len(pool)} of {len(df)} players are candidates.")
+        df = pool
+
+        # Infeasible when e.g. more than MAX_TRANSFERS_CONSIDERED squad members have left
+        # the league and are absent from the player list.
+        if self.backend == 'highs':
+            result, status = self._solve_in_process(
+                df, **self._transfer_terms(df, current_team_ids, free_transfers, cost_per_hit))
+            if result is None:
+                print(f"No feasible transfer plan (status: {status}).")
+                return None
+            squad = self._extract_masks(df, *result[:3])
+            n, n_hits, points = result[3:]
+        else:
+            prob, players, (x, y, c), k, hits, score = self._transfer_model(
+                df, current_team_ids, free_transfers, cost_per_hit)
             prob.solve(pulp.PULP_CBC_CMD(msg=0))
             status = pulp.LpStatus[prob.status]
             if status != 'Optimal':
-                print(f"k={k} infeasible (status: {status})")
-                continue
+                print(f"No feasible transfer plan (status: {status}).")
+                return None
+            squad = self._extract(df, players, x, y, c)
+            n, n_hits, points = round(k.value()), round(hits.value()), pulp.value(score)
+
+        print(f"Transfers: {n} | XI+captain: {points:.1f} | Hits: {n_hits} | "
+              f"Net: {points - n_hits * cost_per_hit:.1f}")
+        return squad
+
+    def transfer_frontier(self, df_all, current_team_ids, free_transfers=1, cost_per_hit=4):
+        """
+        Best plan for each exact transfer count k = 0..MAX_TRANSFERS_CONSIDERED, as a
+        DataFrame (k, score, hits, net, squad; one row per feasible k).
 
-            score = pulp.value(prob.objective)
-            hits_taken = max(0, k - free_transfers)
-            net_score = score - hits_taken * cost_per_hit
+        Built once and re-solved with k's bounds pinned — the "what does one more
+        transfer buy me" view recommend_transfers used to print while it solved each
+        k from scratch.
+        """
+        df = df_all[df_all['price'] > 0].copy()
+        if df.empty:
+            return None
+        df = self._presolve(df, keep=current_team_ids)
+
+        rows = []
+        if self.backend == 'highs':
+            terms = self._transfer_terms(df, current_team_ids, free_transfers, cost_per_hit)
+            for n in range(MAX_TRANSFERS_CONSIDERED + 1):
+                result, _ = self._solve_in_process(df, k_bounds=(n, n), **terms)
+                if result is None:
+                    continue
+                points, n_hits = result[5], result[4]
+                rows.append({'k': n, 'score': points, 'hits': n_hits,
+                             'net': points - n_hits * cost_per_hit,
+                             'squad': self._extract_masks(df, *result[:3])})
+            return pd.DataFrame(rows, columns=['k', 'score', 'hits', 'net', 'squad'])
+
+        prob, players, (x, y, c), k, hits, score = self._transfer_model(
+            df, current_team_ids, free_transfers, cost_per_hit)
+        for n in range(MAX_TRANSFERS_CONSIDERED + 1):
+            k.lowBound = k.upBound = n
+            prob.solve(pulp.PULP_CBC_CMD(msg=0))
+            if pulp.LpStatus[prob.status] != 'Optimal':
+                continue
+            points, n_hits = pulp.value(score), round(hits.value())
+            rows.append({'k': n, 'score': points, 'hits': n_hits,
+                         'net': points - n_hits * cost_per_hit,
+                         'squad': self._extract(df, players, x, y, c)})
+        k.lowBound, k.upBound = 0, MAX_TRANSFERS_CONSIDERED
+        return pd.DataFrame(rows, columns=['k', 'score', 'hits', 'net', 'squad'])
+
+    # ------------------------------------------------------------------
+    # Multi-gameweek planning
+    # ------------------------------------------------------------------
+    def plan_transfers(self, df_all, points_by_gw, current_team_ids, free_transfers=1,
+                       selling_prices=None, cost_per_hit=4, time_limit=PLAN_TIME_LIMIT,
+                       verbose=True):
+        """
+        Transfers, XI and captain for each of the next gameweeks, as ONE program.
+
+        `points_by_gw` is a player x gameweek matrix of expected points (indexed by
+        FPL id, one column per gameweek — PointsPredictor.predict_horizon). Solving
+        each week on its own cannot value rolling a free transfer, or making a move a
+        week early for a fixture swing; here every week's squad is a variable:
+
+          x[i,t] squad   y[i,t] XI   c[i,t] captain   — the _build constraints, per week
+          in[i,t] - out[i,t] = x[i,t] - x[i,t-1]      — transfers, from the owned squad
+          bank[t] = bank[t-1] + sells - buys >= 0     — money moves at sell prices
+          ft[t+1] <= ft[t] - free_used[t] + 1, <= MAX_FREE_TRANSFERS
+          hits[t] = transfers[t] - free_used[t],  0 <= free_used[t] <= ft[t]
+
+        `selling_prices` ({id: £m}) is what owned players fetch if sold — FPL keeps
+        half of any rise — and defaults to the current price. The starting bank is
+        self.budget less the squad's sale value.
+
+        Warm-started from holding the current squad, and time-limited: on a timeout
+        CBC's best plan so far is returned. Returns a list with one dict per gameweek
+        (gw, squad, transfers_in, transfers_out, hits, free_transfers, bank, points),
+        or None if no plan is feasible.
+        """
+        gws = list(points_by_gw.columns)[:MAX_PLAN_HORIZON]
+        df = df_all[df_all['price'] > 0].copy()
+        if df.empty or not gws:
+            print("No priced players or no gameweeks to plan.")
+            return None
 
-            print(f"Transfers: {k} | XI+captain: {score:.1f} | Hits: {hits_taken} | "
-                  f"Net: {net_score:.1f}")
+        players = df.index.tolist()
+        lk = self._lookups(df)
+        owned = set(current_team_ids)
+        sell = {i: float((selling_prices or {}).get(lk['id'][i], lk['price'][i]))
+                for i in players}
+        held = [i for i in players if lk['id'][i] in owned]
+        bank0 = self.budget - sum(sell[i] for i in held)
+
+        pts = (points_by_gw.reindex(pd.Index(df['id'], name='id'))[gws]
+                           .fillna(0.0).to_numpy())
+        row = {i: r for r, i in enumerate(players)}
+
+        prob = pulp.LpProblem("plan", pulp.LpMaximize)
+        T = range(len(gws))
+        x = pulp.LpVariable.dicts("sq", (players, T), 0, 1, pulp.LpBinary)
+        y = pulp.LpVariable.dicts("xi", (players, T), 0, 1, pulp.LpBinary)
+        c = pulp.LpVariable.dicts("cp", (players, T), 0, 1, pulp.LpBinary)
+        # Transfers can be continuous: x is integral, and selling and rebuying any part
+        # of a player only costs transfers and money, so it never pays.
+        buy = pulp.LpVariable.dicts("in", (players, T), 0, 1)
+        sold = pulp.LpVariable.dicts("out", (players, T), 0, 1)
+        bank = pulp.LpVariable.dicts("bank", T, 0)
+        ft = pulp.LpVariable.dicts("ft", T, 0, MAX_FREE_TRANSFERS, pulp.LpInteger)
+        free_used = pulp.LpVariable.dicts("free", T, 0, None, pulp.LpInteger)
+        hits = pulp.LpVariable.dicts("hits", T, 0, None, pulp.LpInteger)
+
+        # Each transfer must also clear NET_GAIN_MARGIN, as in recommend_transfers: a
+        # free transfer spent on a gain the model cannot resolve is one not banked.
+        prob += pulp.lpSum(
+            pts[row[i], t] * (y[i][t] + c[i][t] + BENCH_WEIGHT * (x[i][t] - y[i][t]))
+            for i in players for t in T
+        ) - cost_per_hit * pulp.lpSum(hits[t] for t in T) \
+            - NET_GAIN_MARGIN * pulp.lpSum(buy[i][t] for i in players for t in T)
 
-            if net_score > best_net_score + NET_GAIN_MARGIN:
-                best_net_score = net_score
-                best_solution = self._extract(df, players, x, y, c)
+        by_team = {}
+        for i in players:
+            by_team.setdefault(lk['team'][i], []).append(i)
 
-        return best_solution
+        for t in T:
+            # --- squad, XI and captain: the single-week rules, every week ---
+            prob += pulp.lpSum(x[i][t] for i in players) == SQUAD_SIZE
+            for etype, quota in SQUAD_QUOTA.items():
+                prob += pulp.lpSum(x[i][t] for i in players if lk['etype'][i] == etype) == quota
+            for team_players in by_team.values():
+                prob += pulp.lpSum(x[i][t] for i in team_players) <= MAX_PER_CLUB
+            prob += pulp.lpSum(y[i][t] for i in players) == XI_SIZE
+            for etype in SQUAD_QUOTA:
+                in_pos = [y[i][t] for i in players if lk['etype'][i] == etype]
+                prob += pulp.lpSum(in_pos) >= FORMATION_MIN[etype]
+                prob += pulp.lpSum(in_pos) <= FORMATION_MAX[etype]
+            prob += pulp.lpSum(c[i][t] for i in players) == 1
+            for i in players:
+                prob += y[i][t] <= x[i][t]
+                prob += c[i][t] <= y[i][t]
+
+            # --- transfers and money ---
+            for i in players:
+                before = x[i][t - 1] if t else (1 if i in held else 0)
+                prob += x[i][t] - before == buy[i][t] - sold[i][t]
+            prob += bank[t] == (bank[t - 1] if t else bank0) \
+                + pulp.lpSum(sell[i] * sold[i][t] - lk['price'][i] * buy[i][t] for i in players)
+
+            # --- free transfers: used ones first, the rest roll over (capped) ---
+            prob += free_used[t] <= ft[t]
+            prob += hits[t] == pulp.lpSum(buy[i][t] for i in players) - free_used[t]
+            if t == 0:
+                prob += ft[t] == min(max(int(free_transfers), 0), MAX_FREE_TRANSFERS)
+            else:
+                prob += ft[t] <= ft[t - 1] - free_used[t - 1] + 1
+
+        self._warm_start_hold(df, held, pts, row, x, y, c, buy, sold, bank, ft,
+                              free_used, hits, bank0, free_transfers)
+        prob.solve(pulp.PULP_CBC_CMD(msg=0, timeLimit=time_limit, warmStart=True))
+        if prob.sol_status not in (pulp.LpSolutionOptimal, pulp.LpSolutionIntegerFeasible):
+            print(f"No feasible transfer plan (status: {pulp.LpStatus[prob.status]}).")
+            return None
+        if prob.sol_status != pulp.LpSolutionOptimal and verbose:
+            print(f"  Plan not proven optimal within {time_limit}s; returning the best found.")
+
+        # ft[t] is only bounded above in the model (more free transfers never hurt), so
+        # the count each week is replayed from the transfers actually made.
+        plan, n_free = [], min(max(int(free_transfers), 0), MAX_FREE_TRANSFERS)
+        for t in T:
+            week = self._extract(df, players,
+                                 {i: x[i][t] for i in players},
+                                 {i: y[i][t] for i in players},
+                                 {i: c[i][t] for i in players})
+            week['predicted_points'] = pts[[row[i] for i in week.index], t]
+            moved_in = [lk['id'][i] for i in players if (buy[i][t].value() or 0) > 0.5]
+            plan.append({
+                'gw': gws[t],
+                'squad': week,
+                'transfers_in': moved_in,
+                'transfers_out': [lk['id'][i] for i in players if (sold[i][t].value() or 0) > 0.5],
+                'hits': max(0, len(moved_in) - n_free),
+                'free_transfers': n_free,
+                'bank': float(bank[t].value() or 0.0),
+                'points': self.squad_score(week),
+            })
+            n_free = min(max(n_free - len(moved_in), 0) + 1, MAX_FREE_TRANSFERS)
+            if verbose:
+                p = plan[-1]
+                names = df.set_index('id')['web_name'] if 'web_name' in df.columns else None
+                moves = ", ".join(
+                    f"{o} -> {i}" if names is None else f"{names.get(o, o)} -> {names.get(i, i)}"
+                    for o, i in zip(p['transfers_out'], p['transfers_in'])) or "hold"
+                print(f"GW{p['gw']}: {moves} | FT {p['free_transfers']} | hits {p['hits']} | "
+                      f"XI+captain {p['points']:.1f} | bank {p['bank']:.1f}")
+        return plan
 
+    @staticmethod
+    def _warm_start_hold(df, held, pts, row, x, y, c, buy, sold, bank, ft,
+                         free_used, hits, bank0, free_transfers):
+        """
+        Seed CBC with "make no transfers": the owned squad every week, its best legal
+        XI and captain per week. Only usable when the whole squad is still in the pool.
+        """
+        if len(held) != SQUAD_SIZE:
+            return
+        squad = df.loc[held]
+        n_free = min(max(int(free_transfers), 0), MAX_FREE_TRANSFERS)
+        for t in range(pts.shape[1]):
+            week = squad.assign(predicted_points=pts[[row[i] for i in held], t])
+            starters, _ = select_starting_xi(week)
+            captain = starters['predicted_points'].idxmax()
+            for i in row:
+                x[i][t].setInitialValue(int(i in held))
+                y[i][t].setInitialValue(int(i in starters.index))
+                c[i][t].setInitialValue(int(i == captain))
+                buy[i][t].setInitialValue(0)
+                sold[i][t].setInitialValue(0)
+            bank[t].setInitialValue(bank0)
+            ft[t].setInitialValue(n_free)
+            free_used[t].setInitialValue(0)
+            hits[t].setInitialValue(0)
+            n_free = min(n_free + 1, MAX_FREE_TRANSFERS)
+
+
+# inclusion_costs() pool workers: the player frame is shipped once per process, not once
+# per solve.
+_worker = None
+
+
+def _init_worker(budget, df):
+    global _worker
+    _worker = (TransferOptimizer(budget=budget, backend='highs'), df)
+
+
+def _forced_score(rows, pos):
+    optimizer, df = _worker
+    return optimizer._forced_score(df, rows, pos)
 
 if __name__ == "__main__":
     df = pd.read_parquet("data/processed/player_features.parquet")
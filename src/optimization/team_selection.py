@@ -87,10 +87,13 @@ def squad_expected_points(starters, captain_id=None):
     return total
 
 
-def pick_captain(starters):
+def pick_captain(starters, by=None):
     """
     (captain, vice) rows, ranked by captaincy_score when available.
 
+    `by` names another column to rank on — e.g. a simulated percentile such as
+    simulation.player_quantiles' points_p90, to captain for upside over the mean.
+
     captaincy_score discounts rotation risk and a hard fixture — both matter more when
     the score is doubled — so it is a better captaincy ranking than raw predicted points.
 
@@ -102,7 +105,8 @@ def pick_captain(starters):
     if starters is None or starters.empty:
         return None, None
 
-    col = 'captaincy_score' if 'captaincy_score' in starters.columns else 'predicted_points'
+    col = by or ('captaincy_score' if 'captaincy_score' in starters.columns
+                 else 'predicted_points')
     ranked = starters.sort_values(col, ascending=False)
 
     outfield = ranked[ranked['element_type'] != 1]
@@ -1,11 +1,14 @@
 """Rival comparison, report generation, fixture difficulty and the fallback path."""
+import numpy as np
 import pandas as pd
 import pytest
 
 from src.analysis.rivals import RivalSpy
 from src.interface.reporter import ReportGenerator
+from src.api.odds import LEAGUE_DEFAULTS, OddsClient, anytime_scorer_probs
 from src.features.processor import FeatureProcessor
 from src.model.predictor import PointsPredictor
+from src.utils.season import canon_team
 from conftest import make_squad
 
 
@@ -137,6 +140,38 @@ def test_fixture_difficulty_handles_a_team_with_no_upcoming_games():
     assert data[1]['next_kickoff_time'] is None
 
 
+def test_team_frame_joins_fixtures_and_live_odds_once_per_club():
+    teams = pd.DataFrame([{'id': 1, 'name': 'Arsenal', 'short_name': 'ARS', 'code': 3},
+                          {'id': 2, 'name': 'Man Utd', 'short_name': 'MUN', 'code': 1}])
+    fixtures = pd.DataFrame([
+        {'team_h': 1, 'team_a': 2, 'finished': False, 'kickoff_time': '2026-08-21T14:00:00Z',
+         'team_h_difficulty': 2, 'team_a_difficulty': 4}])
+    fp = FeatureProcessor()
+    live = {'Arsenal': {'win_prob': .6, 'draw_prob': .2, 'loss_prob': .2,
+                        'team_implied_goals': 2.1, 'opponent_implied_goals': .8,
+                        'clean_sheet_prob': .45}}
+    frame = fp.team_frame(teams, fp.calculate_fixture_difficulty(fixtures, teams), live)
+    frame = frame.set_index('team')
+
+    assert frame.loc[1, 'opponent_name'] == canon_team('Man Utd')
+    assert frame.loc[2, 'was_home'] == False  # noqa: E712 — numpy bool
+    assert frame.loc[1, 'team_implied_goals'] == 2.1
+    assert frame.loc[2, 'team_implied_goals'] == LEAGUE_DEFAULTS['team_implied_goals']
+    assert frame['_live_odds'].tolist() == [True, False]
+
+    bare = fp.team_frame(teams, {}).set_index('team')
+    assert bare.loc[1, 'next_opponent'] == '-' and bare.loc[1, 'fixture_difficulty'] == 3
+    assert bare.loc[1, 'opponent_name'] == 'UNKNOWN'
+
+
+def test_anytime_scorer_probs_are_column_wise_and_default_unknown_positions():
+    positions = ['FWD', 'MID', 'DEF', 'GK', 'GKP', 'nan']
+    vec = anytime_scorer_probs([1.5, 1.5, 1.5, 1.5, 1.5, 1.0], positions)
+    assert vec[:5] == pytest.approx([OddsClient.compute_anytime_scorer_prob(1.5, p)
+                                     for p in positions[:5]])
+    assert vec[5] == pytest.approx(1 - np.exp(-0.10)), "unknown position uses a 10% share"
+
+
 # ---------------------------------------------------------------- fallback
 def _minimal_infer_frame():
     return pd.DataFrame({
@@ -1,25 +1,36 @@
 """Bulk summary fetching: partial-failure handling and cache reuse."""
 import asyncio
 import json
+from datetime import datetime, timezone
 
 import pytest
 
-from src.api.async_fpl import AsyncFPLClient, cache_filename, refresh_cache
+from src.api.async_fpl import (
+    AdaptiveLimiter, AsyncFPLClient, cache_filename, fingerprint, fingerprint_filename,
+    plan_incremental, refresh_cache, retry_after_seconds,
+)
 
 
 class FakeClient(AsyncFPLClient):
-    """Replaces the network with a scripted set of successes/failures."""
+    """
+    Replaces the network with a scripted set of successes/failures: `fail_ids` are
+    throttled on every attempt, `gone_ids` answer 404.
+    """
+
+    BACKOFF_BASE = 0.0
 
-    def __init__(self, cache_dir, fail_ids=()):
+    def __init__(self, cache_dir, fail_ids=(), gone_ids=()):
         super().__init__(cache_dir=cache_dir)
-        self.fail_ids = set(fail_ids)
+        self.fail_ids, self.gone_ids = set(fail_ids), set(gone_ids)
         self.calls = 0
 
     async def fetch_summary(self, session, player_id, sem):
         self.calls += 1
         if player_id in self.fail_ids:
-            return player_id, None
-        return player_id, {'history': [{'round': 1, 'minutes': 90, 'total_points': 3}]}
+            return player_id, None, True
+        if player_id in self.gone_ids:
+            return player_id, None, False
+        return player_id, {'history': [{'round': 1, 'minutes': 90, 'total_points': 3}]}, False
 
 
 def run(coro):
@@ -62,6 +73,94 @@ def test_large_failure_rate_raises_instead_of_writing_a_partial_cache(tmp_path):
     assert not (tmp_path / cache_filename('2026-27', 4)).exists()
 
 
+class FlakyClient(FakeClient):
+    """Fails each listed player on its first attempt only — a transient 429/timeout."""
+
+    async def fetch_summary(self, session, player_id, sem):
+        if player_id in self.fail_ids:
+            self.fail_ids.discard(player_id)
+            self.calls += 1
+            return player_id, None, True
+        return await super().fetch_summary(session, player_id, sem)
+
+
+def test_transient_failures_are_requeued_instead_of_failing_the_refresh(tmp_path):
+    ids = list(range(1, 101))
+    c = FlakyClient(str(tmp_path), fail_ids=set(range(1, 31)))   # 30% on the first pass
+    out = run(c.get_all_summaries(ids, 4, '2026-27'))
+    assert len(out) == 100
+    assert c.calls == 130, "each failed player is retried exactly once"
+
+
+def test_a_final_4xx_is_not_requeued(tmp_path):
+    ids = list(range(1, 101))
+    c = FakeClient(str(tmp_path), gone_ids={7})
+    out = run(c.get_all_summaries(ids, 4, '2026-27'))
+    assert c.calls == 100, "a removed player is asked for once, not on every pass"
+    assert '7' not in out
+
+
+def test_limiter_grows_on_fast_successes_and_halves_on_throttling():
+    limiter = AdaptiveLimiter(initial=10, minimum=2, maximum=12, cooldown=0)
+    for _ in range(10):
+        limiter.on_success(latency=0.1)
+    assert 10.9 < limiter.limit < 11.1
+
+    limiter.on_throttle()
+    assert limiter.limit == pytest.approx(5.5, rel=0.02)
+    for _ in range(5):
+        limiter.on_throttle()
+    assert limiter.limit == 2, "never below the floor"
+
+
+def test_slow_responses_back_off_gently():
+    limiter = AdaptiveLimiter(initial=10, latency_target=1.0, cooldown=0)
+    limiter.on_success(latency=5.0)
+    assert limiter.limit == pytest.approx(9.0)
+
+
+def test_one_overload_only_counts_once_within_the_cooldown():
+    limiter = AdaptiveLimiter(initial=16, cooldown=60)
+    for _ in range(8):
+        limiter.on_throttle()
+    assert limiter.limit == 8
+
+
+def test_retry_after_pauses_new_requests():
+    async def scenario():
+        limiter = AdaptiveLimiter(initial=4)
+        limiter.on_throttle(retry_after=0.2)
+        started = asyncio.get_running_loop().time()
+        async with limiter:
+            return asyncio.get_running_loop().time() - started
+
+    assert run(scenario()) >= 0.15
+
+
+def test_limiter_never_exceeds_its_concurrency_limit():
+    async def scenario():
+        limiter = AdaptiveLimiter(initial=3, maximum=3)
+        peak = 0
+
+        async def job():
+            nonlocal peak
+            async with limiter:
+                peak = max(peak, limiter.in_flight)
+                await asyncio.sleep(0.01)
+
+        await asyncio.gather(*[job() for _ in range(20)])
+        return peak
+
+    assert run(scenario()) == 3
+
+
+def test_retry_after_header_parsing():
+    assert retry_after_seconds({'Retry-After': '7'}) == 7.0
+    assert retry_after_seconds({}) is None
+    assert retry_after_seconds({'Retry-After': 'Wed, 21 Oct 2015 07:28:00 GMT'}) == 0.0
+    assert retry_after_seconds({'Retry-After': 'soon'}) is None
+
+
 def test_refresh_cache_fetches_in_preseason(preseason_bootstrap, tmp_path, monkeypatch):
     """
     Pre-season IS fetched: `history` is empty but `history_past` carries previous-season
@@ -92,3 +191,137 @@ def test_refresh_cache_reuses_an_existing_file_without_fetching(preseason_bootst
 def test_refresh_cache_without_bootstrap_is_safe(monkeypatch):
     monkeypatch.setattr('src.api.async_fpl.load_bootstrap', lambda *a, **k: None)
     assert refresh_cache(None) is None
+
+
+# ---------------------------------------------------------------- incremental refresh
+def rollover_bootstrap(bootstrap, changes=None):
+    """GW1 finished, GW2 current. `changes` maps player id -> bootstrap field overrides."""
+    payload = {k: (list(v) if isinstance(v, list) else v) for k, v in bootstrap.items()}
+    payload['elements'] = [
+        {**p, 'total_points': 0, 'minutes': 0, 'event_points': 0, 'starts': 0,
+         'now_cost': 50, **(changes or {}).get(p['id'], {})}
+        for p in bootstrap['elements']
+    ]
+    return payload
+
+
+def fixture(event, kickoff, team_h=1, team_a=2, is_home=True):
+    return {'id': event * 10, 'event': event, 'kickoff_time': kickoff,
+            'team_h': team_h, 'team_a': team_a, 'is_home': is_home}
+
+
+PLAYED = '2026-08-22T14:00:00Z'
+LATER = '2026-08-29T14:00:00Z'
+UPCOMING = '2099-09-05T14:00:00Z'
+NOW = datetime(2026, 8, 30, tzinfo=timezone.utc)
+
+
+# The current fixtures.json: unchanged since the previous cache was written.
+FIXTURES = [fixture(1, PLAYED), fixture(3, UPCOMING)]
+
+
+def previous_cache(static):
+    prints = fingerprint(static)
+    summaries = {pid: {'history': [], 'fixtures': [fixture(1, PLAYED), fixture(3, UPCOMING)]}
+                 for pid in prints}
+    return summaries, prints
+
+
+def test_unchanged_player_is_carried_with_a_synthesised_zero_row(bootstrap):
+    static = rollover_bootstrap(bootstrap)
+    summaries, prints = previous_cache(static)
+
+    refetch, carried = plan_incremental(static, summaries, prints, now=NOW, fixtures=FIXTURES)
+
+    assert refetch == []
+    entry = carried['10']
+    assert [h['round'] for h in entry['history']] == [1]
+    row = entry['history'][0]
+    assert row['minutes'] == 0 and row['total_points'] == 0 and row['starts'] == 0
+    assert row['opponent_team'] == 2 and row['was_home'] is True and row['value'] == 50
+    assert [fx['event'] for fx in entry['fixtures']] == [3], "played fixture must leave the list"
+
+
+def test_changed_fingerprint_forces_a_refetch(bootstrap):
+    before = rollover_bootstrap(bootstrap)
+    summaries, prints = previous_cache(before)
+    after = rollover_bootstrap(bootstrap, {12: {'total_points': 6, 'minutes': 90}})
+
+    refetch, carried = plan_incremental(after, summaries, prints, now=NOW, fixtures=FIXTURES)
+    assert refetch == [12]
+    assert '12' not in carried
+
+
+def test_new_player_and_unfinished_gameweek_are_refetched(bootstrap):
+    static = rollover_bootstrap(bootstrap)
+    summaries, prints = previous_cache(static)
+    del summaries['11']
+    # Kicked off, but GW2 is not finished: a live match may still be scoring.
+    summaries['10']['fixtures'].append(fixture(2, LATER))
+
+    refetch, carried = plan_incremental(static, summaries, prints, now=NOW, fixtures=FIXTURES)
+    assert sorted(refetch) == [10, 11]
+    assert set(carried) == {'12'}
+
+
+def test_a_fixture_postponed_since_the_cache_is_refetched_not_zero_filled(bootstrap):
+    """Its cached kickoff has passed, but it was never played: no phantom appearance."""
+    static = rollover_bootstrap(bootstrap)
+    summaries, prints = previous_cache(static)
+    postponed = [{**fixture(1, PLAYED), 'event': None, 'kickoff_time': None},
+                 fixture(3, UPCOMING)]
+
+    refetch, carried = plan_incremental(static, summaries, prints, now=NOW, fixtures=postponed)
+    assert sorted(refetch) == [10, 11, 12] and carried == {}
+
+    moved = [fixture(1, LATER), fixture(3, UPCOMING)]   # rescheduled within GW1
+    refetch, _ = plan_incremental(static, summaries, prints, now=NOW, fixtures=moved)
+    assert sorted(refetch) == [10, 11, 12]
+
+    refetch, _ = plan_incremental(static, summaries, prints, now=NOW)
+    assert sorted(refetch) == [10, 11, 12], "without a fixture list nothing can be verified"
+
+
+def test_carried_summaries_are_merged_into_the_cache_with_a_fingerprint(tmp_path):
+    c = FakeClient(str(tmp_path))
+    carried = {'5': {'history': [{'round': 1, 'minutes': 0}]}}
+    prints = {'1': [3], '5': [0], '9': [1]}
+    out = run(c.get_all_summaries([1], 4, '2026-27', carried=carried, prints=prints))
+
+    assert c.calls == 1
+    assert set(out) == {'1', '5'}
+    saved = json.loads((tmp_path / fingerprint_filename('2026-27', 4)).read_text())
+    assert saved == {'1': [3], '5': [0]}, "only cached players may be fingerprinted"
+
+
+def test_refresh_cache_starts_from_the_previous_gameweek(bootstrap, tmp_path, monkeypatch):
+    static = rollover_bootstrap(bootstrap, {11: {'minutes': 45}})
+    summaries, prints = previous_cache(rollover_bootstrap(bootstrap))
+    (tmp_path / cache_filename('2026-27', 1)).write_text(json.dumps(summaries))
+    (tmp_path / fingerprint_filename('2026-27', 1)).write_text(json.dumps(prints))
+
+    seen = {}
+
+    async def fake_get_all(self, player_ids, current_gw, season, max_failure_rate=0.05,
+                           carried=None, prints=None):
+        seen.update(ids=player_ids, carried=set(carried or {}), gw=current_gw)
+
+    monkeypatch.setattr(AsyncFPLClient, 'get_all_summaries', fake_get_all)
+    refresh_cache(static, cache_dir=str(tmp_path), fixtures=FIXTURES)
+
+    assert seen['gw'] == 2
+    assert seen['ids'] == [11]
+    assert seen['carried'] == {'10', '12'}
+
+
+def test_fetched_summaries_are_projected_on_receipt(tmp_path):
+    from src.api.replay import Archive, Replayer, ReplaySession
+    archive = Archive(str(tmp_path / 'archive'))
+    archive.put('GET', f'{AsyncFPLClient.BASE_URL}/element-summary/5/', 200, {}, json.dumps(
+        {'history': [{'round': 1, 'expected_goals': '0.30', 'transfers_out': 12}],
+         'fixtures': [], 'history_past': []}).encode())
+
+    client = AsyncFPLClient(cache_dir=str(tmp_path / 'cache'))
+    _, data, _ = run(client.fetch_summary(ReplaySession(Replayer(archive)), 5, AdaptiveLimiter()))
+    assert data['history'][0]['expected_goals'] == 0.30
+    assert 'transfers_out' not in data['history'][0]
@@ -146,6 +146,55 @@ def test_save_load_round_trip_is_lossless(tmp_path):
     assert np.allclose(booster.predict(X), loaded.predict(X))
 
 
+def test_bundle_records_the_categorical_vocabulary(tmp_path):
+    """Serving encodes against the sidecar's lists, not the categories in a request."""
+    import numpy as np
+    import pandas as pd
+    from src.model.predictor import booster_predict
+
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame({'a': rng.normal(size=300),
+                      'position': pd.Categorical(rng.choice(['DEF', 'FWD', 'GKP', 'MID'], 300))})
+    y = X['a'] + (X['position'] == 'FWD') * 3
+    booster = lgb.train({'objective': 'regression', 'verbose': -1, 'min_data_per_group': 5},
+                        lgb.Dataset(X, label=y), num_boost_round=10)
+    base = str(tmp_path / 'm')
+    save_booster(booster, ['a', 'position'], {}, base)
+
+    loaded, meta = load_booster(base)
+    assert meta['categories'] == {'position': ['DEF', 'FWD', 'GKP', 'MID']}
+
+    # Only forwards in the batch: a per-batch category list would give them code 0.
+    serve = pd.DataFrame({'a': [0.0, 0.0], 'position': ['FWD', 'FWD']})
+    preds = booster_predict(loaded, serve, ['a', 'position'], 'lightgbm', meta['categories'])
+    expected = booster.predict(pd.DataFrame({'a': [0.0, 0.0], 'position': pd.Categorical(
+        ['FWD', 'FWD'], categories=['DEF', 'FWD', 'GKP', 'MID'])}))
+    np.testing.assert_allclose(preds, expected)
+    assert preds[0] > booster.predict(X[X['position'] == 'DEF'].assign(a=0.0).head(1))[0]
+
+
+def test_unchanged_bundle_reuses_the_loaded_booster(tmp_path):
+    """load_model() runs per request; only a rewritten bundle should be parsed again."""
+    import numpy as np
+    import pandas as pd
+
+    X = pd.DataFrame({'a': np.arange(100.0), 'b': np.arange(100.0)})
+    booster = lgb.train({'objective': 'regression', 'verbose': -1},
+                        lgb.Dataset(X, label=X['a']), num_boost_round=5)
+    base = str(tmp_path / 'm')
+    save_booster(booster, ['a', 'b'], {'trained_at': 'first'}, base)
+
+    first, meta = load_booster(base)
+    meta['features'].append('mutated')
+    again, meta = load_booster(base)
+    assert again is first
+    assert meta['features'] == ['a', 'b'], "callers get their own copy of the sidecar"
+
+    save_booster(booster, ['a', 'b'], {'trained_at': 'retrained'}, base)
+    reloaded, meta = load_booster(base)
+    assert reloaded is not first and meta['trained_at'] == 'retrained'
+
+
 def test_missing_bundle_reports_absence_rather_than_raising(tmp_path):
     booster, meta = load_booster(str(tmp_path / 'nothing'))
     assert booster is None and meta is None
@@ -180,3 +229,59 @@ def test_predictors_resolve_the_shipped_bundles():
     m = MinutesPredictor()
     assert m.load_model(), f"MinutesPredictor cannot load {m.model_base}"
     assert m.features_list
+
+
+# ---------------------------------------------------------------- compiled inference
+def test_compiled_booster_reproduces_lightgbm(tmp_path):
+    """Categorical splits, NaN- and zero-as-missing splits, unseen categories."""
+    import numpy as np
+    import pandas as pd
+    from src.model.compiled import CompiledBooster
+
+    rng = np.random.default_rng(0)
+    n = 2000
+    X = pd.DataFrame({'a': rng.normal(size=n), 'b': rng.normal(size=n),
+                      'club': pd.Categorical(rng.choice(['ARS', 'CHE', 'LIV', 'MCI'], n))})
+    X.loc[rng.random(n) < 0.2, 'a'] = np.nan
+    X.loc[rng.random(n) < 0.2, 'b'] = 0.0
+    y = X['a'].fillna(3) + (X['club'] == 'LIV') * 2 + X['b'] + rng.normal(scale=0.1, size=n)
+    for params in ({}, {'zero_as_missing': True}):
+        booster = lgb.train({'objective': 'regression', 'verbose': -1, 'num_leaves': 15,
+                             'min_data_per_group': 5, 'cat_smooth': 1, **params},
+                            lgb.Dataset(X, label=y), num_boost_round=30)
+        base = str(tmp_path / 'm')
+        save_booster(booster, list(X.columns), {}, base)
+        booster, _ = load_booster(base)
+
+        serve = X.head(300).copy()
+        serve['club'] = serve['club'].astype(str)
+        serve.loc[:10, 'club'] = 'Coventry'           # never seen in training
+        serve.loc[11:20, 'club'] = np.nan
+        serve.loc[21:30, 'b'] = np.nan
+        expected = booster.predict(serve.astype({'club': 'category'})[list(X.columns)])
+        np.testing.assert_allclose(CompiledBooster(booster).predict(serve), expected,
+                                   rtol=0, atol=1e-12)
+
+
+@requires_models
+def test_compiled_backend_matches_on_the_shipped_models():
+    import numpy as np
+    import pandas as pd
+    from src.model.predictor import booster_predict
+
+    rng = np.random.default_rng(1)
+    for base in (POINTS_BASE, MINUTES_BASE):
+        booster, meta = load_booster(base)
+        frame = pd.DataFrame({f: rng.uniform(0, 90, 500) for f in meta['features']})
+        for f, vocab in zip([f for f in meta['features'] if f in
+                             ('position', 'team_name', 'opponent_name', 'was_home')],
+                            booster.pandas_categorical):
+            frame[f] = rng.choice(list(vocab) + ['Coventry'], 500)
+        expected = booster_predict(booster, frame.copy(), meta['features'], 'lightgbm')
+        got = booster_predict(booster, frame.copy(), meta['features'], 'compiled')
+        np.testing.assert_allclose(got, expected, rtol=0, atol=1e-12)
+
+
+def test_unknown_inference_backend_is_rejected():
+    with pytest.raises(ValueError, match='inference backend'):
+        PointsPredictor(backend='treelite')
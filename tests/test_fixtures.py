@@ -0,0 +1,49 @@
+"""Fixture engine: the long table, fixture-count horizons, and blank/double gameweeks."""
+import pandas as pd
+import pytest
+
+from src.features.fixtures import fixtures_long, gameweek_table, team_horizons
+
+
+def fixture(i, event, h, a, day, dh=3, da=3, finished=False):
+    return {'id': i, 'event': event, 'team_h': h, 'team_a': a, 'finished': finished,
+            'kickoff_time': None if day is None else f'2026-09-{day:02d}T14:00:00Z',
+            'team_h_difficulty': dh, 'team_a_difficulty': da}
+
+
+@pytest.fixture
+def fixtures():
+    return pd.DataFrame([
+        fixture(1, 1, 1, 2, 1, dh=2, da=4, finished=True),
+        fixture(2, 2, 2, 1, 8, dh=5, da=1),
+        fixture(3, 3, 1, 3, 15, dh=3, da=5),
+        fixture(4, 3, 2, 3, 17, dh=2, da=2),        # club 3 doubles in GW3 ...
+        fixture(5, None, 3, 1, None, dh=4, da=4),   # ... and has an unscheduled match
+    ])
+
+
+def test_long_table_has_one_row_per_club_and_fixture(fixtures):
+    long = fixtures_long(fixtures)
+    assert len(long) == 2 * len(fixtures)
+    row = long[(long['fixture'] == 2) & (long['team'] == 1)].iloc[0]
+    assert (row['opponent'], row['is_home'], row['difficulty']) == (2, False, 1)
+
+
+def test_horizons_skip_finished_games_and_put_unscheduled_last(fixtures):
+    h = team_horizons(fixtures_long(fixtures), [1, 2, 3, 4], horizons=(1, 2, None))
+
+    assert h.loc[1, 'next_opponent_id'] == 2 and h.loc[1, 'difficulty_next_1'] == 1
+    assert h.loc[1, 'difficulty_next_2'] == pytest.approx((1 + 3) / 2)
+    assert h.loc[1, 'fixtures_season'] == 3
+    assert h.loc[3, 'difficulty_next_2'] == pytest.approx((5 + 2) / 2), "unscheduled sorts last"
+    assert h.loc[4, 'fixtures_season'] == 0 and h.loc[4, 'difficulty_next_1'] == 3.0
+
+
+def test_gameweek_table_counts_blanks_and_doubles(fixtures):
+    gw = gameweek_table(fixtures_long(fixtures), [1, 2, 3], range(1, 4)).set_index(['team', 'event'])
+
+    assert len(gw) == 9, "every club x gameweek, blanks included"
+    assert gw.loc[(3, 3), 'n_fixtures'] == 2 and gw.loc[(3, 3), 'is_double']
+    assert gw.loc[(3, 3), 'difficulty'] == pytest.approx((5 + 2) / 2)
+    assert gw.loc[(3, 1), 'is_blank'] and gw.loc[(3, 1), 'difficulty'] == 3.0
+    assert gw['n_fixtures'].sum() == 2 * 4, "the unscheduled fixture belongs to no gameweek"
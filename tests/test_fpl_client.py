@@ -1,7 +1,14 @@
-"""Free-transfer accounting, chip parsing and the GW1 picks guard."""
+"""Free-transfer accounting, chip parsing, the GW1 picks guard and pooled fetching."""
+import asyncio
+import json
+from unittest.mock import MagicMock
+
 import pytest
 
-from src.api.fpl import FPLClient, MAX_FREE_TRANSFERS
+from src.api.async_fpl import AsyncFPLClient
+from src.api.fpl import (
+    FPLClient, MAX_FREE_TRANSFERS, POOL_SIZE, picks_search_order, shared_session,
+)
 
 
 @pytest.fixture
@@ -171,3 +178,120 @@ def test_get_team_picks_skips_freehit_gameweeks(monkeypatch):
     assert result is not None
     assert not any('/event/5/' in e for e in seen), "must not request the Free Hit gameweek"
     assert any('/event/4/' in e for e in seen)
+
+
+# ---------------------------------------------------------------- pooled / concurrent fetch
+def test_clients_share_one_pooled_session():
+    a, b = FPLClient(data_dir='.'), FPLClient(data_dir='.')
+    assert a.session is b.session is shared_session()
+    assert a.session.get_adapter('https://fantasy.premierleague.com')._pool_maxsize == POOL_SIZE
+
+
+def test_get_goes_through_the_session(monkeypatch):
+    class Response:
+        def raise_for_status(self):
+            pass
+
+        def json(self):
+            return {'ok': True}
+
+    calls = []
+
+    class Session:
+        def get(self, url, **kwargs):
+            calls.append((url, kwargs['timeout']))
+            return Response()
+
+    c = FPLClient(data_dir='.', session=Session())
+    assert c._get('entry/1/') == {'ok': True}
+    assert calls == [(f"{FPLClient.BASE_URL}/entry/1/", 20)]
+
+
+def test_picks_search_order_matches_the_sequential_walk():
+    assert picks_search_order(10) == [9, 8, 7, 6, 5, 4]
+    assert picks_search_order(3) == [2, 1]
+    assert picks_search_order(1) == []
+
+
+def test_manager_context_is_fetched_in_one_concurrent_pass(monkeypatch, tmp_path):
+    responses = {
+        'entry/7/history/': {'chips': [{'name': 'freehit', 'event': 5}]},
+        'entry/7/transfers/': [{'event': 2}],
+        'entry/7/': {'name': 'Alpha XI'},
+        'entry/7/event/5/picks/': {'picks': [{'element': 99}]},   # Free Hit squad
+        'entry/7/event/4/picks/': {'picks': [{'element': 1}]},
+    }
+    requested = []
+
+    async def fake_get_json(self, session, endpoint):
+        requested.append(endpoint)
+        return responses.get(endpoint)
+
+    monkeypatch.setattr(AsyncFPLClient, '_get_json', fake_get_json)
+    ctx = asyncio.run(AsyncFPLClient(cache_dir=str(tmp_path)).get_manager_context(7, 6))
+
+    assert len(requested) == 3 + len(picks_search_order(6))
+    assert ctx['entry']['name'] == 'Alpha XI'
+    assert ctx['freehit_gws'] == {5}
+    assert ctx['picks'] == {'picks': [{'element': 1}]}, "the Free Hit week must be skipped"
+    # GW1: 2 banked; GW2: 1 used -> 1 +1 = 2; GW3-5 accrue to 5 (GW5 is a chip week).
+    assert ctx['free_transfers'] == 5
+
+
+def test_manager_context_before_gw1_has_no_picks(monkeypatch, tmp_path):
+    async def fake_get_json(self, session, endpoint):
+        return None
+
+    monkeypatch.setattr(AsyncFPLClient, '_get_json', fake_get_json)
+    ctx = asyncio.run(AsyncFPLClient(cache_dir=str(tmp_path)).get_manager_context(7, 1))
+    assert ctx['picks'] is None
+    assert ctx['history'] == {} and ctx['free_transfers'] == 1
+
+
+# ---------------------------------------------------------------- conditional GET
+class ScriptedSession:
+    """Serves one payload with an ETag, then 304 to any request that presents it."""
+
+    def __init__(self, body=b'{"events": [1, 2]}', etag='"v1"'):
+        self.body, self.etag = body, etag
+        self.sent = []
+
+    def get(self, url, headers=None, timeout=None):
+        self.sent.append(dict(headers))
+        response = MagicMock()
+        response.status_code = 304 if headers.get('If-None-Match') == self.etag else 200
+        response.content = self.body
+        response.headers = {'ETag': self.etag}
+        response.json.return_value = json.loads(self.body)
+        return response
+
+
+def test_bootstrap_is_revalidated_and_not_rewritten_on_304(tmp_path):
+    session = ScriptedSession()
+    c = FPLClient(data_dir=str(tmp_path), session=session)
+
+    first = c.get_bootstrap_static()
+    path = tmp_path / 'bootstrap_static.json'
+    assert path.read_bytes() == session.body, "the raw bytes are stored, not re-encoded"
+    assert json.loads((tmp_path / 'bootstrap_static.json.validators.json').read_text())['etag'] == '"v1"'
+
+    mtime = path.stat().st_mtime_ns
+    second = c.get_bootstrap_static()
+    assert session.sent[1]['If-None-Match'] == '"v1"'
+    assert second is first, "a 304 is served from memory without a re-parse"
+    assert path.stat().st_mtime_ns == mtime
+
+
+def test_304_after_a_restart_reads_the_file_from_disk(tmp_path):
+    (tmp_path / 'fixtures.json').write_text('[{"id": 1}]')
+    (tmp_path / 'fixtures.json.validators.json').write_text('{"etag": "\\"v1\\""}')
+    c = FPLClient(data_dir=str(tmp_path), session=ScriptedSession(body=b'[]'))
+    assert c.get_fixtures() == [{'id': 1}]
+
+
+def test_validators_are_not_sent_without_the_file_they_describe(tmp_path):
+    (tmp_path / 'fixtures.json.validators.json').write_text('{"etag": "\\"v1\\""}')
+    session = ScriptedSession(body=b'[{"id": 2}]')
+    c = FPLClient(data_dir=str(tmp_path), session=session)
+    assert c.get_fixtures() == [{'id': 2}]
+    assert 'If-None-Match' not in session.sent[0]
@@ -148,3 +148,114 @@ def test_odds_join_never_duplicates_on_repeated_odds_rows(tmp_path, monkeypatch)
     monkeypatch.setattr('src.api.odds.OddsClient', FakeOdds)
     out = hb._merge_odds(df_all.copy())
     assert len(out) == 2
+
+
+# ------------------------------------------------------------ season partitions
+def write_vaastav(raw_dir, season, points=6):
+    rows = []
+    for gw in (1, 2, 3):
+        for element, team, opp_id in ((1, 'Arsenal', 2), (2, 'Man Utd', 1)):
+            rows.append({'element': element, 'round': gw, 'fixture': 100 + gw, 'value': 55,
+                         'team': team, 'position': 'MID', 'opponent_team': opp_id,
+                         'was_home': element == 1, 'minutes': 90, 'total_points': points,
+                         'starts': 1, 'kickoff_time': f'2022-08-{10 + 7 * gw}T14:00:00Z'})
+    path = raw_dir / 'vaastav'
+    path.mkdir(parents=True, exist_ok=True)
+    pd.DataFrame(rows).to_csv(path / f'merged_gw_{season}.csv', index=False)
+
+
+def test_past_season_partitions_are_reused_until_their_inputs_change(tmp_path, monkeypatch):
+    from src.api.odds import OddsClient
+
+    class NoOdds(OddsClient):
+        def __init__(self, *a, **k): pass
+        def download_historical_odds(self): pass
+        def load_historical_odds(self, season): return None
+
+    monkeypatch.setattr('src.api.odds.OddsClient', NoOdds)
+    write_vaastav(tmp_path, '2022-23')
+    hb = HistoryBuilder(raw_dir=str(tmp_path), cache_dir=str(tmp_path),
+                        processed_dir=str(tmp_path / 'processed'))
+
+    loads = []
+    real_load = hb._load_vaastav_season
+    monkeypatch.setattr(hb, '_load_vaastav_season',
+                        lambda s: (s == '2022-23' and loads.append(s)) or real_load(s))
+
+    first = hb.build_features()
+    assert loads == ['2022-23'] and len(first) == 6
+    assert first['total_points_last_1'].max() == 6
+
+    second = hb.build_features()
+    assert loads == ['2022-23'], "an unchanged season is read back, not rebuilt"
+    pd.testing.assert_frame_equal(first, second)
+
+    write_vaastav(tmp_path, '2022-23', points=9)
+    third = hb.build_features()
+    assert loads == ['2022-23', '2022-23'], "a changed input rebuilds its partition"
+    assert third['total_points_last_1'].max() == 9
+    assert isinstance(third['team_name'].dtype, pd.CategoricalDtype)
+
+
+def test_a_failed_odds_download_is_retried_and_rebuilds_its_season(tmp_path, monkeypatch):
+    """The download runs before hashing, so odds arriving later change the digest."""
+    from src.api.odds import OddsClient
+
+    attempts = []
+
+    class FlakyOdds(OddsClient):
+        def __init__(self, *a, **k): pass
+        def download_historical_odds(self):
+            attempts.append(1)
+            if len(attempts) > 1:   # the first download fails
+                (tmp_path / 'odds').mkdir(exist_ok=True)
+                (tmp_path / 'odds' / 'pl_odds_2022-23.csv').write_text('Date\n')
+        def load_historical_odds(self, season): return None
+
+    monkeypatch.setattr('src.api.odds.OddsClient', FlakyOdds)
+    write_vaastav(tmp_path, '2022-23')
+    hb = HistoryBuilder(raw_dir=str(tmp_path), cache_dir=str(tmp_path),
+                        processed_dir=str(tmp_path / 'processed'))
+    loads = []
+    real_load = hb._load_vaastav_season
+    monkeypatch.setattr(hb, '_load_vaastav_season',
+                        lambda s: (s == '2022-23' and loads.append(s)) or real_load(s))
+
+    hb.build_features()
+    hb.build_features()
+    assert len(attempts) == 2
+    assert loads == ['2022-23', '2022-23'], "the season is rebuilt once its odds arrive"
+
+
+def test_editing_a_feature_source_rebuilds_every_partition(tmp_path, monkeypatch):
+    import os
+    import src.features.history_builder as history_builder
+    from src.api.odds import OddsClient
+
+    class NoOdds(OddsClient):
+        def __init__(self, *a, **k): pass
+        def download_historical_odds(self): pass
+        def load_historical_odds(self, season): return None
+
+    names = {os.path.basename(p) for p in history_builder.FEATURE_SOURCES}
+    assert {'season.py', 'summary_store.py'} <= names, "canonical names shape every row"
+
+    source = tmp_path / 'canon.py'
+    source.write_text("TEAM_NAME_CANON = {}\n")
+    monkeypatch.setattr(history_builder, 'FEATURE_SOURCES',
+                        history_builder.FEATURE_SOURCES + [str(source)])
+    monkeypatch.setattr('src.api.odds.OddsClient', NoOdds)
+    write_vaastav(tmp_path, '2022-23')
+    hb = HistoryBuilder(raw_dir=str(tmp_path), cache_dir=str(tmp_path),
+                        processed_dir=str(tmp_path / 'processed'))
+    loads = []
+    real_load = hb._load_vaastav_season
+    monkeypatch.setattr(hb, '_load_vaastav_season',
+                        lambda s: (s == '2022-23' and loads.append(s)) or real_load(s))
+
+    hb.build_features()
+    hb.build_features()
+    assert loads == ['2022-23']
+    source.write_text("TEAM_NAME_CANON = {'Spurs': 'Tottenham'}\n")
+    hb.build_features()
+    assert loads == ['2022-23', '2022-23'], "a frozen season is rebuilt after a source edit"
@@ -0,0 +1,122 @@
+"""League crawler: pagination, per-member picks/chips, failure handling, persistence."""
+import asyncio
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from src.api.league import LeagueCrawler, has_league, league_ownership
+
+
+class FakeLeague(LeagueCrawler):
+    """
+    A league of `n` ranked members served 50 to a page. `flaky` endpoints 429 once;
+    `throttled` members 429 on every pass; `gone` members 404 (joined too late).
+    """
+
+    BACKOFF_BASE = 0.0
+
+    def __init__(self, cache_dir, n, new_entries=(), flaky=(), gone=(), throttled=()):
+        super().__init__(cache_dir=cache_dir)
+        self.n, self.new_entries = n, list(new_entries)
+        self.flaky, self.gone, self.throttled = set(flaky), set(gone), set(throttled)
+        self.calls = []
+
+    async def _fetch(self, session, endpoint, limiter):
+        self.calls.append(endpoint)
+        if endpoint in self.flaky:
+            self.flaky.discard(endpoint)
+            return endpoint, None, True
+        if endpoint.startswith('leagues-classic'):
+            q = parse_qs(urlparse(endpoint).query)
+            page, ne_page = int(q['page_standings'][0]), int(q['page_new_entries'][0])
+            ranked = [{'entry': e, 'entry_name': f'T{e}', 'player_name': f'M{e}', 'rank': e,
+                       'total': 100 - e, 'event_total': 5}
+                      for e in range(1, self.n + 1)][(page - 1) * 50:page * 50]
+            return endpoint, {
+                'standings': {'results': ranked, 'has_next': page * 50 < self.n},
+                'new_entries': {'results': self.new_entries if ne_page == 1 else [],
+                                'has_next': False},
+            }, False
+        entry = int(endpoint.split('/')[1])
+        if entry in self.throttled:
+            return endpoint, None, True
+        if entry in self.gone:
+            return endpoint, None, False
+        if endpoint.endswith('/picks/'):
+            captain = 10 + entry % 2
+            return endpoint, {'active_chip': '3xc' if entry == 1 else None, 'picks': [
+                {'element': el, 'position': i + 1, 'multiplier': 3 if entry == 1 and el == captain
+                 else 2 if el == captain else 0 if i >= 11 else 1,
+                 'is_captain': el == captain, 'is_vice_captain': False}
+                for i, el in enumerate(range(10, 25))]}, False
+        return endpoint, {'chips': [{'name': 'wildcard', 'event': 2}] if entry % 3 == 0 else []}, False
+
+
+def crawl(c, league_id=7, gw=5, **kw):
+    return asyncio.run(c.crawl(league_id, gw, **kw))
+
+
+def test_every_standings_page_and_member_is_crawled(tmp_path):
+    c = FakeLeague(str(tmp_path), n=430)
+    tables = crawl(c)
+
+    assert tables['members']['entry'].tolist() == list(range(1, 431))
+    assert len(tables['picks']) == 430 * 15
+    assert set(tables['chips']['entry']) == {e for e in range(1, 431) if e % 3 == 0}
+    assert tables['members'].set_index('entry').loc[1, 'active_chip'] == '3xc'
+    assert has_league(str(tmp_path), 7, 5)
+
+    again = FakeLeague(str(tmp_path), n=430)
+    crawl(again)
+    assert again.calls == [], "a second crawl of the same gameweek is read from disk"
+
+
+def test_new_entries_are_members_too(tmp_path):
+    late = [{'entry': 900, 'entry_name': 'Late FC', 'player_first_name': 'A',
+             'player_last_name': 'B'}]
+    tables = crawl(FakeLeague(str(tmp_path), n=3, new_entries=late))
+    members = tables['members'].set_index('entry')
+    assert members.loc[900, 'player_name'] == 'A B'
+    assert len(members) == 4
+
+
+def test_throttled_requests_are_retried_and_missing_members_are_tolerated(tmp_path):
+    c = FakeLeague(str(tmp_path), n=60, flaky={'entry/3/event/5/picks/'}, gone={60})
+    tables = crawl(c)
+    assert c.calls.count('entry/3/event/5/picks/') == 2
+    assert 60 not in set(tables['picks']['entry']), "a 404 is final, not retried"
+    assert 60 in set(tables['members']['entry'])
+
+
+def test_too_many_failed_members_refuses_to_write(tmp_path):
+    c = FakeLeague(str(tmp_path), n=10, throttled={1, 2})
+    with pytest.raises(RuntimeError):
+        crawl(c)
+    assert c.calls.count('entry/1/event/5/picks/') == c.MAX_PASSES
+    assert not has_league(str(tmp_path), 7, 5)
+
+
+def test_late_joiners_are_written_with_empty_squads(tmp_path):
+    """A 404 is final, not a failure: 30% late joiners must not abort the crawl."""
+    tables = crawl(FakeLeague(str(tmp_path), n=10, gone={8, 9, 10}))
+    assert set(tables['members']['entry']) == set(range(1, 11))
+    assert set(tables['picks']['entry']) == set(range(1, 8))
+    assert has_league(str(tmp_path), 7, 5)
+
+
+def test_preseason_crawl_fetches_no_picks(tmp_path):
+    c = FakeLeague(str(tmp_path), n=3)
+    tables = crawl(c, gw=0)
+    assert tables['picks'].empty
+    assert not any(e.endswith('/picks/') for e in c.calls)
+
+
+def test_ownership_and_effective_ownership(tmp_path):
+    tables = crawl(FakeLeague(str(tmp_path), n=4))
+    own = league_ownership(tables['members'], tables['picks']).set_index('element')
+    assert own.loc[10, 'ownership'] == 1.0
+    # Entries 2 and 4 captain element 10; entry 1 triple-captains 11; entry 3 captains 11.
+    assert own.loc[10, 'captaincy'] == 0.5
+    assert own.loc[10, 'effective_ownership'] == pytest.approx((2 + 1 + 2 + 1) / 4)
+    assert own.loc[11, 'effective_ownership'] == pytest.approx((3 + 1 + 2 + 1) / 4)
+    assert own.loc[24, 'effective_ownership'] == 0.0, "bench players score nothing"
@@ -217,10 +217,178 @@ def test_understat_decode_preserves_accented_names(monkeypatch):
         text = html
         def raise_for_status(self): pass
 
-    monkeypatch.setattr('src.api.understat.requests.get', lambda *a, **k: FakeResp())
+    class FakeSession:
+        def get(self, *a, **k): return FakeResp()
+
+    monkeypatch.setattr('src.api.understat.shared_session', lambda: FakeSession())
     df = UnderstatClient(year=2026).get_player_stats()
 
     assert df is not None
     names = list(df['player_name'])
     assert 'Martin Ødegaard' in names, names
     assert 'Bruno Guimarães' in names, names
+
+
+# ---------------------------------------------------------------- horizon
+requires_bundles = pytest.mark.skipif(
+    not (model_bundle_exists(POINTS_MODEL) and model_bundle_exists(MINUTES_MODEL)),
+    reason="trained model required",
+)
+
+
+def horizon_frame():
+    """Two players per club at clubs 1-3, shaped like player_features.parquet."""
+    rows = []
+    for pid, (team, name, pos) in enumerate(
+            [(1, 'Arsenal', 'MID'), (1, 'Arsenal', 'FWD'), (2, 'Man Utd', 'DEF'),
+             (2, 'Man Utd', 'MID'), (3, 'Coventry', 'FWD'), (3, 'Coventry', 'GK')], 1):
+        rows.append({'id': pid, 'team': team, 'team_name': name, 'position': pos,
+                     'price': 6.0, 'minutes_prob': 1.0, 'ep_next': '3.0',
+                     'opponent_name': 'Man Utd' if team == 1 else 'Arsenal',
+                     'was_home': 'True', 'next_fixture_difficulty': 3.0,
+                     'next_kickoff_time': '2026-09-05 14:00:00+00:00',
+                     'win_prob': .5, 'draw_prob': .25, 'loss_prob': .25,
+                     'team_implied_goals': 1.6, 'opponent_implied_goals': 1.1,
+                     'clean_sheet_prob': .33, 'anytime_goal_scorer_prob': .3})
+    return pd.DataFrame(rows)
+
+
+@requires_bundles
+def test_horizon_scores_blanks_as_zero_and_doubles_as_two_fixtures(monkeypatch, bootstrap):
+    static = dict(bootstrap, events=bootstrap['events'] + [
+        {'id': gw, 'deadline_time': f'2026-09-{gw * 7 - 17:02d}T17:30:00Z',
+         'is_current': False, 'is_next': False, 'finished': False} for gw in (4, 5)])
+    monkeypatch.setattr(predictor_mod, 'load_bootstrap', lambda *a, **k: static)
+    df = horizon_frame()
+    summaries = synth_summaries(df['id'].tolist())
+    monkeypatch.setattr(predictor_mod, 'load_summary_cache', lambda *a, **k: (summaries, None))
+
+    def fx(i, gw, h, a, day):
+        return {'id': i, 'event': gw, 'team_h': h, 'team_a': a, 'finished': False,
+                'kickoff_time': f'2026-09-{day:02d}T14:00:00Z',
+                'team_h_difficulty': 3, 'team_a_difficulty': 3}
+    fixtures = pd.DataFrame([fx(1, 3, 1, 2, 5), fx(2, 4, 2, 1, 12), fx(3, 4, 3, 1, 14),
+                             fx(4, 5, 3, 2, 19)])   # club 3 blanks GW3, club 1 doubles GW4
+
+    p = PointsPredictor()
+    grid = p.predict_horizon(df, 5, fixtures=fixtures)
+
+    assert p.prediction_mode == 'ml', p.prediction_warnings
+    assert list(grid.columns) == [3, 4, 5], "capped at the last gameweek"
+    assert list(grid.index) == df['id'].tolist()
+    assert (grid.loc[[5, 6], 3] == 0).all() and (grid.loc[[1, 2], 5] == 0).all()
+
+    single = p.predict(df).set_index('id')['predicted_points']
+    assert grid.loc[1:4, 3].to_numpy() == pytest.approx(single.loc[1:4].to_numpy()), (
+        "the first gameweek is exactly what predict() scores")
+    assert (grid.loc[[1, 2], 4].to_numpy() > grid.loc[[1, 2], 3].to_numpy()).all(), (
+        "two fixtures in a gameweek outscore one")
+
+
+@requires_bundles
+def test_injury_flag_only_discounts_the_next_gameweek(monkeypatch, bootstrap):
+    """chance_of_playing_next_round says nothing about the weeks after it."""
+    static = dict(bootstrap, events=bootstrap['events'] + [
+        {'id': gw, 'deadline_time': f'2026-09-{gw * 7 - 17:02d}T17:30:00Z',
+         'is_current': False, 'is_next': False, 'finished': False} for gw in (4, 5)])
+    monkeypatch.setattr(predictor_mod, 'load_bootstrap', lambda *a, **k: static)
+    df = horizon_frame().assign(minutes_prob=[0.0, 1, 1, 1, 1, 1])
+    summaries = synth_summaries(df['id'].tolist())
+    monkeypatch.setattr(predictor_mod, 'load_summary_cache', lambda *a, **k: (summaries, None))
+
+    grid = PointsPredictor().predict_horizon(df, 3)
+    healthy = PointsPredictor().predict_horizon(df.assign(minutes_prob=1.0), 3)
+
+    first, *later = grid.columns
+    assert grid.loc[1, first] == 0
+    assert (grid.loc[1, later] > 0).all()
+    pd.testing.assert_frame_equal(grid[later], healthy[later])
+
+
+@requires_bundles
+def test_score_batch_matches_predict_with_one_call_per_model(monkeypatch, bootstrap):
+    df = horizon_frame()
+    summaries = synth_summaries(df['id'].tolist())
+    monkeypatch.setattr(predictor_mod, 'load_summary_cache', lambda *a, **k: (summaries, None))
+    injured = df.assign(minutes_prob=[0.0, 1, 1, 1, 1, 1])
+    rested = df.assign(next_kickoff_time='2026-09-20 14:00:00+00:00')
+    frames = [df, injured, rested]
+
+    p = PointsPredictor()
+    singles = [p.predict(f.copy())['predicted_points'] for f in frames]
+
+    calls = []
+    real_predict = predictor_mod.lgb.Booster.predict
+
+    def counting_predict(self, X, *args, **kwargs):
+        calls.append(len(X))
+        return real_predict(self, X, *args, **kwargs)
+    monkeypatch.setattr(predictor_mod.lgb.Booster, 'predict', counting_predict)
+    batch = p.score_batch(frames)
+
+    assert p.prediction_mode == 'ml', p.prediction_warnings
+    assert calls == [3 * len(df)] * 2, "one call to each model for every scenario"
+    for single, out, frame in zip(singles, batch, frames):
+        assert list(out.index) == list(frame.index)
+        assert out['predicted_points'].to_numpy() == pytest.approx(single.to_numpy())
+    assert batch[1]['predicted_points'].iloc[0] == 0
+    assert p.score_batch([]) == []
+
+
+@requires_bundles
+def test_compiled_backend_serves_the_same_predictions(monkeypatch):
+    df = horizon_frame()
+    summaries = synth_summaries(df['id'].tolist())
+    monkeypatch.setattr(predictor_mod, 'load_summary_cache', lambda *a, **k: (summaries, None))
+
+    expected = PointsPredictor().predict(df.copy())
+    p = PointsPredictor(backend='compiled')
+    out = p.predict(df.copy())
+    assert p.prediction_mode == 'ml', p.prediction_warnings
+    for col in ('predicted_points', 'projected_minutes', 'captaincy_score'):
+        assert out[col].to_numpy() == pytest.approx(expected[col].to_numpy(), abs=1e-9)
+
+
+# ---------------------------------------------------------------- training
+def training_frame(seed=0):
+    """Two seasons x 38 GWs of random feature rows; the last GW has no targets yet."""
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame([(s, gw) for s in ('2022-23', '2023-24') for gw in range(1, 39)
+                       for _ in range(40)], columns=['season', 'GW'])
+    n = len(df)
+    for col in predictor_mod.MinutesPredictor().features_list:
+        df[col] = rng.uniform(0, 90, n)
+    for col, values in [('position', ['DEF', 'FWD', 'GKP', 'MID']), ('team_name', ['ARS', 'CHE'])]:
+        df[col] = pd.Categorical(rng.choice(values, n))
+    df['target_minutes'] = (df['minutes_mean_last_3'] + rng.normal(0, 10, n)).clip(0, 90)
+    df['target'] = df['target_minutes'] / 30 + rng.normal(0, 1, n)
+    df.loc[df['GW'] == 38, ['target_minutes', 'target']] = np.nan
+    return df
+
+
+def test_parallel_training_jobs_match_the_in_process_run(tmp_path):
+    """The pool only changes where the OOF folds and CV fits run, never their result."""
+    df = training_frame()
+    p = PointsPredictor(model_dir=str(tmp_path))
+    oof = p._oof_projected_minutes(df, workers=1)
+    assert oof.notna().all() and oof.between(0, 90).all()
+    pd.testing.assert_series_equal(p._oof_projected_minutes(df, workers=2), oof)
+
+    df['projected_minutes'] = oof
+    features = ['projected_minutes', 'position', 'team_name', 'price']
+    in_process = p._run_cv(df, [features, features[:2]], p.PARAMS, workers=1)
+    assert in_process == p._run_cv(df, [features, features[:2]], p.PARAMS, workers=3)
+    assert all(rmse < 999 for rmse in in_process)
+
+
+def test_tuned_parameters_are_saved_with_both_models(tmp_path, monkeypatch):
+    monkeypatch.setattr(predictor_mod, '_get_current_gw', lambda: 0)
+    p = PointsPredictor(model_dir=str(tmp_path))
+    assert p.train(training_frame(), workers=1, tune_seconds=1.5)
+
+    for base in ('lgb_ts_minutes', 'lgb_ts_points'):
+        booster, meta = predictor_mod.load_booster(str(tmp_path / base))
+        assert meta['tuning']['trials_scored'] >= 1
+        assert meta['tuning']['budget_seconds'] > 0
+        assert booster.num_trees() == meta['num_boost_round']
+        assert meta['params']['objective'] == 'regression'
@@ -153,6 +153,19 @@ def test_categorical_features_are_all_name_based():
     assert 'opponent_team' not in CATEGORICAL_FEATURES
 
 
+def test_categorical_encoding_does_not_depend_on_the_batch():
+    """A club keeps its code whatever else is in the frame; an unseen club is missing."""
+    from src.features.categorical import encode_categoricals
+
+    vocabulary = {'team_name': ['Arsenal', 'Chelsea', 'Liverpool']}
+    alone = encode_categoricals(pd.DataFrame({'team_name': ['Liverpool']}), vocabulary)
+    mixed = encode_categoricals(
+        pd.DataFrame({'team_name': ['Chelsea', 'Liverpool', 'Coventry']}), vocabulary)
+    assert alone['team_name'].cat.codes.tolist() == [2]
+    assert mixed['team_name'].cat.codes.tolist() == [1, 2, -1]
+    assert list(mixed['team_name'].cat.categories) == vocabulary['team_name']
+
+
 # ---------------------------------------------------------------- odds calibration
 def test_implied_goals_are_not_inflated():
     """Regression: a stray *1.8 produced 5.36 goals/match against an actual ~3.0."""
@@ -195,6 +208,71 @@ def test_defaults_sit_on_the_same_scale_as_computed_values():
     assert hcs == pytest.approx(LEAGUE_DEFAULTS['clean_sheet_prob'], abs=0.05)
 
 
+def write_odds_csv(raw_dir, rows):
+    (raw_dir / 'odds').mkdir(parents=True, exist_ok=True)
+    pd.DataFrame(rows, columns=['Date', 'HomeTeam', 'AwayTeam', 'AvgH', 'AvgD', 'AvgA',
+                                'Avg>2.5', 'Avg<2.5']).to_csv(
+        raw_dir / 'odds' / 'pl_odds_2023-24.csv', index=False)
+
+
+def test_historical_odds_give_a_home_and_an_away_row_per_match(tmp_path):
+    write_odds_csv(tmp_path, [
+        ['12/08/2023', 'Arsenal', "Nott'm Forest", 1.3, 5.5, 11.0, 1.6, 2.4],
+        ['12/08/2023', 'Chelsea', 'Liverpool', None, 3.6, 2.1, 1.6, 2.4],   # no 1X2 odds
+        ['13/08/2023', 'Brentford', 'Spurs', 3.2, 3.6, 2.2, None, None],   # no O/U market
+    ])
+    odds = OddsClient(cache_dir=str(tmp_path / 'cache'), raw_dir=str(tmp_path))
+    df = odds.load_historical_odds('2023-24')
+
+    assert df['team_name'].tolist() == ['Arsenal', "Nott'm Forest", 'Brentford', 'Spurs']
+    assert df['is_home'].tolist() == [True, False, True, False]
+    home, away = df.iloc[0], df.iloc[1]
+    assert home['win_prob'] == pytest.approx(away['loss_prob'])
+    assert home['win_prob'] + home['draw_prob'] + home['loss_prob'] == pytest.approx(1.0)
+    expected = implied_goals_from_odds(home['win_prob'], home['loss_prob'], 1.6, 2.4)
+    assert (home['team_implied_goals'], away['team_implied_goals'],
+            home['clean_sheet_prob'], away['clean_sheet_prob']) == pytest.approx(expected)
+    assert df.iloc[2]['team_implied_goals'] + df.iloc[3]['team_implied_goals'] == \
+        pytest.approx(TOTAL_GOALS_FALLBACK)
+
+
+def test_historical_odds_cache_is_invalidated_by_a_parser_change(tmp_path, monkeypatch):
+    """Editing odds.py or the club-name mapping must re-parse, not reuse the old frame."""
+    import src.api.odds as odds_mod
+
+    write_odds_csv(tmp_path, [['12/08/2023', 'Arsenal', 'Chelsea', 2.0, 3.4, 3.8, 1.8, 2.0]])
+    odds = OddsClient(cache_dir=str(tmp_path / 'cache'), raw_dir=str(tmp_path))
+    odds.load_historical_odds('2023-24')
+
+    parsed = []
+    real_parse = OddsClient._parse_historical_odds
+    monkeypatch.setattr(OddsClient, '_parse_historical_odds',
+                        staticmethod(lambda df: parsed.append(1) or real_parse(df)))
+    odds.load_historical_odds('2023-24')
+    assert parsed == []
+
+    monkeypatch.setattr(odds_mod, '_PARSER_DIGEST', 'edited')
+    odds.load_historical_odds('2023-24')
+    assert parsed == [1]
+    assert len(list((tmp_path / 'cache').glob('odds_hist_2023-24_*.parquet'))) == 1
+
+
+def test_historical_odds_are_cached_by_csv_content(tmp_path, monkeypatch):
+    match = ['12/08/2023', 'Arsenal', 'Chelsea', 2.0, 3.4, 3.8, 1.8, 2.0]
+    write_odds_csv(tmp_path, [match])
+    odds = OddsClient(cache_dir=str(tmp_path / 'cache'), raw_dir=str(tmp_path))
+    first = odds.load_historical_odds('2023-24')
+
+    monkeypatch.setattr(OddsClient, '_parse_historical_odds',
+                        staticmethod(lambda df: pytest.fail("parsed twice")))
+    pd.testing.assert_frame_equal(odds.load_historical_odds('2023-24'), first)
+
+    monkeypatch.undo()
+    write_odds_csv(tmp_path, [match[:3] + [1.5, 4.0, 6.0, 1.8, 2.0]])
+    assert odds.load_historical_odds('2023-24')['win_prob'].iloc[0] > first['win_prob'].iloc[0]
+    assert len(list((tmp_path / 'cache').glob('odds_hist_2023-24_*'))) == 1, "stale entry removed"
+
+
 @pytest.mark.parametrize('position,expected_order', [('FWD', 3), ('MID', 2), ('DEF', 1), ('GK', 0)])
 def test_anytime_scorer_probability_ranks_by_position(position, expected_order):
     probs = {p: OddsClient.compute_anytime_scorer_prob(1.5, p)
@@ -1,9 +1,12 @@
 """Squad legality, XI selection, captaincy and chip advice."""
+import numpy as np
 import pandas as pd
 import pytest
 
 from conftest import make_squad
-from src.optimization.solver import TransferOptimizer, SQUAD_QUOTA, MAX_PER_CLUB, SQUAD_SIZE
+from src.optimization.solver import (
+    TransferOptimizer, SQUAD_QUOTA, MAX_PER_CLUB, SQUAD_SIZE, NET_GAIN_MARGIN,
+)
 from src.optimization.team_selection import (
     select_starting_xi, squad_expected_points, pick_captain,
     FORMATION_MIN, FORMATION_MAX, XI_SIZE,
@@ -131,6 +134,22 @@ def test_solve_team_respects_every_constraint(player_pool):
     assert squad['price'].sum() <= 100.0 + 1e-6
 
 
+def test_presolve_keeps_the_optimum_and_forced_players(player_pool):
+    pool = TransferOptimizer._presolve(player_pool)
+    assert len(pool) < len(player_pool)
+
+    weakest = int(player_pool.nsmallest(1, 'predicted_points').iloc[0]['id'])
+    assert weakest not in set(pool['id'])
+    assert weakest in set(TransferOptimizer._presolve(player_pool, keep=[weakest])['id'])
+
+
+def test_presolve_does_not_change_the_optimum(player_pool, monkeypatch):
+    opt = TransferOptimizer(budget=100.0)
+    pruned = opt.solve_team(player_pool)
+    monkeypatch.setattr(TransferOptimizer, '_presolve', staticmethod(lambda df, keep=(): df))
+    assert opt.squad_score(pruned) == pytest.approx(opt.squad_score(opt.solve_team(player_pool)))
+
+
 def test_solve_team_returns_none_when_no_players(player_pool):
     assert TransferOptimizer(budget=100.0).solve_team(player_pool.iloc[0:0]) is None
 
@@ -154,6 +173,23 @@ def test_transfers_prefer_holding_when_gain_is_marginal(player_pool):
     assert len(set(result['id']) - set(optimal['id'])) == 0
 
 
+def test_frontier_reports_every_k_from_one_model(player_pool):
+    opt = TransferOptimizer(budget=100.0)
+    noisy = player_pool.assign(predicted_points=player_pool['predicted_points'][::-1].values)
+    current = opt.solve_team(noisy)['id'].tolist()
+    frontier = opt.transfer_frontier(player_pool, current, free_transfers=1)
+
+    assert frontier['k'].tolist() == [0, 1, 2, 3]
+    assert frontier['hits'].tolist() == [0, 0, 1, 2]
+    assert set(frontier.iloc[0]['squad']['id']) == set(current)
+    for _, row in frontier.iterrows():
+        assert len(set(row['squad']['id']) - set(current)) == row['k']
+
+    chosen = opt.recommend_transfers(player_pool, current, free_transfers=1)
+    best = frontier.loc[(frontier['net'] - NET_GAIN_MARGIN * frontier['k']).idxmax()]
+    assert len(set(chosen['id']) - set(current)) == best['k'], "one solve finds the net optimum"
+
+
 def test_transfers_survive_a_player_missing_from_the_pool(player_pool):
     """A squad member who left the league must not make the problem infeasible."""
     opt = TransferOptimizer(budget=100.0)
@@ -164,6 +200,31 @@ def test_transfers_survive_a_player_missing_from_the_pool(player_pool):
     assert_legal_squad(result)
 
 
+def test_highs_backend_matches_cbc(player_pool):
+    cbc, highs = TransferOptimizer(budget=100.0), TransferOptimizer(budget=100.0, backend='highs')
+    squad = highs.solve_team(player_pool)
+    assert_legal_squad(squad)
+    expected = cbc.solve_team(player_pool)
+    assert set(squad['id']) == set(expected['id'])
+    assert highs.squad_score(squad) == pytest.approx(cbc.squad_score(expected))
+
+    noisy = player_pool.assign(predicted_points=player_pool['predicted_points'][::-1].values)
+    current = cbc.solve_team(noisy)['id'].tolist()
+    got = highs.transfer_frontier(player_pool, current, free_transfers=1)
+    want = cbc.transfer_frontier(player_pool, current, free_transfers=1)
+    assert got['hits'].tolist() == want['hits'].tolist()
+    assert got['score'].to_numpy() == pytest.approx(want['score'].to_numpy())
+    model = highs._milp[1]
+    assert set(highs.recommend_transfers(player_pool, current)['id']) == \
+        set(cbc.recommend_transfers(player_pool, current)['id'])
+    assert highs._milp[1] is model, "same pool, new bounds: the sparse model is reused"
+
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError, match='backend'):
+        TransferOptimizer(backend='gurobi')
+
+
 # ---------------------------------------------------------------- chips
 @pytest.fixture
 def chip_inputs():
@@ -199,6 +260,19 @@ def test_bench_boost_fires_on_a_strong_bench(chip_inputs):
     assert chip(recs, 'Bench Boost')['recommendation'] == 'Recommended'
 
 
+def test_simulated_outcomes_annotate_but_do_not_change_chip_advice(chip_inputs):
+    starters, xi = chip_inputs
+    strong = pd.DataFrame({'web_name': list('ABCD'), 'predicted_points': [3.2, 3.0, 2.8, 2.6]})
+    outcomes = pd.DataFrame({'total': np.arange(100.0), 'bench_boost': np.arange(100.0) / 5,
+                             'triple_captain': np.arange(100.0) / 10})
+    plain = ChipStrategy(1, {}).analyze(starters, strong, 5, current_xi_xp=xi)
+    recs = ChipStrategy(1, {}).analyze(starters, strong, 5, current_xi_xp=xi, outcomes=outcomes)
+    for before, after in zip(plain, recs):
+        assert before['recommendation'] == after['recommendation']
+    assert 'Simulated gain 2–18 pts' in chip(recs, 'Bench Boost')['reason']
+    assert 'Simulated' not in chip(recs, 'Wildcard')['reason']
+
+
 def test_bench_boost_saved_on_a_weak_bench(chip_inputs):
     starters, xi = chip_inputs
     weak = pd.DataFrame({'web_name': list('ABCD'), 'predicted_points': [0.9, 0.6, 0.4, 0.2]})
@@ -392,5 +466,86 @@ def test_explainer_quantifies_the_cost_of_an_omitted_player(player_pool):
     assert len(info['displaced']) > 0
 
 
+def test_explainer_forces_players_in_process(player_pool):
+    opt = TransferOptimizer(budget=100.0, backend='highs')
+    baseline = opt.solve_team(player_pool)
+    target = int(player_pool[~player_pool['id'].isin(baseline['id'])]
+                 .nlargest(1, 'predicted_points').iloc[0]['id'])
+    info = opt.explain_exclusion(player_pool, target, baseline=baseline)
+    assert target in set(info['forced_squad']['id'])
+    assert_legal_squad(info['forced_squad'])
+    assert info['cost'] == pytest.approx(
+        TransferOptimizer(budget=100.0).explain_exclusion(player_pool, target)['cost'])
+
+
+def test_inclusion_costs_match_forced_solves(player_pool):
+    pool = player_pool[player_pool['team'] <= 8]
+    opt = TransferOptimizer(budget=100.0, backend='highs')
+    costs = opt.inclusion_costs(pool, workers=2, cap=0.5)
+    baseline = opt.solve_team(pool)
+
+    held = costs['id'].isin(baseline['id'])
+    assert (costs.loc[held, 'cost_to_own'] == 0).all() and costs.loc[held, 'exact'].all()
+    assert (costs.loc[~costs['exact'], 'cost_to_own'] >= 0.5).all()
+    assert costs['exact'].sum() > held.sum(), "some outsiders were solved exactly"
+
+    best = opt._solve_in_process(pool)[0][5]
+    everyone = np.arange(len(pool))
+    for label, row in pd.concat([costs[costs['exact'] & ~held].head(3),
+                                 costs[~costs['exact']].head(3)]).iterrows():
+        truth = best - opt._forced_score(pool, everyone, pool.index.get_loc(label))
+        if row['exact']:
+            assert row['cost_to_own'] == pytest.approx(truth, abs=1e-6)
+        else:
+            assert truth >= 0.5 - 1e-6, "unsolved players really cost at least the cap"
+
+
 def test_explainer_handles_an_unknown_player(player_pool):
     assert TransferOptimizer(budget=100.0).explain_exclusion(player_pool, 999999) is None
+
+
+# ---------------------------------------------------------------- multi-gameweek plan
+def horizon(pool, *weeks):
+    """A player x gameweek points matrix: one column per {id: points} override dict."""
+    base = pool.set_index('id')['predicted_points']
+    return pd.DataFrame({gw: base.copy().astype(float).where(
+        ~base.index.isin(list(w)), pd.Series(w, dtype=float)) for gw, w in enumerate(weeks, 1)})
+
+
+def test_plan_holds_an_optimal_squad_and_banks_free_transfers(player_pool):
+    opt = TransferOptimizer(budget=100.0)
+    optimal = opt.solve_team(player_pool)
+    plan = opt.plan_transfers(player_pool, horizon(player_pool, {}, {}, {}),
+                              optimal['id'].tolist(), free_transfers=1, verbose=False)
+    assert [p['gw'] for p in plan] == [1, 2, 3]
+    assert all(not p['transfers_in'] and p['hits'] == 0 for p in plan)
+    assert [p['free_transfers'] for p in plan] == [1, 2, 3]
+    for p in plan:
+        assert_legal_squad(p['squad'])
+        assert p['points'] == pytest.approx(opt.squad_score(optimal))
+
+
+def test_plan_rolls_a_transfer_to_make_two_moves_when_they_pay(player_pool):
+    """
+    Two outsiders only come good in GW2. Week-by-week solving would spend the GW1 free
+    transfer on one of them early (or take a hit); the planner rolls it instead.
+    """
+    opt = TransferOptimizer(budget=100.0)
+    squad = opt.solve_team(player_pool)
+    clubs = squad['team'].value_counts()
+    outsiders = player_pool[~player_pool['id'].isin(squad['id'])
+                            & (player_pool['team'].map(clubs).fillna(0) < 2)
+                            & player_pool['element_type'].isin([3, 4])]
+    stars = outsiders.nsmallest(2, 'price')['id'].tolist()
+
+    plan = opt.plan_transfers(player_pool,
+                              horizon(player_pool, {s: 0.0 for s in stars},
+                                      {s: 30.0 for s in stars}),
+                              squad['id'].tolist(), free_transfers=1, verbose=False)
+    gw1, gw2 = plan
+    assert gw1['transfers_in'] == []
+    assert set(stars) <= set(gw2['transfers_in']) and gw2['free_transfers'] == 2
+    assert gw1['hits'] == gw2['hits'] == 0
+    assert set(gw2['squad']['id']) == (set(gw1['squad']['id']) - set(gw2['transfers_out'])
+                                       | set(gw2['transfers_in']))
+    assert min(gw1['bank'], gw2['bank']) >= -1e-6
@@ -0,0 +1,117 @@
+"""Record/replay transport: archive addressing, replay over requests and aiohttp, injection."""
+import asyncio
+import json
+
+import pytest
+import requests
+
+from src.api.async_fpl import AsyncFPLClient
+from src.api.fpl import FPLClient
+from src.api.replay import (
+    Archive, ArchiveAdapter, RecordingSession, Replayer, ReplayMiss, canonical_url,
+)
+
+BASE = "https://fantasy.premierleague.com/api"
+
+
+def replay_session(replayer):
+    session = requests.Session()
+    session.mount("https://", ArchiveAdapter('replay', archive=replayer.archive, replayer=replayer))
+    return session
+
+
+def test_archive_is_content_addressed_and_strips_secrets(tmp_path):
+    a = Archive(str(tmp_path))
+    a.put('GET', 'https://x.test/odds?b=2&apiKey=SECRET&a=1', 200, {}, b'{"same": 1}')
+    a.put('GET', 'https://x.test/other', 200, {}, b'{"same": 1}')
+
+    assert a.get('GET', 'https://x.test/odds?a=1&b=2&apiKey=ANOTHER')[2] == b'{"same": 1}'
+    assert len(list((tmp_path / 'blobs').rglob('*'))) == 2, "one directory, one shared blob"
+    assert 'SECRET' not in ''.join(p.read_text() for p in (tmp_path / 'requests').iterdir())
+    assert canonical_url('https://x.test/p', {'z': 1, 'a': 2}) == 'https://x.test/p?a=2&z=1'
+
+
+def test_transient_and_not_modified_responses_are_not_recorded(tmp_path):
+    a = Archive(str(tmp_path))
+    assert not a.put('GET', 'https://x.test/', 503, {}, b'')
+    assert not a.put('GET', 'https://x.test/', 304, {}, b'')
+    assert a.get('GET', 'https://x.test/') is None
+
+
+def test_fpl_client_replays_including_conditional_gets(tmp_path):
+    archive = Archive(str(tmp_path / 'archive'))
+    archive.put('GET', f'{BASE}/bootstrap-static/', 200, {'ETag': '"e1"'}, b'{"events": []}')
+    c = FPLClient(data_dir=str(tmp_path / 'raw'), session=replay_session(Replayer(archive)))
+
+    assert c.get_bootstrap_static() == {'events': []}
+    assert c.get_bootstrap_static() == {'events': []}, "second call is a replayed 304"
+    assert c.get_entry(1) is None, "a replay miss behaves like the network being down"
+
+
+def test_error_injection_is_seeded(tmp_path):
+    archive = Archive(str(tmp_path))
+    archive.put('GET', 'https://x.test/', 200, {}, b'{}')
+
+    def run(seed):
+        r = Replayer(archive, error_rate=0.3, seed=seed)
+        return [r.respond('GET', 'https://x.test/')[0] for _ in range(200)]
+
+    codes = run(7)
+    assert codes == run(7), "same seed, same failures"
+    assert set(codes) == {200, 503}
+    assert 0.15 < codes.count(503) / 200 < 0.45
+
+
+def test_async_summary_fetch_replays_with_injected_errors(tmp_path, monkeypatch):
+    archive = Archive(str(tmp_path / 'archive'))
+    for pid in range(1, 21):
+        archive.put('GET', f'{BASE}/element-summary/{pid}/', 200, {},
+                    json.dumps({'history': [{'round': 1, 'minutes': pid}]}).encode())
+    monkeypatch.setenv('FPL_HTTP_MODE', 'replay')
+    monkeypatch.setenv('FPL_HTTP_ARCHIVE', str(tmp_path / 'archive'))
+    monkeypatch.setenv('FPL_REPLAY_ERROR_RATE', '0.2')
+    monkeypatch.setenv('FPL_REPLAY_LATENCY', '0.001')
+
+    class Client(AsyncFPLClient):
+        BACKOFF_BASE = 0.0
+
+    out = asyncio.run(Client(cache_dir=str(tmp_path / 'cache'))
+                      .get_all_summaries(list(range(1, 21)), 3, '2026-27'))
+    assert out['7']['history'][0]['minutes'] == 7
+    assert len(out) == 20, "injected 503s are retried like real ones"
+
+
+def test_recording_session_archives_what_it_reads(tmp_path):
+    class Upstream:
+        status, headers = 200, {'Content-Type': 'application/json'}
+
+        async def read(self):
+            return b'{"ok": true}'
+
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *exc):
+            return False
+
+    class LiveSession:
+        def get(self, url, **kwargs):
+            return Upstream()
+
+    archive = Archive(str(tmp_path))
+
+    async def go():
+        async with RecordingSession(LiveSession(), archive).get(f'{BASE}/fixtures/') as r:
+            return await r.json()
+
+    assert asyncio.run(go()) == {'ok': True}
+    assert archive.get('GET', f'{BASE}/fixtures/')[0] == 200
+
+
+def test_replay_miss_is_a_connection_error_for_both_transports():
+    import aiohttp
+    assert issubclass(ReplayMiss, requests.exceptions.ConnectionError)
+    assert issubclass(ReplayMiss, aiohttp.ClientConnectionError)
+    with pytest.raises(ReplayMiss):
+        Replayer(Archive('/nonexistent')).respond('GET', 'https://x.test/')
+
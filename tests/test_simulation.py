@@ -0,0 +1,94 @@
+"""Monte Carlo squad simulation: calibration, correlation, auto-subs and the armband."""
+import numpy as np
+import pandas as pd
+
+from conftest import make_squad
+from src.optimization.simulation import (
+    player_quantiles, simulate_points, simulate_squad, summarise,
+)
+from src.optimization.team_selection import pick_captain, select_starting_xi
+
+
+def realistic_squad(**overrides):
+    squad = make_squad(points=[4.0, 2.0, 4.5, 4.2, 3.9, 3.5, 3.0,
+                               6.0, 5.2, 4.8, 3.3, 2.9, 7.1, 5.0, 2.4])
+    squad['projected_minutes'] = 85.0
+    squad['team_implied_goals'] = 1.5
+    squad['clean_sheet_prob'] = 0.3
+    for col, values in overrides.items():
+        squad[col] = values
+    return squad
+
+
+def test_simulated_means_match_predicted_points():
+    squad = realistic_squad()
+    points, _ = simulate_points(squad, n_sims=100_000, seed=1)
+    np.testing.assert_allclose(points.mean(axis=0), squad['predicted_points'], atol=0.05)
+
+
+def test_teammates_share_clean_sheets():
+    """Two defenders of one club keep their clean sheets together, every scenario."""
+    squad = realistic_squad(team=1)
+    squad = squad[squad['element_type'] == 2].head(2).assign(
+        projected_minutes=90.0, predicted_points=0.0)
+    points, _ = simulate_points(squad, n_sims=5_000, seed=2)
+    # Same conceded draws; only their (rare, but 6-point) goals differ.
+    assert np.corrcoef(points.T)[0, 1] > 0.4
+
+    rivals = squad.assign(team=[1, 2])
+    points, _ = simulate_points(rivals, n_sims=5_000, seed=2)
+    assert abs(np.corrcoef(points.T)[0, 1]) < 0.1
+
+
+def test_player_quantiles_are_ordered():
+    q = player_quantiles(realistic_squad(), n_sims=2_000, seed=3)
+    assert list(q.columns) == ['points_mean', 'points_p10', 'points_p50', 'points_p90']
+    assert (q['points_p10'] <= q['points_p50']).all()
+    assert (q['points_p50'] <= q['points_p90']).all()
+
+
+def test_pick_captain_can_rank_on_a_percentile():
+    squad = realistic_squad()
+    starters, _ = select_starting_xi(squad)
+    starters = starters.assign(points_p90=0.0)
+    target = starters.index[starters['element_type'] == 2][0]
+    starters.loc[target, 'points_p90'] = 30.0
+    captain, _ = pick_captain(starters, by='points_p90')
+    assert captain['id'] == starters.loc[target, 'id']
+
+
+def test_first_outfield_sub_replaces_a_non_playing_starter():
+    """The reserve keeper cannot cover a midfielder; the next bench player always does."""
+    squad = realistic_squad()
+    starters, bench = select_starting_xi(squad)
+    squad['is_starter'] = squad.index.isin(starters.index)
+    absent = starters.index[starters['element_type'] == 3][-1]
+    squad.loc[absent, ['projected_minutes', 'predicted_points']] = 0.0
+    outcomes = simulate_squad(squad, n_sims=50_000, seed=4)
+
+    first_outfield = bench[bench['element_type'] != 1].iloc[0]
+    expected = (squad.loc[starters.index, 'predicted_points'].sum()
+                + first_outfield['predicted_points'])
+    scored = outcomes['total'] - outcomes['triple_captain']   # the armband's extra copy
+    assert abs(scored.mean() - expected) < 0.1
+
+
+def test_armband_passes_to_the_vice_when_the_captain_does_not_play():
+    squad = realistic_squad()
+    starters, _ = select_starting_xi(squad)
+    captain, vice = pick_captain(starters)
+    squad.loc[squad['id'] == captain['id'], 'projected_minutes'] = 0.0
+    squad.loc[squad['id'] == captain['id'], 'predicted_points'] = 0.0
+    outcomes = simulate_squad(squad, n_sims=20_000, seed=5)
+    assert outcomes['triple_captain'].mean() > 0.8 * vice['predicted_points']
+
+
+def test_parallel_simulation_returns_every_scenario():
+    outcomes = simulate_squad(realistic_squad(), n_sims=1_001, seed=6, workers=2)
+    assert len(outcomes) == 1_001
+    spread = summarise(outcomes['total'])
+    assert spread['p10'] <= spread['p50'] <= spread['p90']
+
+
+def test_empty_squad_simulates_to_an_empty_frame():
+    assert simulate_squad(pd.DataFrame()).empty
@@ -0,0 +1,98 @@
+"""Columnar element-summary store: round trip, projected reads, JSON backfill."""
+import json
+
+import pandas as pd
+
+from src.api.async_fpl import cache_filename
+from src.api.summary_store import (
+    ensure_store, has_store, project_summary, read_table, summaries_from_store, write_store,
+)
+from src.features.history_builder import HistoryBuilder
+from src.model.predictor import load_summary_cache
+
+
+def summaries():
+    return {
+        '10': {
+            'history': [
+                {'round': 1, 'kickoff_time': '2026-08-22T14:00:00Z', 'opponent_team': 2,
+                 'was_home': True, 'value': 55, 'minutes': 90, 'total_points': 6,
+                 'expected_goals': '0.45', 'selected': 12345},
+                {'round': 2, 'kickoff_time': '2026-08-29T14:00:00Z', 'opponent_team': 3,
+                 'was_home': False, 'value': 55, 'minutes': 30, 'total_points': 1,
+                 'expected_goals': '0.05', 'selected': 13000},
+            ],
+            'fixtures': [{'event': 3, 'kickoff_time': '2026-09-05T14:00:00Z', 'is_home': True}],
+            'history_past': [{'season_name': '2025/26', 'total_points': 180}],
+        },
+        '11': {'history': [], 'fixtures': [], 'history_past': []},
+        '12': {'history': []},
+    }
+
+
+def test_round_trip_keeps_every_player_and_converts_numeric_strings(tmp_path):
+    write_store(summaries(), str(tmp_path), '2026-27', 2)
+    assert has_store(str(tmp_path), '2026-27', 2)
+
+    history = read_table(str(tmp_path), '2026-27', 2, 'history')
+    assert history['expected_goals'].tolist() == [0.45, 0.05]
+    players = read_table(str(tmp_path), '2026-27', 2, 'players')
+    assert sorted(players['player_id']) == [10, 11, 12], "players without history must survive"
+
+
+def test_reads_are_projected_and_filtered(tmp_path):
+    write_store(summaries(), str(tmp_path), '2026-27', 2)
+    history = read_table(str(tmp_path), '2026-27', 2, 'history',
+                         columns=['round', 'minutes', 'not_a_column'], player_ids=[10])
+    assert list(history.columns) == ['player_id', 'round', 'minutes']
+    assert set(history['player_id']) == {10}
+
+
+def test_summaries_shape_is_rebuilt_from_the_store(tmp_path):
+    write_store(summaries(), str(tmp_path), '2026-27', 2)
+    out = summaries_from_store(str(tmp_path), '2026-27', 2, history_columns=['round', 'minutes'])
+    assert set(out) == {'10', '11', '12'}
+    assert [h['round'] for h in out['10']['history']] == [1, 2]
+    assert 'selected' not in out['10']['history'][0]
+    assert out['10']['history_past'][0]['total_points'] == 180
+    assert out['11'] == {'history': [], 'history_past': []}
+
+
+def test_a_json_only_cache_is_backfilled_on_first_load(tmp_path, bootstrap):
+    (tmp_path / cache_filename('2026-27', 2)).write_text(json.dumps(summaries()))
+    out, err = load_summary_cache(cache_dir=str(tmp_path), static=bootstrap)
+
+    assert err is None
+    assert has_store(str(tmp_path), '2026-27', 2)
+    assert out['10']['history'][1]['minutes'] == 30
+    assert not ensure_store(str(tmp_path), '2026-27', 9), "no JSON, nothing to build"
+
+
+def test_history_builder_reads_the_current_season_from_the_store(tmp_path, bootstrap):
+    (tmp_path / 'bootstrap_static.json').write_text(json.dumps(bootstrap))
+    (tmp_path / cache_filename('2026-27', 2)).write_text(json.dumps(summaries()))
+    hb = HistoryBuilder(raw_dir=str(tmp_path), cache_dir=str(tmp_path),
+                        processed_dir=str(tmp_path))
+
+    df = hb._load_current_season()
+    assert len(df) == 2
+    first = df.sort_values('GW').iloc[0]
+    assert first['opponent_name'] == 'Man Utd'
+    assert first['team_name'] == 'Arsenal' and first['position'] == 'GK'
+    assert first['price'] == 5.5 and first['expected_goals'] == 0.45
+    assert pd.isna(df['threat']).sum() == 0, "absent stats default to zero"
+
+
+def test_responses_are_projected_to_the_typed_schema():
+    raw = summaries()['10']
+    raw['history'][0].update({'transfers_in': 1000, 'selected': 5, 'threat': None})
+    out = project_summary(raw)
+
+    first = out['history'][0]
+    assert 'transfers_in' not in first and 'selected' not in first
+    assert first['expected_goals'] == 0.45 and first['threat'] == 0.0
+    assert first['saves'] == 0.0, "stats absent from the response default to zero"
+    assert out['fixtures'][0] == {'event': 3, 'kickoff_time': '2026-09-05T14:00:00Z',
+                                  'is_home': True}
+    assert out['history_past'] == [{'season_name': '2025/26', 'total_points': 180.0}]
+    assert project_summary(out) == out, "projection is idempotent"
@@ -167,3 +167,61 @@ def test_parity_holds_across_a_double_gameweek():
               'minutes_last_1', 'minutes_mean_last_3']:
         assert float(infer[f]) == pytest.approx(float(train[f])), (
             f"{f}: DGW not collapsed identically (train={train[f]} infer={infer[f]})")
+
+
+def reference_rolling(df):
+    """The pre-vectorisation training code, kept as an oracle for the shared engine."""
+    grouped = df.groupby(['season', 'player_id'])
+    out = pd.DataFrame(index=df.index)
+    benched = (df['starts'] == 0).astype(int)
+    for col in ROLLING_COLS + ['benched']:
+        series = benched if col == 'benched' else df[col]
+        g = series.groupby([df['season'], df['player_id']])
+        out[f'{col}_last_1'] = g.shift(1)
+        for w in (3, 5):
+            rolled = g.apply(lambda x: x.shift(1).rolling(window=w, min_periods=1)
+                             .agg('sum' if col == 'benched' else 'mean'))
+            name = f'{col}_sum_last_{w}' if col == 'benched' else f'{col}_mean_last_{w}'
+            out[name] = rolled.reset_index(level=[0, 1], drop=True)
+    kickoff = pd.to_datetime(df['kickoff_time'], utc=True)
+    out['days_rest'] = ((kickoff - kickoff.groupby([df['season'], df['player_id']]).shift(1))
+                        .dt.total_seconds() / 86400).fillna(7.0)
+    return out.fillna(0.0)
+
+
+def test_shared_engine_matches_the_reference_over_a_long_frame():
+    from src.features.rolling import rolling_features
+    rng = np.random.default_rng(0)
+    rows = []
+    for season in ('2023-24', '2024-25'):
+        for pid in range(1, 40):
+            for gw in range(1, rng.integers(1, 15)):
+                row = {'season': season, 'player_id': pid, 'GW': gw,
+                       'kickoff_time': pd.Timestamp('2024-08-10', tz='UTC')
+                       + pd.Timedelta(days=7 * gw + int(rng.integers(0, 3)))}
+                row.update({c: float(rng.integers(0, 10)) for c in ROLLING_COLS})
+                rows.append(row)
+    df = pd.DataFrame(rows).sort_values(['season', 'player_id', 'GW']).reset_index(drop=True)
+
+    got = rolling_features(df, ['season', 'player_id'])
+    want = reference_rolling(df)
+    for col in want.columns:
+        np.testing.assert_allclose(got[col].to_numpy(), want[col].to_numpy(),
+                                   rtol=1e-9, atol=1e-9, err_msg=col)
+
+
+def test_rest_after_a_double_gameweek_is_measured_from_its_last_match():
+    played_dgw = [
+        (1, 90, 6, 1, '2026-08-15T14:00:00Z'),
+        (2, 90, 5, 1, '2026-08-22T14:00:00Z'),
+        (2, 60, 7, 1, '2026-08-25T19:00:00Z'),
+    ]
+    infer = inference_features_for_next_gw(played_dgw, '2026-08-29T19:00:00Z')
+    assert float(infer['days_rest']) == pytest.approx(4.0)
+
+
+def test_blank_gameweek_rest_falls_back_to_the_last_observed_gap():
+    infer = inference_features_for_next_gw(PLAYED[:4], None)
+    assert float(infer['days_rest']) == pytest.approx(14.0)         # 29 Aug -> 12 Sep
+    infer = inference_features_for_next_gw(PLAYED[:1], None)
+    assert float(infer['days_rest']) == pytest.approx(7.0)
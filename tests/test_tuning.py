@@ -0,0 +1,76 @@
+"""Successive halving: pruning by rung, the hand-set baseline, and the time budget."""
+import time
+
+from src.model.tuning import SEARCH_SPACE, sample_params, successive_halving
+
+BASE = {'objective': 'regression', 'learning_rate': 0.03, 'num_leaves': 31, 'verbose': -1}
+
+
+def fake_evaluate(calls):
+    """RMSE falls as learning_rate nears 0.05 and as a rung allows more rounds."""
+    def evaluate(configs, max_rounds):
+        calls.append((len(configs), max_rounds))
+        return [(abs(p['learning_rate'] - 0.05) + 100 / max_rounds, max_rounds // 2)
+                for p in configs]
+    return evaluate
+
+
+def test_each_rung_keeps_the_best_third_with_three_times_the_rounds():
+    calls = []
+    result = successive_halving(fake_evaluate(calls), BASE, budget_seconds=60,
+                                n_trials=27, batch_size=27)
+    assert calls == [(27, 100), (9, 300), (3, 900)]
+    assert result['num_boost_round'] == 450
+    assert result['search']['trials_scored'] == 27 + 9 + 3
+    assert abs(result['params']['learning_rate'] - 0.05) < 0.01
+
+
+def test_sampled_params_stay_in_the_search_space():
+    import numpy as np
+    rng = np.random.default_rng(0)
+    for _ in range(50):
+        params = sample_params(rng, BASE)
+        assert params['objective'] == 'regression'
+        for name, (low, high, scale) in SEARCH_SPACE.items():
+            assert low <= params[name] <= high
+            if scale == 'int':
+                assert isinstance(params[name], int)
+
+
+def test_an_exhausted_budget_still_scores_the_hand_set_params():
+    calls = []
+    result = successive_halving(fake_evaluate(calls), BASE, budget_seconds=0, batch_size=1)
+    assert calls == [(1, 100)]
+    assert result['params'] == BASE
+
+
+def test_no_batch_starts_that_the_budget_cannot_cover():
+    def slow(configs, max_rounds):
+        time.sleep(0.05)
+        return [(1.0, max_rounds)] * len(configs)
+
+    started = time.monotonic()
+    result = successive_halving(slow, BASE, budget_seconds=0.3, batch_size=1)
+    assert time.monotonic() - started < 0.3 + 0.06
+    assert 1 <= result['search']['trials_scored'] < 27
+
+
+def test_a_search_cut_short_after_rung_one_keeps_the_default_round_count():
+    """Trial 0 capped at 100 rounds must not train with fewer than the untuned 150."""
+    def first_rung_only(configs, max_rounds):
+        time.sleep(0.05)
+        # The hand-set params win, having used every round the first cap allowed.
+        return [(1.0 if p == BASE else 2.0, max_rounds) for p in configs]
+
+    result = successive_halving(first_rung_only, BASE, budget_seconds=0.02, batch_size=27,
+                                default_rounds=150)
+    assert result['search']['rungs'] == 1
+    assert result['params'] == BASE
+    assert result['num_boost_round'] == 150
+
+
+def test_a_winner_from_a_later_rung_keeps_its_own_round_count():
+    calls = []
+    result = successive_halving(fake_evaluate(calls), BASE, budget_seconds=60,
+                                batch_size=27, default_rounds=150)
+    assert result['num_boost_round'] == 450